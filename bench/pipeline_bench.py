@@ -0,0 +1,102 @@
+"""
+Loopback benchmark of the ingest -> decode -> save pipeline, without any radio.
+
+A sender thread blasts packets at a UdpTransport on 127.0.0.1 and the headless
+Recorder decodes and writes them exactly as it would for a BLE characteristic.
+
+    py bench/pipeline_bench.py --packets 200000 --decoder "Comma Delimited String Literal"
+"""
+import argparse
+import asyncio
+import os
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from btviz.headless import Recorder, get_decoder  # noqa: E402
+from btviz.transports import open_transport  # noqa: E402
+
+
+def make_payload(decoder, i):
+    if decoder.numeric and decoder.channels is None:
+        return f"{i},{-i},{i % 100}\n".encode()
+    if not decoder.numeric:
+        return f"sample {i}\n".encode()
+    return struct.pack("<I", i % 2 ** 32)[:4]
+
+
+def send(port, payloads, rate):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    interval = 1.0 / rate if rate else 0
+    start = time.perf_counter()
+    for i, payload in enumerate(payloads):
+        if interval:
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        sock.sendto(payload, ("127.0.0.1", port))
+    sock.close()
+
+
+async def run(args):
+    decoder = get_decoder(args.decoder)
+    transport = await open_transport("udp://127.0.0.1:0")
+    workdir = tempfile.mkdtemp(prefix="btviz-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        recorder = Recorder(decoder, "bench.txt", workers=args.workers)
+        payloads = [make_payload(decoder, i) for i in range(args.packets)]
+        task = asyncio.ensure_future(recorder.run(transport, interval=args.interval))
+        await asyncio.sleep(0.1)
+
+        start = time.perf_counter()
+        sender = threading.Thread(target=send, args=(transport.port, payloads, args.rate))
+        sender.start()
+        while sender.is_alive():
+            await asyncio.sleep(0.05)
+        # let the last datagrams arrive and be decoded
+        idle = 0
+        last = -1
+        while idle < 5:
+            await asyncio.sleep(args.interval)
+            idle = idle + 1 if recorder.packets == last else 0
+            last = recorder.packets
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        size = os.path.getsize(recorder.path)
+    finally:
+        await transport.close()
+        os.chdir(cwd)
+
+    stats = recorder.stats()
+    print(f"Decoder: {decoder.name}" + (f", {args.workers} workers" if args.workers else ""))
+    print(f"Sent {args.packets} packets, decoded {stats['packets']} "
+          f"({args.packets - stats['packets'] - stats['ingest']['dropped']} lost on the socket, "
+          f"{stats['ingest']['dropped']} dropped by the ingest queue, {stats['errors']} undecodable)")
+    print(f"{stats['packets'] / elapsed:,.0f} packets/s over {elapsed:.2f} s, "
+          f"ingest peak {stats['ingest']['highWater']}/{stats['ingest']['maxsize']}, "
+          f"{size / 1024:.0f} KiB written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the BTViz pipeline over UDP loopback")
+    parser.add_argument("--packets", type=int, default=100000)
+    parser.add_argument("--rate", type=float, default=0, help="packets per second, 0 sends as fast as possible")
+    parser.add_argument("--decoder", default="4 Byte Unsigned Int (uint32_t)")
+    parser.add_argument("--workers", type=int, default=None, help="decode in this many worker processes")
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between decode passes")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
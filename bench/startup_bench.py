@@ -0,0 +1,132 @@
+"""
+Startup benchmark for BTViz.
+
+Reports the time from interpreter launch to the first painted scan window, the
+import time of the heaviest modules on that path, and which heavy modules were
+already loaded when the window appeared. Each measurement runs in a fresh
+interpreter so import caches from earlier runs do not hide regressions.
+
+    py bench/startup_bench.py --runs 5 --budget-ms 1500
+
+Exits with status 1 when the median time-to-first-window exceeds the budget or
+when a module listed in --forbid is imported before the first window.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+FIRST_WINDOW_SNIPPET = """
+import sys
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+app = QApplication(sys.argv)
+from btviz.scan_widget import ScanWidget
+window = ScanWidget()
+window.show()
+
+def report():
+    heavy = sorted({{m.split('.')[0] for m in sys.modules}} & {forbid!r})
+    print('FIRST_WINDOW ' + ','.join(heavy), flush=True)
+    app.quit()
+
+QTimer.singleShot(0, report)
+app.exec_()
+"""
+
+DEFAULT_FORBID = ("matplotlib", "bleak", "numpy")
+
+
+def _child_env():
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = src + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def time_to_first_window(forbid):
+    """
+    Launches a fresh interpreter and measures the wall time until the scan window is shown.
+
+    :param forbid: Top-level module names reported if they are loaded at first window.
+    :return: Tuple of (milliseconds, list of heavy modules loaded).
+    """
+    code = FIRST_WINDOW_SNIPPET.format(forbid=set(forbid))
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True, env=_child_env())
+    elapsed = None
+    heavy = []
+    for line in proc.stdout:
+        if line.startswith("FIRST_WINDOW"):
+            elapsed = (time.perf_counter() - start) * 1000
+            names = line.split(" ", 1)[1].strip()
+            heavy = names.split(",") if names else []
+    proc.wait()
+    if elapsed is None:
+        raise RuntimeError("Scan window was never shown; is a Qt platform available?")
+    return elapsed, heavy
+
+
+def import_times(module="btviz.scan_widget"):
+    """
+    Collects per-module import times using ``python -X importtime``.
+
+    :return: List of (cumulative_us, self_us, module) sorted by cumulative time.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=_child_env())
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure BTViz startup time")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to time")
+    parser.add_argument("--top", type=int, default=15, help="number of modules to list by import time")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail when the median time-to-first-window exceeds this")
+    parser.add_argument("--forbid", nargs="*", default=list(DEFAULT_FORBID),
+                        help="top-level modules that must not be loaded before the first window")
+    args = parser.parse_args()
+
+    failed = False
+
+    print("Import time (python -X importtime, import btviz.scan_widget)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in import_times()[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+
+    samples = []
+    heavy = []
+    for _ in range(args.runs):
+        elapsed, heavy = time_to_first_window(args.forbid)
+        samples.append(elapsed)
+    median = statistics.median(samples)
+    print()
+    print(f"Time to first window over {args.runs} runs: median {median:.0f} ms, "
+          f"min {min(samples):.0f} ms, max {max(samples):.0f} ms")
+
+    if heavy:
+        print(f"Heavy modules loaded before first window: {', '.join(heavy)}")
+        failed = True
+    else:
+        print("No heavy modules loaded before first window")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"Median {median:.0f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
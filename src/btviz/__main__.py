@@ -1,24 +1,292 @@
 import sys
 import asyncio
-from PyQt5.QtWidgets import QApplication
-import qasync   
-from btviz.scan_widget import ScanWidget
+import argparse
 
 
 def main():
     """
     Main function to execute the application.
+
+    Without a sub-command the GUI is started; sub-commands run headless.
     """
+    parser = build_parser()
+    args = parser.parse_args()
+    profile = None
+    if args.profile is not None:
+        from btviz.profiles import get_profile
+        try:
+            profile = get_profile(args.profile)
+        except (KeyError, OSError, ValueError) as e:
+            sys.exit(f"btviz: {e.args[0] if isinstance(e, KeyError) else e}")
+    from btviz.loop_monitor import profile_from_env
+    profiler = profile_from_env()
+    try:
+        if args.command is None:
+            run_gui(profile)
+        else:
+            code = args.func(args) or 0
+    finally:
+        if profiler is not None and profiler.running:
+            print(f"Profile written to {profiler.stop()}")
+    if args.command is not None:
+        sys.exit(code)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="btviz", description="Bluetooth Visualization for MCUs")
+    parser.add_argument("--profile", metavar="NAME",
+                        help="start the GUI and launch a saved session profile, see 'btviz profiles'")
+    commands = parser.add_subparsers(dest="command")
+
+    profiles = commands.add_parser("profiles", help="list the saved session profiles")
+    profiles.set_defaults(func=cmd_profiles)
+
+    decoders = commands.add_parser("decoders", help="list the available decoders, including plugins")
+    decoders.set_defaults(func=cmd_decoders)
+
+    record = commands.add_parser("record", help="record a characteristic without the GUI")
+    add_source_arguments(record)
+    record.add_argument("--decoder", required=True, help="decoder name, see 'btviz decoders'")
+    record.add_argument("--output", required=True, help="capture file name under results/<date>/, use a .bin name for binary rows")
+    record.add_argument("--duration", type=float, default=None, help="seconds to record (default: until Ctrl-C)")
+    record.add_argument("--workers", type=int, nargs="?", const=0, default=None,
+                        help="decode in worker processes (default count from config.json 'decodePool')")
+    record.add_argument("--tap", nargs="?", const="", default=None,
+                        help="publish samples in a named shared memory ring for local readers")
+    record.add_argument("--serve", type=int, nargs="?", const=0, default=None, metavar="PORT",
+                        help="stream decoded batches to local TCP/WebSocket subscribers (default port from config.json)")
+    record.add_argument("--rules", nargs="?", const="", default=None, metavar="FILE",
+                        help="check alert rules on every batch and write their commands back (default file: ~/.btviz/rules.json)")
+    record.set_defaults(func=cmd_record)
+
+    write = commands.add_parser("write", help="stream a file, hex payload or command script to a characteristic")
+    add_source_arguments(write)
+    payload = write.add_mutually_exclusive_group(required=True)
+    payload.add_argument("--file", help="binary file to send")
+    payload.add_argument("--hex", help="hex payload to send")
+    payload.add_argument("--text", help="UTF-8 payload to send")
+    payload.add_argument("--script", help="text file of commands, one write per line")
+    write.add_argument("--no-response", action="store_true", help="use write-without-response")
+    write.add_argument("--window", type=int, default=8, help="write-without-response chunks in flight")
+    write.set_defaults(func=cmd_write)
+
+    probe = commands.add_parser("probe", help="measure round-trip latency and throughput of a characteristic pair")
+    add_source_arguments(probe)
+    probe.add_argument("--write-char", metavar="UUID", help="characteristic to write to (default: the notify characteristic)")
+    probe.add_argument("--script", help="JSON list of probe steps (default: 'probe' in config.json)")
+    probe.add_argument("--label", help="name of the run, e.g. the firmware build, saved with the results")
+    probe.add_argument("--interval", type=float, default=None, metavar="MS",
+                       help="connection interval in milliseconds, for packets per interval")
+    probe.add_argument("--compare", nargs="+", metavar="RESULT",
+                       help="compare saved probe results instead of running a probe")
+    probe.set_defaults(func=cmd_probe)
+
+    convert = commands.add_parser("convert", help="convert archived captures, e.g. results/, to another format")
+    convert.add_argument("paths", nargs="+", help="capture files or directories, searched recursively")
+    convert.add_argument("--to", dest="format", required=True, choices=["bin", "csv", "csv.gz", "npz"],
+                         help="output format: indexed binary rows, CSV, gzipped CSV or a NumPy archive")
+    convert.add_argument("--output-dir", help="mirror the directory structure here (default: next to each capture)")
+    convert.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    convert.add_argument("--pattern", default="*", help="only convert file names matching this glob")
+    convert.add_argument("--force", action="store_true", help="convert again even if the output is up to date")
+    convert.set_defaults(func=cmd_convert)
+
+    return parser
+
+
+def cmd_convert(args):
+    import time
+    from btviz.config_loader import load_config
+    from btviz.convert import convert_tree, format_convert_summary
+    start = time.perf_counter()
+    converted = 0
+
+    def progress(done, total, result):
+        nonlocal converted
+        if result.error is not None:
+            status = f"failed: {result.error}"
+        elif result.skipped:
+            status = "up to date"
+        else:
+            converted += result.bytes
+            status = (f"{result.samples} samples, {result.bytes / 1e6:.1f} MB in {result.elapsed:.2f} s "
+                      f"({converted / 1e6 / (time.perf_counter() - start):.1f} MB/s overall)")
+        print(f"[{done}/{total}] {result.source}: {status}", flush=True)
+
+    results = convert_tree(args.paths, args.format, args.output_dir, args.workers, args.pattern, args.force,
+                           int(load_config().get("capture", {}).get("indexEvery", 4096)), progress)
+    print(format_convert_summary(results, time.perf_counter() - start))
+    return 1 if any(r.error is not None for r in results) else 0
+
+
+def cmd_probe(args):
+    from btviz.probe import (compare_probes, default_steps, format_probe, format_step, load_probe,
+                             load_probe_script, save_probe)
+    if args.compare:
+        try:
+            results = [load_probe(path) for path in args.compare]
+        except (OSError, ValueError, KeyError) as e:
+            sys.exit(f"btviz: unable to read probe results: {e}")
+        print("\n".join(compare_probes(results)))
+        return 0
+    from btviz.config_loader import load_config
+    from btviz.headless import probe
+    check_source(args)
+    config = load_config()
+    try:
+        steps = load_probe_script(args.script) if args.script else default_steps(config)
+    except (OSError, ValueError) as e:
+        sys.exit(f"btviz: unable to read the probe script: {e}")
+    interval = args.interval if args.interval is not None else config.get("probe", {}).get("connectionInterval")
+
+    def progress(step):
+        print("\n".join(format_step(step)), flush=True)
+
+    try:
+        result = asyncio.run(probe(args.address, args.char, args.write_char, steps, args.label, args.url, interval,
+                                   progress))
+    except KeyboardInterrupt:
+        return 1
+    print(format_probe(result)[0])
+    print(f"Results saved to {save_probe(result)}")
+    return 1 if any("error" in step for step in result["steps"]) else 0
+
+
+def add_source_arguments(parser):
+    parser.add_argument("address", nargs="?", help="device address")
+    parser.add_argument("char", nargs="?", help="characteristic UUID")
+    parser.add_argument("--url", help="local source instead of BLE, e.g. udp://127.0.0.1:9000 or serial:///dev/ttyUSB0")
+
+
+def check_source(args):
+    if args.url is None and (args.address is None or args.char is None):
+        sys.exit("btviz: give a device address and characteristic UUID, or --url")
+
+
+def run_gui(profile=None):
+    from PyQt5.QtWidgets import QApplication
+    import qasync
+    from btviz.scan_widget import ScanWidget
+    from btviz.loop_monitor import get_monitor
+
     app = QApplication(sys.argv)
     event_loop = qasync.QEventLoop(app)
     asyncio.set_event_loop(event_loop)
+    get_monitor().start(event_loop)
     ex = ScanWidget()
     ex.show()
+    if profile is not None:
+        ex.launchProfile(profile)
     app_close_event = asyncio.Event()
     app.aboutToQuit.connect(app_close_event.set)
     with event_loop:
         event_loop.run_until_complete(app_close_event.wait())
 
 
+def cmd_decoders(args):
+    from btviz.headless import list_decoders
+    for name, channels, numeric in list_decoders():
+        if not numeric:
+            kind = "text"
+        elif channels:
+            kind = ", ".join(channels)
+        else:
+            kind = "channels from data"
+        print(f"{name}  [{kind}]")
+
+
+def cmd_profiles(args):
+    from btviz.profiles import load_profiles, profiles_path
+    try:
+        profiles = load_profiles()
+    except (OSError, ValueError) as e:
+        sys.exit(f"btviz: unable to read {profiles_path()}: {e}")
+    if not profiles:
+        print(f"No saved profiles in {profiles_path()}")
+    for name, profile in profiles.items():
+        print(f"{name}  [{profile.describe()}]")
+
+
+def cmd_record(args):
+    from btviz.headless import record
+    from btviz.sequence import format_sequence_stats
+    from btviz.clock_sync import format_clock_stats
+    from btviz.shm_ring import default_tap_name
+    check_source(args)
+    tap = args.tap
+    if tap is not None:
+        tap = tap or default_tap_name(args.url or args.char)
+        print(f"Publishing samples in shared memory tap {tap}")
+    if args.serve is not None:
+        from btviz.config_loader import load_config
+        section = load_config().get("server", {})
+        print(f"Streaming on ws://{section.get('host', '127.0.0.1')}:{args.serve or section.get('port', 8765)}/")
+    rules = None
+    if args.rules is not None:
+        from btviz.rules import load_rules, rules_path
+        path = args.rules or rules_path()
+        try:
+            rules = load_rules(path)
+        except (OSError, ValueError) as e:
+            sys.exit(f"btviz: unable to load rules: {e}")
+        if not rules:
+            sys.exit(f"btviz: no rules in {path}")
+        print(f"Checking {len(rules)} rules from {path}")
+    try:
+        recorder = asyncio.run(record(args.address, args.char, args.decoder, args.output, args.duration, args.url,
+                                      args.workers, tap, args.serve, rules, lambda alert: print(alert, flush=True)))
+    except KeyboardInterrupt:
+        return 0
+    stats = recorder.stats()
+    print(f"Recorded {stats['packets']} packets to {recorder.path} "
+          f"({stats['errors']} undecodable, {stats['ingest']['dropped']} dropped)")
+    if "sequence" in stats:
+        print(format_sequence_stats(stats["sequence"]))
+    if "clock" in stats:
+        print(format_clock_stats(stats["clock"]))
+    if "rules" in stats:
+        from btviz.rules import format_latency
+        print(f"{stats['rules']['alerts']} alerts, latency from notification: "
+              f"{format_latency('decide', recorder.decideLatency)}, {format_latency('write', recorder.writeLatency)}")
+
+
+def cmd_write(args):
+    from btviz.headless import write
+    check_source(args)
+    data = lines = None
+    try:
+        if args.file:
+            with open(args.file, "rb") as fh:
+                data = fh.read()
+        elif args.hex:
+            data = bytes.fromhex(args.hex.replace(" ", ""))
+        elif args.text:
+            data = args.text.encode("utf-8")
+        else:
+            with open(args.script, encoding="utf-8") as fh:
+                lines = fh.readlines()
+    except OSError as e:
+        sys.exit(f"btviz: unable to read the data to write: {e}")
+    except ValueError as e:
+        sys.exit(f"btviz: invalid --hex data: {e}")
+
+    def progress(stats):
+        print(f"\r{stats}", end="", flush=True)
+
+    try:
+        results = asyncio.run(write(args.address, args.char, data, lines,
+                                    response=not args.no_response, window=args.window, progress=progress,
+                                    url=args.url))
+    except OSError as e:
+        sys.exit(f"\nbtviz: write failed: {e}")
+    except KeyboardInterrupt:
+        return 1
+    print()
+    sent = sum(r.sent for r in results)
+    elapsed = sum(r.elapsed for r in results)
+    print(f"Wrote {sent} bytes in {len(results)} writes, {sent / elapsed / 1024 if elapsed else 0:.1f} KiB/s")
+    return 1 if any(r.sent < r.total for r in results) else 0
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,168 @@
+import threading
+from collections import deque
+
+BLOCK = "block"
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+DECIMATE = "decimate"
+FAIL = "fail"
+
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, DECIMATE, FAIL)
+
+
+class BoundedQueue:
+    """
+    A thread-safe FIFO with a fixed capacity and an explicit overflow policy.
+
+    Policies:
+    - block: put() waits for room. Waits longer than the timeout count as drops of the new item.
+    - drop-oldest: the oldest queued item is discarded to make room.
+    - drop-newest: the new item is discarded.
+    - decimate: every other queued item is discarded, spreading the loss evenly over
+      the queued time span. Meant for display stages.
+    - fail: the new item is refused without waiting, and the producer has to stop. Meant for
+      disk stages, which must neither lose data silently nor block the event loop.
+
+    Occupancy, high-water mark and drop counters are kept per queue so overload is visible.
+    """
+
+    def __init__(self, name, maxsize, policy=DROP_OLDEST, timeout=None, notify=None, sizeOf=None):
+        """
+        Initializes the queue.
+
+        :param name: Name of the pipeline stage, used in stats.
+        :param maxsize: Maximum number of queued items, or of their total size with sizeOf.
+        :param policy: One of POLICIES.
+        :param timeout: Maximum wait in seconds for the block policy. None waits forever.
+        :param notify: Optional callable invoked when the queue becomes half full, e.g. to wake the consumer early.
+        :param sizeOf: Optional callable giving the size of an item, e.g. len for batches of rows.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {', '.join(POLICIES)}")
+        if maxsize < 1:
+            raise ValueError("Queue size must be at least 1")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.timeout = timeout
+        self.notify = notify
+        self.sizeOf = sizeOf
+
+        self._items = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+
+        self.putCount = 0
+        self.dropCount = 0
+        self.highWater = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def _weight(self, item):
+        return 1 if self.sizeOf is None else self.sizeOf(item)
+
+    def _fits(self, weight):
+        # an item larger than the whole queue is still taken by an empty queue
+        return not self._items or self._size + weight <= self.maxsize
+
+    def put(self, item):
+        """
+        Adds an item, applying the overflow policy when the queue is full.
+
+        :return: False if the new item itself was dropped.
+        """
+        weight = self._weight(item)
+        with self._cond:
+            self.putCount += 1
+            if not self._fits(weight):
+                if self.policy == BLOCK:
+                    if not self._cond.wait_for(lambda: self._fits(weight), self.timeout):
+                        self.dropCount += 1
+                        return False
+                elif self.policy == DROP_OLDEST:
+                    while not self._fits(weight):
+                        self._size -= self._weight(self._items.popleft())
+                        self.dropCount += 1
+                elif self.policy in (DROP_NEWEST, FAIL):
+                    self.dropCount += 1
+                    return False
+                else:
+                    while not self._fits(weight):
+                        kept = list(self._items)[1::2]
+                        self.dropCount += len(self._items) - len(kept)
+                        self._items = deque(kept)
+                        self._size = sum(self._weight(queued) for queued in kept)
+            before = self._size
+            self._items.append(item)
+            self._size += weight
+            self.highWater = max(self.highWater, self._size)
+            wake = self.notify is not None and before < self.maxsize // 2 <= self._size
+        if wake:
+            self.notify()
+        return True
+
+    def getBatch(self, maxItems=None):
+        """
+        Removes and returns up to maxItems queued items without waiting.
+        """
+        with self._cond:
+            if maxItems is None or maxItems >= len(self._items):
+                batch = list(self._items)
+                self._items.clear()
+                self._size = 0
+            else:
+                batch = [self._items.popleft() for _ in range(maxItems)]
+                self._size -= sum(self._weight(item) for item in batch)
+            if batch:
+                self._cond.notify_all()
+        return batch
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+            self._size = 0
+            self._cond.notify_all()
+
+    def stats(self):
+        """
+        Returns a snapshot of the queue counters.
+        """
+        return {
+            "name": self.name,
+            "size": self._size,
+            "maxsize": self.maxsize,
+            "highWater": self.highWater,
+            "put": self.putCount,
+            "dropped": self.dropCount,
+            "policy": self.policy,
+        }
+
+
+def queue_from_config(name, config, notify=None, sizeOf=None):
+    """
+    Builds the queue of a pipeline stage from the "queues" section of config.json.
+
+    :param name: Stage name, e.g. "ingest", "display" or "save".
+    :param config: The loaded config dictionary.
+    :param sizeOf: Optional size of an item, see BoundedQueue.
+    """
+    options = config.get("queues", {}).get(name, {})
+    return BoundedQueue(
+        name,
+        int(options.get("maxsize", 4096)),
+        policy=options.get("policy", DROP_OLDEST),
+        timeout=options.get("timeout"),
+        notify=notify,
+        sizeOf=sizeOf,
+    )
+
+
+def format_stats(stats):
+    """
+    Formats queue stats as a single status line.
+    """
+    return " | ".join(
+        f"{s['name']} {s['size']}/{s['maxsize']} (peak {s['highWater']}, dropped {s['dropped']})"
+        for s in stats
+    )
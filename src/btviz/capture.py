@@ -0,0 +1,386 @@
+"""
+Capture file helpers shared by the GUI SaveThread and the headless tools. Nothing here imports Qt.
+
+Captures are written as text, one line per decoded sample, or, for file names ending in
+".bin", as binary rows of float64 after a fixed 512 byte header:
+
+    offset  type      field
+    0       8s        magic "BTVZCAP1"
+    8       int64     header size, the offset of the first row
+    16      int64     channels
+    24      8s        NumPy dtype string of the samples, "<f8"
+    32      int64     length of the channel names
+    64      bytes     channel names, UTF-8, separated by newlines
+
+Next to every capture the writer keeps a sidecar index, "<capture>.idx", with one entry
+per indexEvery samples: the sample number, the host time the sample was written and the
+byte offset of its row. CaptureFile uses it to read any sample or time range with one
+seek and a read no larger than the range plus one index interval.
+"""
+import os
+import datetime
+import time
+import numpy as np
+from .clock_sync import append_host_time, append_host_time_text
+from .sequence import insert_gap_markers, insert_gap_lines
+
+BINARY_SUFFIX = ".bin"
+INDEX_SUFFIX = ".idx"
+MAGIC = b"BTVZCAP1"
+HEADER_SIZE = 512
+INDEX_MAGIC = b"BTVZIDX1"
+INDEX_HEADER_SIZE = 16
+INDEX_DTYPE = np.dtype([("sample", "<i8"), ("time", "<f8"), ("offset", "<i8")])
+SAMPLE_DTYPE = np.dtype("<f8")
+
+
+def capture_path(filename, root="results"):
+    """
+    Returns the path of a capture file under results/<date>/, creating the folder.
+
+    :param filename: Name of the capture file.
+    :param root: Root results folder.
+    """
+    date_str = str(datetime.datetime.now())[:10]
+    folder = os.path.join(".", root, date_str)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
+
+
+def is_binary_capture(path):
+    return str(path).endswith(BINARY_SUFFIX)
+
+
+def capture_rows(values, text, decoder, binary, times=None, gaps=None):
+    """
+    Returns what one decoded batch adds to a capture, for the GUI and the headless pipeline alike.
+
+    :param values: Decoded array of shape (n, channels), or None.
+    :param text: The capture lines of the batch.
+    :param decoder: The decoder, it formats the gap marker line of text captures.
+    :param binary: True for binary captures.
+    :param times: Aligned host times of the samples, appended as the last column.
+    :param gaps: Row numbers that follow a gap, a row of NaN is inserted before each.
+    :return: An array of rows for binary captures, a list of lines for text captures,
+             or None when the batch adds nothing.
+    """
+    if binary:
+        if values is None or not len(values):
+            return None
+        rows = values if times is None else append_host_time(values, times)
+        return rows if gaps is None else insert_gap_markers(rows, gaps)
+    if not text:
+        return None
+    lines = list(text)
+    if times is not None and len(lines) == len(values):
+        lines = append_host_time_text(lines, times)
+    if gaps is not None and len(gaps) and len(lines) == len(values):
+        marker = decoder.format_text(np.full((1, values.shape[1] + (times is not None)), np.nan))[0]
+        lines = insert_gap_lines(lines, gaps, marker)
+    return lines
+
+
+def _binary_header(channels, names=None):
+    encoded = "\n".join(names or [f"ch{i}" for i in range(channels)]).encode()
+    if len(encoded) > HEADER_SIZE - 64:
+        raise ValueError("Channel names do not fit into the capture header")
+    header = bytearray(HEADER_SIZE)
+    header[0:8] = MAGIC
+    header[8:24] = np.array([HEADER_SIZE, channels], dtype="<i8").tobytes()
+    header[24:32] = SAMPLE_DTYPE.str.encode().ljust(8, b"\0")
+    header[32:40] = np.array([len(encoded)], dtype="<i8").tobytes()
+    header[64:64 + len(encoded)] = encoded
+    return bytes(header)
+
+
+def read_binary_header(fh):
+    """
+    Reads the header of a binary capture.
+
+    :return: (header size, channels, dtype, channel names)
+    """
+    fh.seek(0)
+    header = fh.read(HEADER_SIZE)
+    if header[0:8] != MAGIC:
+        raise ValueError(f"{getattr(fh, 'name', 'File')} is not a BTViz binary capture")
+    size, channels = (int(v) for v in np.frombuffer(header[8:24], dtype="<i8"))
+    dtype = np.dtype(header[24:32].rstrip(b"\0").decode())
+    length = int(np.frombuffer(header[32:40], dtype="<i8")[0])
+    return size, channels, dtype, header[64:64 + length].decode().split("\n")
+
+
+def load_index(path):
+    """
+    Reads the sidecar index of a capture.
+
+    :param path: The capture file, not the index.
+    :return: (entries, indexEvery), entries is an array of INDEX_DTYPE, empty without an index.
+    """
+    try:
+        with open(path + INDEX_SUFFIX, "rb") as fh:
+            header = fh.read(INDEX_HEADER_SIZE)
+            if header[0:8] != INDEX_MAGIC:
+                raise ValueError(f"{path}{INDEX_SUFFIX} is not a BTViz capture index")
+            every = int(np.frombuffer(header[8:16], dtype="<i8")[0])
+            data = fh.read()
+    except FileNotFoundError:
+        return np.empty(0, dtype=INDEX_DTYPE), None
+    # a writer may be half way through an entry
+    usable = len(data) // INDEX_DTYPE.itemsize * INDEX_DTYPE.itemsize
+    return np.frombuffer(data[:usable], dtype=INDEX_DTYPE), every
+
+
+def _count_lines(fh, offset):
+    fh.seek(offset)
+    count = 0
+    while True:
+        chunk = fh.read(1 << 20)
+        if not chunk:
+            return count
+        count += chunk.count(b"\n")
+
+
+def index_capture(path, indexEvery=4096):
+    """
+    Writes a sidecar index for a text capture that was saved without one. The write times
+    of such captures are unknown, so the index supports sample ranges only.
+
+    :return: The number of samples in the capture.
+    """
+    entries = []
+    sample = offset = 0
+    with open(path, "rb") as fh:
+        for line in fh:
+            if sample % indexEvery == 0:
+                entries.append((sample, np.nan, offset))
+            sample += 1
+            offset += len(line)
+    with open(path + INDEX_SUFFIX, "wb") as fh:
+        fh.write(INDEX_MAGIC + np.array([indexEvery], dtype="<i8").tobytes())
+        fh.write(np.array(entries, dtype=INDEX_DTYPE).tobytes())
+    return sample
+
+
+class CaptureWriter:
+    """
+    Appends decoded samples to a capture file and maintains its sidecar index.
+
+    Appending to an existing capture continues its sample numbering.
+    """
+
+    def __init__(self, path, indexEvery=4096, names=None):
+        """
+        :param path: Capture file path. Names ending in ".bin" are written as binary rows.
+        :param indexEvery: Samples between index entries.
+        :param names: Channel names stored in the header of a new binary capture.
+        """
+        self.path = path
+        self.binary = is_binary_capture(path)
+        self.names = names
+        self.channels = None
+        self.samples = 0
+        self._fh = open(path, "a+b")
+        self._fh.seek(0, os.SEEK_END)
+        size = self._fh.tell()
+        entries, every = load_index(path)
+        if size and not self.binary and not len(entries):
+            # a capture saved before indexing, index what is there first
+            index_capture(path, indexEvery)
+            entries, every = load_index(path)
+        self.indexEvery = every or indexEvery
+        if size and self.binary:
+            _, self.channels, _, self.names = read_binary_header(self._fh)
+            self.samples = (size - HEADER_SIZE) // (self.channels * SAMPLE_DTYPE.itemsize)
+        elif size:
+            # only the lines after the last index entry need counting
+            last = entries[-1] if len(entries) else None
+            start = int(last["offset"]) if last is not None else 0
+            self.samples = (int(last["sample"]) if last is not None else 0) + _count_lines(self._fh, start)
+        self._fh.seek(0, os.SEEK_END)
+        self._idx = open(path + INDEX_SUFFIX, "ab")
+        if self._idx.tell() == 0:
+            self._idx.write(INDEX_MAGIC + np.array([self.indexEvery], dtype="<i8").tobytes())
+
+    @classmethod
+    def fromConfig(cls, path, config, names=None):
+        """
+        Creates a writer with the "capture" section of config.json.
+        """
+        return cls(path, int(config.get("capture", {}).get("indexEvery", 4096)), names)
+
+    def _index(self, count, offsets, timestamp):
+        """
+        Adds index entries for the samples [self.samples, self.samples + count).
+
+        :param offsets: Callable returning the byte offsets of rows given their positions in the batch.
+        """
+        first = -(-self.samples // self.indexEvery) * self.indexEvery
+        marks = np.arange(first, self.samples + count, self.indexEvery)
+        if not len(marks):
+            return
+        entries = np.empty(len(marks), dtype=INDEX_DTYPE)
+        entries["sample"] = marks
+        entries["time"] = time.time() if timestamp is None else timestamp
+        entries["offset"] = offsets(marks - self.samples)
+        self._idx.write(entries.tobytes())
+
+    def writeLines(self, lines, timestamp=None):
+        """
+        Appends text samples, one line each.
+
+        :param lines: Decoded text, one entry per sample.
+        :param timestamp: Host time of the samples, defaults to now.
+        """
+        if self.binary:
+            raise ValueError("Binary captures store values, use writeValues()")
+        if not lines:
+            return
+        encoded = [line.rstrip("\r\n").encode() + b"\n" for line in lines]
+        start = self._fh.tell()
+        ends = np.cumsum([0] + [len(e) for e in encoded])
+        self._index(len(encoded), lambda positions: start + ends[positions], timestamp)
+        self._fh.write(b"".join(encoded))
+        self.samples += len(encoded)
+
+    def writeValues(self, values, timestamp=None):
+        """
+        Appends numeric samples to a binary capture.
+
+        :param values: Array-like of shape (n, channels).
+        :param timestamp: Host time of the samples, defaults to now.
+        """
+        if not self.binary:
+            raise ValueError("Text captures store lines, use writeLines()")
+        values = np.asarray(values, dtype=SAMPLE_DTYPE)
+        if values.ndim == 1:
+            values = values.reshape(-1, 1)
+        if not len(values):
+            return
+        if self.channels is None:
+            self.channels = values.shape[1]
+            if self.names is not None and len(self.names) != self.channels:
+                self.names = None
+            self._fh.write(_binary_header(self.channels, self.names))
+        elif values.shape[1] != self.channels:
+            raise ValueError(f"Capture has {self.channels} channels, got rows of {values.shape[1]}")
+        rowSize = self.channels * SAMPLE_DTYPE.itemsize
+        start = self._fh.tell()
+        self._index(len(values), lambda positions: start + positions * rowSize, timestamp)
+        self._fh.write(np.ascontiguousarray(values).tobytes())
+        self.samples += len(values)
+
+    def flush(self):
+        self._fh.flush()
+        self._idx.flush()
+
+    def close(self):
+        self._fh.close()
+        self._idx.close()
+
+
+class CaptureFile:
+    """
+    Random access to a capture by sample number or host time, through its sidecar index.
+
+    Works while the capture is still being written; rows written after opening are found too.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.binary = is_binary_capture(path)
+        self._fh = open(path, "rb")
+        self.channels = self.dtype = self.names = None
+        self.dataOffset = 0
+        if self.binary:
+            self.dataOffset, self.channels, self.dtype, self.names = read_binary_header(self._fh)
+        self.index, self.indexEvery = load_index(path)
+        if not self.binary and not len(self.index):
+            raise FileNotFoundError(f"{path} has no index, create one with index_capture()")
+
+    def refresh(self):
+        """
+        Re-reads the index of a capture that is still being written.
+        """
+        self.index, self.indexEvery = load_index(self.path)
+
+    @property
+    def rowSize(self):
+        return self.channels * self.dtype.itemsize
+
+    def __len__(self):
+        size = os.fstat(self._fh.fileno()).st_size
+        if self.binary:
+            return (size - self.dataOffset) // self.rowSize
+        last = self.index[-1]
+        return int(last["sample"]) + _count_lines(self._fh, int(last["offset"]))
+
+    def _entryBefore(self, sample):
+        return self.index[max(0, np.searchsorted(self.index["sample"], sample, side="right") - 1)]
+
+    def readSamples(self, start, stop):
+        """
+        Reads the samples [start, stop).
+
+        :return: List of text lines, or an array of shape (n, channels) for binary captures.
+        """
+        start = max(0, int(start))
+        stop = max(start, int(stop))
+        if self.binary:
+            self._fh.seek(self.dataOffset + start * self.rowSize)
+            data = self._fh.read((stop - start) * self.rowSize)
+            usable = len(data) // self.rowSize * self.rowSize
+            return np.frombuffer(data[:usable], dtype=self.dtype).reshape(-1, self.channels)
+        entry = self._entryBefore(start)
+        first, offset = int(entry["sample"]), int(entry["offset"])
+        after = np.searchsorted(self.index["sample"], stop)
+        self._fh.seek(offset)
+        if after < len(self.index):
+            data = self._fh.read(int(self.index[after]["offset"]) - offset)
+        else:
+            data = self._fh.read()
+        lines = data.decode("utf-8", errors="replace").split("\n")
+        # a trailing partial line is still being written
+        return lines[start - first:min(stop - first, len(lines) - 1)]
+
+    def _timed(self):
+        timed = self.index[np.isfinite(self.index["time"])]
+        if not len(timed):
+            raise ValueError(f"{self.path} has no write times in its index")
+        return timed
+
+    def sampleAt(self, t):
+        """
+        Estimates the number of the first sample written at or after host time t.
+        """
+        timed = self._timed()
+        if t > timed["time"][-1]:
+            return len(self)
+        return int(np.ceil(np.interp(t, timed["time"], timed["sample"])))
+
+    def timeOf(self, sample):
+        """
+        Estimates the host time a sample was written, interpolating between index entries.
+        """
+        timed = self._timed()
+        return float(np.interp(sample, timed["sample"], timed["time"]))
+
+    def readTime(self, t0, t1):
+        """
+        Reads the samples written between host times t0 and t1.
+
+        :param t0: Start, seconds since the epoch, e.g. datetime(...).timestamp().
+        :param t1: End, seconds since the epoch.
+        :return: (number of the first sample, samples as returned by readSamples())
+        """
+        start = self.sampleAt(t0)
+        stop = self.sampleAt(t1)
+        return start, self.readSamples(start, stop)
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,260 @@
+"""
+Incremental per-channel statistics of a stream. Nothing here imports Qt.
+
+RunningMoments summarizes everything received: count, mean, M2 (the sum of squared
+deviations), min and max per channel, merged batch by batch with the parallel form of
+Welford's update (Chan et al.), so no sample is kept. WindowMoments covers the last
+`length` samples: they are kept in a ring divided into blocks, each holding the same
+moments. A batch only recomputes the blocks it writes to, and a query merges the
+block moments plus the samples of the one block cut by the window edge. Updates cost
+O(new samples) at any rate and window length. NaN gap markers are skipped.
+"""
+import time
+from collections import deque
+import numpy as np
+
+#: Samples per block of the window ring.
+BLOCK = 256
+
+
+def moments(values, axis=0):
+    """
+    Returns (count, mean, M2, min, max) of values along axis, ignoring NaN.
+    """
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=axis)
+    safe = np.maximum(count, 1)
+    mean = np.where(valid, values, 0.0).sum(axis=axis) / safe
+    deviation = np.where(valid, values - np.expand_dims(mean, axis), 0.0)
+    m2 = (deviation * deviation).sum(axis=axis)
+    # fmin and fmax skip NaN, and give NaN only when every value is NaN
+    return count, mean, m2, np.fmin.reduce(values, axis=axis), np.fmax.reduce(values, axis=axis)
+
+
+def merge(count, mean, m2, lo, hi):
+    """
+    Merges moments stacked along the first axis into one set, Chan et al.'s pairwise update generalized.
+    """
+    total = count.sum(axis=0)
+    safe = np.maximum(total, 1)
+    merged = (count * mean).sum(axis=0) / safe
+    m2 = m2.sum(axis=0) + (count * (mean - merged) ** 2).sum(axis=0)
+    return total, merged, m2, np.fmin.reduce(lo, axis=0), np.fmax.reduce(hi, axis=0)
+
+
+def summarize(count, mean, m2, lo, hi):
+    """
+    Turns moments into a dict of per-channel arrays: count, mean, std, min, max and rms.
+    """
+    empty = count == 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = np.where(empty, np.nan, m2 / count)
+    mean = np.where(empty, np.nan, mean)
+    return {"count": count, "mean": mean, "std": np.sqrt(variance), "min": lo, "max": hi,
+            "rms": np.sqrt(variance + mean * mean)}
+
+
+class RunningMoments:
+    """
+    Moments of every sample received so far.
+    """
+
+    def __init__(self, channels):
+        self.channels = channels
+        self.reset()
+
+    def update(self, values):
+        """
+        :param values: Array of shape (n, channels).
+        """
+        if not len(values):
+            return
+        batch = moments(np.asarray(values, dtype=np.float64))
+        self._moments = merge(*(np.stack([a, b]) for a, b in zip(self._moments, batch)))
+
+    def summary(self):
+        return summarize(*self._moments)
+
+    def reset(self):
+        zeros = np.zeros(self.channels)
+        self._moments = (zeros.astype(np.int64), zeros, zeros, np.full(self.channels, np.nan),
+                         np.full(self.channels, np.nan))
+
+
+class WindowMoments:
+    """
+    Moments of the last `length` samples.
+    """
+
+    def __init__(self, channels, length, block=BLOCK):
+        """
+        :param channels: Number of channels.
+        :param length: Samples in the window.
+        :param block: Samples per ring block, the cost of a query is length / block + block.
+        """
+        self.channels = channels
+        self.block = block
+        self.length = 0
+        self.total = 0
+        self.setLength(length)
+
+    def setLength(self, length, keep=True):
+        """
+        Changes the window length.
+
+        :param keep: Keep the samples that are still inside the new window, otherwise start empty.
+        """
+        length = max(1, int(length))
+        kept = self.values()[-length:] if keep and self.total else None
+        self.length = length
+        # one extra block, as the window edge usually cuts a block
+        self._blocks = -(-length // self.block) + 1
+        self._ring = np.full((self._blocks * self.block, self.channels), np.nan)
+        self._blockMoments = [np.zeros((self._blocks, self.channels), dtype=np.int64)] + \
+                             [np.full((self._blocks, self.channels), np.nan) for _ in range(4)]
+        self.total = 0
+        if kept is not None:
+            self.update(kept)
+
+    def _positions(self, start, stop):
+        """
+        Ring slices holding rows start to stop, at most two as the ring wraps.
+        """
+        size = len(self._ring)
+        first, last = start % size, (stop - 1) % size + 1
+        if stop - start <= size - first:
+            return [slice(first, first + stop - start)]
+        return [slice(first, size), slice(0, last)]
+
+    def update(self, values):
+        """
+        :param values: Array of shape (n, channels).
+        """
+        n = len(values)
+        if not n:
+            return
+        values = np.asarray(values, dtype=np.float64)
+        size = len(self._ring)
+        if n > size:
+            # older rows would be overwritten in this batch anyway
+            self.total += n - size
+            values, n = values[-size:], size
+        start, stop = self.total, self.total + n
+        offset = 0
+        for part in self._positions(start, stop):
+            count = part.stop - part.start
+            self._ring[part] = values[offset:offset + count]
+            offset += count
+        # clear what the last block still holds from its previous round
+        end = -(-stop // self.block) * self.block
+        if end > stop:
+            self._ring[self._positions(stop, end)[0]] = np.nan
+        self.total = stop
+        # recompute the moments of the touched blocks, block aligned so the slices reshape into blocks
+        first = max(start // self.block * self.block, end - size)
+        for part in self._positions(first, end):
+            rows = self._ring[part].reshape(-1, self.block, self.channels)
+            slots = slice(part.start // self.block, part.stop // self.block)
+            for target, value in zip(self._blockMoments, moments(rows, axis=1)):
+                target[slots] = value
+
+    def values(self):
+        """
+        Returns the samples in the window, oldest first.
+        """
+        start = max(0, self.total - self.length)
+        if start == self.total:
+            return np.empty((0, self.channels))
+        return np.concatenate([self._ring[part] for part in self._positions(start, self.total)])
+
+    def summary(self):
+        start = max(0, self.total - self.length)
+        if start == self.total:
+            nan = np.full(self.channels, np.nan)
+            return summarize(np.zeros(self.channels, dtype=np.int64), nan, nan, nan, nan)
+        first = -(-start // self.block)
+        last = -(-self.total // self.block)
+        parts = []
+        if start % self.block:
+            # the block cut by the window edge is summarized from its samples
+            edge = min(first * self.block, self.total)
+            rows = np.concatenate([self._ring[part] for part in self._positions(start, edge)])
+            parts.append(moments(rows))
+        if last > first:
+            slots = np.arange(first, last) % self._blocks
+            parts.append(merge(*(array[slots] for array in self._blockMoments)))
+        return summarize(*merge(*(np.stack(values) for values in zip(*parts))))
+
+
+class ChannelStats:
+    """
+    Statistics of a stream over the visible window and over the whole session, with sample rates.
+    """
+
+    def __init__(self, channels, window, block=BLOCK):
+        """
+        :param channels: Number of channels.
+        :param window: Samples in the visible window.
+        :param block: Samples per ring block of the window.
+        """
+        self.channels = channels
+        self.session = RunningMoments(channels)
+        self.window = WindowMoments(channels, window, block)
+        self.samples = 0
+        self._first = None
+        self._arrivals = deque()
+
+    def setWindow(self, length):
+        """
+        Follows a change of the visible window, e.g. of its length or of the decimation.
+        """
+        if int(length) != self.window.length:
+            self.window.setLength(length)
+
+    def update(self, values, now=None):
+        """
+        Adds a decoded batch.
+
+        :param values: Array of shape (n, channels).
+        :param now: time.monotonic() of the batch, defaults to now.
+        """
+        if not len(values):
+            return
+        now = time.monotonic() if now is None else now
+        self.session.update(values)
+        self.window.update(values)
+        self.samples += len(values)
+        if self._first is None:
+            self._first = (now, self.samples)
+        self._arrivals.append((now, self.samples))
+        # keep the last batch that ended before the window, it anchors the window rate
+        while len(self._arrivals) > 1 and self._arrivals[1][1] <= self.samples - self.window.length:
+            self._arrivals.popleft()
+
+    @staticmethod
+    def _rate(anchor, latest):
+        elapsed = latest[0] - anchor[0]
+        return (latest[1] - anchor[1]) / elapsed if elapsed > 0 else 0.0
+
+    def sessionStats(self):
+        """
+        :return: Dict of per-channel arrays, see summarize(), plus the sample rate "rate".
+        """
+        stats = self.session.summary()
+        stats["rate"] = self._rate(self._first, self._arrivals[-1]) if self._arrivals else 0.0
+        return stats
+
+    def windowStats(self):
+        """
+        :return: Dict of per-channel arrays over the visible window, plus the sample rate "rate".
+        """
+        stats = self.window.summary()
+        stats["rate"] = self._rate(self._arrivals[0], self._arrivals[-1]) if self._arrivals else 0.0
+        return stats
+
+    def reset(self):
+        self.session.reset()
+        self.window.setLength(self.window.length, keep=False)
+        self.samples = 0
+        self._first = None
+        self._arrivals.clear()
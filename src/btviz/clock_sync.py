@@ -0,0 +1,234 @@
+"""
+Alignment of device timestamps to the host clock. Nothing here imports Qt.
+
+Decoders whose packets carry a device timestamp name its channel with
+``Decoder.timestamp``, its unit with ``Decoder.timestampScale`` (seconds per tick) and
+its wrap-around with ``Decoder.timestampModulus``, or in config.json:
+
+    {"name": "IMU", "format": "<Ihhh", "channels": ["t", "x", "y", "z"],
+     "timestamp": "t", "timestampScale": 1e-6, "timestampBits": 32}
+
+A ClockAligner fits host time = offset + slope * device time online, over a sliding
+window, and maps every sample to host time. Every stream of a process is aligned to
+the same monotonic clock, so streams from different devices line up.
+
+Packets reach the host after a variable delay, and are only stamped when they are
+decoded, so host times are late by a positive, long-tailed amount. The fit therefore
+follows the lower envelope of the (device, host) pairs instead of their mean: the
+window is split into segments, the least delayed pair of each segment is kept, and the
+line is the edge of their lower convex hull below the middle of the window, i.e. the
+line under every pair that is closest to them on average. Queueing and scheduling
+spikes, even a backlog lasting several segments, do not move it.
+"""
+import time
+from collections import deque
+import numpy as np
+
+#: Backward steps of the device clock, in seconds, larger than this are a restart, not a late packet.
+MAX_BACKSTEP = 1.0
+
+#: Add to time.monotonic() to get Unix time. Taken once so every stream uses the same offset.
+MONOTONIC_EPOCH = time.time() - time.monotonic()
+
+
+class ClockAligner:
+    """
+    Estimates offset and drift of a device clock against time.monotonic().
+    """
+
+    def __init__(self, column, scale=1.0, modulus=None, window=30.0, segments=16):
+        """
+        :param column: Column of the decoded values that holds the device timestamp.
+        :param scale: Seconds per timestamp tick.
+        :param modulus: Wrap-around of the timestamp in ticks, None if it never wraps.
+        :param window: Seconds of device time used for the fit.
+        :param segments: Number of window segments contributing one envelope point each.
+        """
+        self.column = column
+        self.scale = scale
+        self.modulus = modulus
+        self.window = window
+        self.segments = segments
+        self.slope = 1.0
+        self.intercept = None
+        self.delay = 0.0
+        self.resets = 0
+        self._pairs = deque()
+        self._lastRaw = None
+        self._wraps = 0
+        self._lastDevice = None
+
+    @classmethod
+    def fromDecoder(cls, decoder, channels, config=None):
+        """
+        Creates an aligner for a decoder that names a timestamp channel.
+
+        :param channels: Number of decoded channels.
+        :return: A ClockAligner, or None when the decoder has no usable timestamp channel.
+        """
+        column = timestamp_column(decoder)
+        if column is None or not 0 <= column < channels:
+            return None
+        section = (config or {}).get("clock", {})
+        return cls(column, float(getattr(decoder, "timestampScale", 1.0) or 1.0),
+                   getattr(decoder, "timestampModulus", None),
+                   float(section.get("window", 30.0)), int(section.get("segments", 16)))
+
+    def _unwrap(self, raw):
+        if self.modulus:
+            steps = np.diff(raw, prepend=raw[0] if self._lastRaw is None else self._lastRaw)
+            wraps = self._wraps + np.cumsum(steps < -self.modulus / 2)
+            self._lastRaw = float(raw[-1])
+            self._wraps = int(wraps[-1])
+            raw = raw + wraps * float(self.modulus)
+        return raw * self.scale
+
+    def update(self, values, hostTime=None):
+        """
+        Adds a decoded batch and maps its samples to host time.
+
+        :param values: Decoded array of shape (n, channels).
+        :param hostTime: time.monotonic() when the batch arrived, defaults to now. It is
+                         taken as the arrival time of the last sample.
+        :return: Array of n host times, on the time.monotonic() scale, or None for a batch
+                 without the timestamp column.
+        """
+        if not len(values):
+            return np.empty(0)
+        if values.shape[1] <= self.column:
+            return None
+        hostTime = time.monotonic() if hostTime is None else hostTime
+        device = self._unwrap(values[:, self.column].astype(np.float64))
+        if self._lastDevice is not None and device[0] < self._lastDevice - MAX_BACKSTEP:
+            # the device restarted its clock
+            self.resets += 1
+            self._pairs.clear()
+            self.intercept = None
+            self._lastDevice = None
+        newest = float(device[-1])
+        self._lastDevice = newest if self._lastDevice is None else max(newest, self._lastDevice)
+        self._pairs.append((newest, hostTime))
+        while self._pairs and self._lastDevice - self._pairs[0][0] > self.window:
+            self._pairs.popleft()
+        self._fit()
+        return self.toHost(device)
+
+    def _fit(self):
+        pairs = np.array(self._pairs)
+        device, lag = pairs[:, 0], pairs[:, 1] - pairs[:, 0]
+        start = device.min()
+        span = device.max() - start
+        if len(pairs) < 2 * self.segments or span <= 0:
+            # too little history for a drift estimate, only follow the least delayed pair
+            self.slope = 1.0
+            self.intercept = float(lag.min())
+        else:
+            segment = np.minimum(((device - start) / span * self.segments).astype(int), self.segments - 1)
+            order = np.lexsort((lag, segment))
+            _, first = np.unique(segment[order], return_index=True)
+            envelope = order[first]
+            slope, intercept = _hull_line(device[envelope], lag[envelope], device.mean())
+            self.slope = 1.0 + slope
+            self.intercept = intercept
+        self.delay = float(np.median(pairs[:, 1] - self.toHost(device)))
+
+    def toHost(self, device):
+        """
+        Maps device times in seconds to host time.monotonic() seconds.
+        """
+        return self.intercept + self.slope * device
+
+    @property
+    def driftPpm(self):
+        return (self.slope - 1.0) * 1e6
+
+    @property
+    def offset(self):
+        """
+        Host time minus device time at the newest sample, in seconds.
+        """
+        if self.intercept is None:
+            return None
+        return self.toHost(self._lastDevice) - self._lastDevice
+
+    def stats(self):
+        return {"offset": self.offset, "driftPpm": self.driftPpm, "delay": self.delay,
+                "pairs": len(self._pairs), "resets": self.resets}
+
+    def reset(self):
+        self.slope = 1.0
+        self.intercept = None
+        self.delay = 0.0
+        self._pairs.clear()
+        self._lastRaw = None
+        self._wraps = 0
+        self._lastDevice = None
+
+
+def _hull_line(x, y, at):
+    """
+    Returns (slope, intercept) of the lower convex hull edge of the points that spans x = at.
+
+    :param x: Increasing x coordinates.
+    """
+    hull = []
+    for point in zip(x.tolist(), y.tolist()):
+        # monotone chain, drop points that are not below the line to the new point
+        while len(hull) >= 2 and ((hull[-1][0] - hull[-2][0]) * (point[1] - hull[-2][1])
+                                  - (hull[-1][1] - hull[-2][1]) * (point[0] - hull[-2][0])) <= 0:
+            hull.pop()
+        hull.append(point)
+    if len(hull) < 2:
+        return 0.0, float(y.min())
+    for (x0, y0), (x1, y1) in zip(hull, hull[1:]):
+        if x1 >= at:
+            break
+    slope = (y1 - y0) / (x1 - x0)
+    return slope, y0 - slope * x0
+
+
+def timestamp_column(decoder):
+    """
+    Returns the column of the decoder's timestamp channel, or None.
+    """
+    timestamp = getattr(decoder, "timestamp", None)
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, str):
+        names = decoder.channels or []
+        return names.index(timestamp) if timestamp in names else None
+    return int(timestamp)
+
+
+def capture_names(decoder):
+    """
+    Channel names of captures, which end with a host_time column for decoders with a timestamp.
+    """
+    names = decoder.channels
+    if names and timestamp_column(decoder) is not None:
+        return list(names) + ["host_time"]
+    return names
+
+
+def format_clock_stats(stats):
+    """
+    Formats aligner stats as a status line fragment.
+    """
+    if stats["offset"] is None:
+        return "clock not aligned yet"
+    return (f"clock offset {stats['offset'] * 1000:.1f} ms, drift {stats['driftPpm']:.0f} ppm, "
+            f"delay {stats['delay'] * 1000:.1f} ms")
+
+
+def append_host_time(values, times):
+    """
+    Appends the aligned times, as Unix time, as the last column of a capture batch.
+    """
+    return np.column_stack([values, times + MONOTONIC_EPOCH])
+
+
+def append_host_time_text(lines, times):
+    """
+    Appends the aligned times, as Unix time, to capture lines.
+    """
+    return [f"{line},{t:.6f}" for line, t in zip(lines, (times + MONOTONIC_EPOCH).tolist())]
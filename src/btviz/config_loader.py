@@ -1,10 +1,14 @@
 import json
+from functools import lru_cache
 from pathlib import Path
 
+@lru_cache(maxsize=None)
 def load_config():
     """
     Load packaged config.json.
 
+    The parsed config is cached and shared by every caller, so treat it as read-only.
+
     Works for:
     - editable installs / normal python
     - wheels
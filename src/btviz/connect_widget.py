@@ -1,10 +1,10 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QLabel, QMessageBox, QTextEdit
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QMessageBox, QTextEdit, QLineEdit
 from PyQt5.QtCore import QTimer
 import qasync
 import asyncio
-import bleak
-from .display_widget import DisplayWidget
 from .utils import calculate_window
+from .list_models import EntryListModel, EntryFilterModel
+from .scan_widget import make_list_view
 
 import logging
 import traceback
@@ -17,8 +17,10 @@ class ConnectWidget(QWidget):
 
         self.device = device
 
-        self.servicesDict = {}
-        self.charDict = {}
+        self.servicesModel = EntryListModel(self)
+        self.servicesProxy = EntryFilterModel(self.servicesModel, self)
+        self.charModel = EntryListModel(self)
+        self.charProxy = EntryFilterModel(self.charModel, self)
 
         self.isDeviceDiscovered = False
         self.isConnected = False
@@ -33,6 +35,8 @@ class ConnectWidget(QWidget):
         self.connectButton = None
         self.servicesList = None
         self.charList = None
+        self.serviceFilter = None
+        self.charFilter = None
         self.charMonitorWindow = None
 
         self.initUI()
@@ -45,6 +49,13 @@ class ConnectWidget(QWidget):
             pass
         logger.log(level, msg)
 
+    def _filterInput(self, placeholder, proxy):
+        line = QLineEdit(self)
+        line.setPlaceholderText(placeholder)
+        line.setStyleSheet("background-color: #E7EBEB; color: black; border-radius: 5px; padding: 5px;")
+        line.textChanged.connect(proxy.setFilterFixedString)
+        return line
+
     def initUI(self):
         self.setWindowTitle("Device Connect")
         windowWidth, windowHeight, xPos, yPos = calculate_window(scale_width=0.7, scale_height=0.7)
@@ -89,29 +100,11 @@ class ConnectWidget(QWidget):
         service_list_label.setStyleSheet("font-size: 16px; font-weight: bold;")
         right_layout.addWidget(service_list_label)
 
-        self.servicesList = QListWidget(self)
-        self.servicesList.setStyleSheet("""
-            QListWidget {
-                background-color: #E7EBEB; 
-                color: black; 
-                padding: 2px;
-                border-radius: 5px;
-            }
-            QListWidget::item {
-                background-color: white;
-                margin: 3px;
-                padding: 10px;
-                border-radius: 8px;
-                border: 1px solid #4B9CD3;
-            }
-            QListWidget::item:selected {
-                background-color: #7BAFD4;
-                color: white;
-            }
-            QListWidget::item:hover {
-                background-color: #4B9CD3;
-            }
-        """)
+        self.serviceFilter = self._filterInput("Filter services", self.servicesProxy)
+        right_layout.addWidget(self.serviceFilter)
+
+        self.servicesList = make_list_view(self.servicesProxy, self)
+        self.servicesList.doubleClicked.connect(self.scanChar)
         right_layout.addWidget(self.servicesList)
 
         self.serviceButton = QPushButton('Read Service', self)
@@ -136,31 +129,11 @@ class ConnectWidget(QWidget):
         char_list_label.setStyleSheet("font-size: 16px; font-weight: bold;")
         right_layout.addWidget(char_list_label)
 
-        self.charList = QListWidget(self)
-        self.charList.setStyleSheet("""
-            QListWidget {
-                background-color: #E7EBEB; 
-                color: black; 
-                padding: 2px;
-                border-radius: 5px;
-                font-size: 14px; 
-                font-weight: bold;
-            }
-            QListWidget::item {
-                background-color: white;
-                margin: 3px;
-                padding: 10px;
-                border-radius: 8px;
-                border: 1px solid #4B9CD3;
-            }
-            QListWidget::item:selected {
-                background-color: #7BAFD4;
-                color: white;
-            }
-            QListWidget::item:hover {
-                background-color: #4B9CD3;
-            }
-        """)
+        self.charFilter = self._filterInput("Filter characteristics", self.charProxy)
+        right_layout.addWidget(self.charFilter)
+
+        self.charList = make_list_view(self.charProxy, self)
+        self.charList.doubleClicked.connect(self.charMonitor)
         right_layout.addWidget(self.charList)
 
         main_layout.addLayout(right_layout, 2)
@@ -204,6 +177,7 @@ class ConnectWidget(QWidget):
         try:
             self.connectButton.setEnabled(False)
             if self.device:
+                import bleak
                 self.m_client = bleak.BleakClient(self.device)
                 try:
                     await self.m_client.connect()
@@ -216,15 +190,10 @@ class ConnectWidget(QWidget):
                     return
                 
                 self.statusBox.append("Discovering services...")
-                i=0
-                
-                services = self.m_client.services
-                for service in services:
-                    i+=1
-                    self.servicesList.addItem(str(service))
-                    self.servicesDict[str(service)] = service
+                services = list(self.m_client.services)
+                self.servicesModel.upsertMany((str(service), service, str(service), None) for service in services)
 
-                self.statusBox.append(f"Found {i} services. Select one to read.")
+                self.statusBox.append(f"Found {len(services)} services. Select one to read.")
 
                 self.connectButton.setText('Disconnect')
                 self.connectButton.disconnect()
@@ -232,8 +201,6 @@ class ConnectWidget(QWidget):
                 self.connectButton.setEnabled(True)
 
                 self.serviceButton.setEnabled(True)
-
-                self.charList.doubleClicked.connect(self.charMonitor)
             else:
                 QMessageBox.warning(self, 'warning', 'Unable to connect')
                 self.close()
@@ -249,15 +216,12 @@ class ConnectWidget(QWidget):
         """
         try:
             self.serviceButton.setEnabled(False)
-            if self.servicesList.currentItem():
-                service_name = self.servicesList.currentItem().text()
-                self.statusBox.append(f"Reading characteristics for {service_name}...")
-                service = self.servicesDict[service_name]
+            service = self.servicesProxy.objectAt(self.servicesList.currentIndex())
+            if service is not None:
+                self.statusBox.append(f"Reading characteristics for {service}...")
                 chars = service.characteristics
-                self.charList.clear()
-                for char in chars:
-                    self.charList.addItem(str(char))
-                    self.charDict[str(char)] = char
+                self.charModel.clear()
+                self.charModel.upsertMany((str(char), char, str(char), None) for char in chars)
                 self.statusBox.append(f"Found {len(chars)} characteristics.")
             else:
                 QMessageBox.warning(self,'warning','Please select a valid option')
@@ -275,15 +239,15 @@ class ConnectWidget(QWidget):
         Opens a display widget for the selected characteristic to monitor its data.
         """
         # Safety Check: Did the user actually select an item?
-        if not self.charList.currentItem():
+        m_char = self.charProxy.objectAt(self.charList.currentIndex())
+        if m_char is None:
             QMessageBox.warning(self, 'Warning', 'Please select a characteristic first.')
             return
 
-        char_name = self.charList.currentItem().text()
-        self.statusBox.append(f"Monitoring characteristic: {char_name}")
-        m_char = self.charDict[char_name]
+        self.statusBox.append(f"Monitoring characteristic: {m_char}")
         
-        # Open the DisplayWidget you just upgraded
+        # Open the DisplayWidget you just upgraded; matplotlib is only loaded from here on
+        from .display_widget import DisplayWidget
         self.charMonitorWindow = DisplayWidget(self.m_client, m_char)
         self.charMonitorWindow.show()
 
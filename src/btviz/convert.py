@@ -0,0 +1,259 @@
+"""
+Batch conversion of archived captures, used by 'btviz convert'. Nothing here imports Qt.
+
+Whole directory trees are converted in parallel, one capture per worker process, into
+one of FORMATS:
+
+    bin     binary rows with a seek index, see capture.py; readable with btviz.io
+    csv     comma separated values under a header line of channel names
+    csv.gz  the same, gzip compressed
+    npz     NumPy archive with one compressed array per channel
+
+Conversions are written to a ".partial" file that is renamed when complete, so an
+interrupted run leaves no truncated output. Running again skips every capture whose
+output is newer than the capture, which makes a conversion resumable. Captures that
+were converted to binary before are read from their ".bin" copy.
+"""
+import fnmatch
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .capture import CaptureWriter, INDEX_SUFFIX, MAGIC, is_binary_capture, load_index
+from .io import open_capture, TextCapture
+
+FORMATS = {"bin": ".bin", "csv": ".csv", "csv.gz": ".csv.gz", "npz": ".npz"}
+PARTIAL = ".partial"
+#: Extensions of text captures, "" for names without one.
+TEXT_SUFFIXES = (".txt", ".dat", "")
+
+
+class ConvertResult:
+    """
+    Outcome of converting one capture.
+
+    :ivar samples: Samples written, 0 when skipped or failed.
+    :ivar bytes: Size of the source capture.
+    :ivar error: Error message, or None.
+    """
+
+    def __init__(self, source, target, samples=0, bytes=0, elapsed=0.0, skipped=False, error=None):
+        self.source = source
+        self.target = target
+        self.samples = samples
+        self.bytes = bytes
+        self.elapsed = elapsed
+        self.skipped = skipped
+        self.error = error
+
+
+def _is_capture(path, format):
+    """
+    Tells captures from the other files of a results tree, e.g. probe reports, indexes and outputs.
+    """
+    if PARTIAL in os.path.basename(path):
+        return False
+    if is_binary_capture(path):
+        # earlier conversions are not converted again, binary captures are sources for the other formats
+        if format == "bin":
+            return False
+        try:
+            with open(path, "rb") as fh:
+                return fh.read(len(MAGIC)) == MAGIC
+        except OSError:
+            return False
+    return os.path.splitext(path)[1].lower() in TEXT_SUFFIXES
+
+
+def find_captures(paths, format, pattern="*"):
+    """
+    Lists the captures to convert.
+
+    :param paths: Capture files and directories, directories are searched recursively for text
+                  captures (".txt", ".dat" or no extension) and binary captures.
+    :param format: Target format, its own outputs are never listed as sources.
+    :param pattern: Glob the file names must match.
+    :return: List of (capture path, root directory) in a stable order.
+    """
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append((path, os.path.dirname(path)))
+            continue
+        for directory, subdirs, files in os.walk(path):
+            subdirs.sort()
+            for name in sorted(files):
+                if fnmatch.fnmatch(name, pattern) and _is_capture(os.path.join(directory, name), format):
+                    found.append((os.path.join(directory, name), path))
+    return found
+
+
+def target_path(source, root, format, outputDir=None):
+    """
+    Returns the output path of a capture: next to it, or at the same relative path under outputDir.
+    """
+    stem, ext = os.path.splitext(source)
+    if ext in FORMATS.values() or ext in (".txt", ".dat"):
+        source = stem
+    if outputDir is not None:
+        source = os.path.join(outputDir, os.path.relpath(source, root))
+    return source + FORMATS[format]
+
+
+def _index_times(path):
+    """
+    Returns a function interpolating the write time of a sample from a capture's index, NaN if unknown.
+    """
+    entries, _ = load_index(path)
+    timed = entries[np.isfinite(entries["time"])] if len(entries) else entries
+    if not len(timed):
+        return lambda sample: np.nan
+    return lambda sample: float(np.interp(sample, timed["sample"], timed["time"]))
+
+
+def _write_binary(capture, partial, indexEvery):
+    names = capture.names if capture.names and len(capture.names) == capture.channels else None
+    writer = CaptureWriter(partial, indexEvery, names)
+    timeOf = _index_times(capture.path)
+    samples = 0
+    try:
+        for rows in capture.chunks():
+            # one write per index interval keeps the original write times in the new index
+            start = 0
+            while start < len(rows):
+                stop = min(len(rows), start + indexEvery - (samples + start) % indexEvery)
+                writer.writeValues(rows[start:stop], timeOf(samples + start))
+                start = stop
+            samples += len(rows)
+    finally:
+        writer.close()
+    return samples
+
+
+def _write_csv(capture, partial, compress):
+    samples = 0
+    # level 6 compresses nearly as well as the default 9 at several times the speed
+    fh = gzip.open(partial, "wt", compresslevel=6, encoding="utf-8", newline="") if compress else \
+        open(partial, "w", encoding="utf-8", newline="")
+    with fh:
+        fh.write(",".join(capture.names or []) + "\n")
+        if isinstance(capture, TextCapture):
+            # the lines already are CSV, copy them without parsing
+            for line in capture.lines():
+                if line and not line.startswith("#"):
+                    fh.write(line + "\n")
+                    samples += 1
+        else:
+            for rows in capture.chunks():
+                fh.write("".join(",".join(map(str, row)) + "\n" for row in rows.tolist()))
+                samples += len(rows)
+    return samples
+
+
+def _write_npz(capture, partial):
+    values = capture.read()
+    names = capture.names if capture.names and len(capture.names) == values.shape[1] else \
+        [f"ch{i}" for i in range(values.shape[1])]
+    with open(partial, "wb") as fh:
+        np.savez_compressed(fh, **{name: np.ascontiguousarray(values[:, i]) for i, name in enumerate(names)})
+    return len(values)
+
+
+def _remove_partial(partial):
+    for leftover in (partial, partial + INDEX_SUFFIX):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+
+def convert_capture(source, target, format, indexEvery=4096):
+    """
+    Converts one capture, writing target only once the conversion is complete.
+
+    :return: Number of samples converted.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format '{format}', expected one of {', '.join(FORMATS)}")
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    # the partial name keeps the suffix, which selects binary captures
+    stem = target[:-len(FORMATS[format])]
+    partial = stem + PARTIAL + FORMATS[format]
+    _remove_partial(partial)
+    try:
+        with open_capture(source) as capture:
+            if format == "bin":
+                samples = _write_binary(capture, partial, indexEvery)
+            elif format == "npz":
+                samples = _write_npz(capture, partial)
+            else:
+                samples = _write_csv(capture, partial, format == "csv.gz")
+    except BaseException:
+        _remove_partial(partial)
+        raise
+    if format == "bin":
+        os.replace(partial + INDEX_SUFFIX, target + INDEX_SUFFIX)
+    os.replace(partial, target)
+    return samples
+
+
+def _convert_job(source, target, format, indexEvery, force):
+    size = os.path.getsize(source)
+    if not force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+        return ConvertResult(source, target, bytes=size, skipped=True)
+    start = time.perf_counter()
+    try:
+        samples = convert_capture(source, target, format, indexEvery)
+    except (OSError, ValueError) as e:
+        return ConvertResult(source, target, bytes=size, error=str(e))
+    return ConvertResult(source, target, samples, size, time.perf_counter() - start)
+
+
+def convert_tree(paths, format, outputDir=None, workers=None, pattern="*", force=False, indexEvery=4096,
+                 progress=None):
+    """
+    Converts every capture under paths, in parallel.
+
+    :param paths: Capture files and directories.
+    :param format: One of FORMATS.
+    :param outputDir: Mirror the directory structure under this directory instead of writing next to the captures.
+    :param workers: Worker processes, None for one per CPU, 1 to convert in this process.
+    :param pattern: Glob the capture file names must match.
+    :param force: Convert again even when the output is up to date.
+    :param indexEvery: Samples between index entries of binary outputs.
+    :param progress: Callable receiving (done, total, ConvertResult) as captures finish.
+    :return: List of ConvertResult in completion order.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format '{format}', expected one of {', '.join(FORMATS)}")
+    targets = {}
+    for source, root in find_captures(paths, format, pattern):
+        target = target_path(source, root, format, outputDir)
+        # a capture converted to binary before is read from the faster binary copy
+        if target not in targets or is_binary_capture(source):
+            targets[target] = source
+    jobs = [(source, target, format, indexEvery, force) for target, source in targets.items()]
+    results = []
+
+    def finished(result):
+        results.append(result)
+        if progress is not None:
+            progress(len(results), len(jobs), result)
+
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            finished(_convert_job(*job))
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(_convert_job, *job) for job in jobs]):
+            finished(future.result())
+    return results
+
+
+def format_convert_summary(results, elapsed):
+    converted = [r for r in results if not r.skipped and r.error is None]
+    size = sum(r.bytes for r in converted)
+    failed = sum(1 for r in results if r.error is not None)
+    skipped = sum(1 for r in results if r.skipped)
+    return (f"Converted {len(converted)} captures ({skipped} up to date, {failed} failed), "
+            f"{sum(r.samples for r in converted)} samples, {size / 1e6:.1f} MB in {elapsed:.1f} s "
+            f"({size / 1e6 / elapsed if elapsed else 0:.1f} MB/s)")
@@ -0,0 +1,195 @@
+import time
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QSpinBox
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from .render_clock import shared_clock
+from .utils import calculate_window
+
+
+class DashboardPanel:
+    """
+    A single dashboard cell plotting every channel of one stream on one axes.
+
+    Streams with aligned device timestamps are plotted against host time, in seconds
+    since the dashboard opened, so panels of different devices line up.
+    """
+
+    def __init__(self, title, getData, getTimes=None, origin=0.0):
+        """
+        Initializes the panel.
+
+        :param title: Title shown above the axes.
+        :param getData: Callable returning the list of per-channel sample sequences.
+        :param getTimes: Callable returning the host times of the newest samples, or None.
+        :param origin: time.monotonic() shown as zero on the time axis.
+        """
+        self.title = title
+        self.getData = getData
+        self.getTimes = getTimes
+        self.origin = origin
+        self.figure = Figure(tight_layout=True)
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title(title, fontsize=9)
+        self.ax.tick_params(labelsize=7)
+        self.lines = []
+
+    def render(self):
+        """
+        Pushes the current samples into the line artists and redraws the canvas.
+        """
+        dataframe = self.getData()
+        while len(self.lines) < len(dataframe):
+            line, = self.ax.plot([], [], linewidth=1)
+            self.lines.append(line)
+        times = self.getTimes() if self.getTimes is not None else None
+        if times:
+            times = np.fromiter(times, dtype=np.float64, count=len(times)) - self.origin
+            self.ax.set_xlabel("Host time (s)", fontsize=7)
+        for line, channel in zip(self.lines, dataframe):
+            if times is not None and len(times) >= len(channel):
+                # the newest samples have the newest times
+                line.set_data(times[len(times) - len(channel):], channel)
+            else:
+                line.set_data(range(len(channel)), channel)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
+
+
+class DashboardWidget(QWidget):
+    """
+    A single window that tiles the channels of many characteristics and devices.
+
+    All panels are redrawn by the shared render clock, and only the panels whose
+    stream received data since the previous tick are redrawn.
+    """
+
+    def __init__(self):
+        """
+        Initializes the dashboard widget.
+        """
+        super().__init__()
+
+        self.panels = {}
+        self.clock = shared_clock()
+        self.origin = time.monotonic()
+
+        self.columnsSpin = None
+        self.intervalSpin = None
+        self.grid = None
+
+        self.initUI()
+
+    def initUI(self):
+        """
+        Initializes the user interface for the dashboard widget.
+        """
+        self.setWindowTitle('Dashboard')
+        window_width, window_height, x_pos, y_pos = calculate_window(scale_width=0.8, scale_height=0.8)
+        self.setGeometry(x_pos, y_pos, window_width, window_height)
+        self.setStyleSheet("background-color: #4B9CD3; color: white;")
+
+        label_style = "font-size: 14px; font-weight: bold; color: white;"
+        spin_style = "background-color: #E7EBEB; color: black; border-radius: 5px; padding: 2px;"
+
+        main_layout = QVBoxLayout(self)
+
+        header_layout = QHBoxLayout()
+        columns_label = QLabel("Columns")
+        columns_label.setStyleSheet(label_style)
+        self.columnsSpin = QSpinBox()
+        self.columnsSpin.setRange(1, 8)
+        self.columnsSpin.setValue(2)
+        self.columnsSpin.setStyleSheet(spin_style)
+        self.columnsSpin.valueChanged.connect(self.relayout)
+
+        interval_label = QLabel("Refresh interval (ms)")
+        interval_label.setStyleSheet(label_style)
+        self.intervalSpin = QSpinBox()
+        self.intervalSpin.setRange(10, 2000)
+        self.intervalSpin.setValue(self.clock.interval())
+        self.intervalSpin.setStyleSheet(spin_style)
+        self.intervalSpin.valueChanged.connect(self.clock.setInterval)
+
+        header_layout.addWidget(columns_label)
+        header_layout.addWidget(self.columnsSpin)
+        header_layout.addWidget(interval_label)
+        header_layout.addWidget(self.intervalSpin)
+        header_layout.addStretch()
+
+        self.grid = QGridLayout()
+        main_layout.addLayout(header_layout)
+        main_layout.addLayout(self.grid, 1)
+
+    def addStream(self, key, title, getData, getTimes=None):
+        """
+        Adds a stream to the dashboard.
+
+        :param key: Hashable identifier of the stream, used by markDirty() and removeStream().
+        :param title: Title shown on the panel.
+        :param getData: Callable returning the list of per-channel sample sequences.
+        :param getTimes: Callable returning the aligned host times of the newest samples, or None.
+        """
+        if key in self.panels:
+            return
+        panel = DashboardPanel(title, getData, getTimes, self.origin)
+        self.panels[key] = panel
+        self.clock.register(panel, panel.render)
+        self.relayout()
+
+    def removeStream(self, key):
+        """
+        Removes a stream and its panel from the dashboard.
+        """
+        panel = self.panels.pop(key, None)
+        if panel is None:
+            return
+        self.clock.unregister(panel)
+        self.grid.removeWidget(panel.canvas)
+        panel.canvas.deleteLater()
+        self.relayout()
+
+    def markDirty(self, key):
+        """
+        Flags the panel of a stream for redraw on the next clock tick.
+        """
+        panel = self.panels.get(key)
+        if panel is not None:
+            self.clock.markDirty(panel)
+
+    def relayout(self):
+        """
+        Places the panels on the grid according to the selected column count.
+        """
+        columns = self.columnsSpin.value()
+        for panel in self.panels.values():
+            self.grid.removeWidget(panel.canvas)
+        for i, panel in enumerate(self.panels.values()):
+            self.grid.addWidget(panel.canvas, i // columns, i % columns)
+
+    def closeEvent(self, event):
+        """
+        Stops redrawing the panels once the dashboard is closed.
+        """
+        global _dashboard
+        for panel in self.panels.values():
+            self.clock.unregister(panel)
+        self.panels = {}
+        if _dashboard is self:
+            _dashboard = None
+        event.accept()
+
+
+_dashboard = None
+
+
+def get_dashboard():
+    """
+    Returns the open dashboard window, creating it on first use.
+    """
+    global _dashboard
+    if _dashboard is None:
+        _dashboard = DashboardWidget()
+    return _dashboard
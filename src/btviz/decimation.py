@@ -0,0 +1,86 @@
+"""
+Display decimation driven by the measured input rate. Nothing here imports Qt.
+
+Only the display path is decimated; saving, history, taps and triggers always see
+every sample.
+"""
+import math
+import time
+
+
+class AdaptiveDecimator:
+    """
+    Measures the incoming sample rate and picks the decimation ratio that brings it
+    down to a target number of displayed points per second.
+
+    The rate is a moving average over measurement windows, and the ratio only changes
+    when it is off by more than the hysteresis, so a jittery link does not make the
+    plot speed flicker.
+    """
+
+    def __init__(self, targetRate=250.0, window=0.5, smoothing=0.5, hysteresis=0.25, maxRatio=10000):
+        """
+        :param targetRate: Displayed points per second and channel to aim for.
+        :param window: Seconds per rate measurement.
+        :param smoothing: Weight of a new measurement in the moving average, 1 uses only the last window.
+        :param hysteresis: Relative change of the ideal ratio needed before the ratio is changed.
+        :param maxRatio: Largest ratio ever used.
+        """
+        self.targetRate = targetRate
+        self.window = window
+        self.smoothing = smoothing
+        self.hysteresis = hysteresis
+        self.maxRatio = maxRatio
+        self.rate = None
+        self.ratio = 1
+        self._count = 0
+        self._start = None
+
+    @classmethod
+    def fromConfig(cls, config):
+        """
+        Creates a decimator from the "display" section of config.json.
+        """
+        section = config.get("display", {})
+        return cls(float(section.get("targetRate", 250.0)), float(section.get("rateWindow", 0.5)))
+
+    def update(self, count, now=None):
+        """
+        Records count newly arrived samples.
+
+        :param now: Monotonic time in seconds, defaults to time.monotonic().
+        :return: The current ratio.
+        """
+        now = time.monotonic() if now is None else now
+        if self._start is None:
+            self._start = now
+        self._count += count
+        elapsed = now - self._start
+        if elapsed >= self.window:
+            measured = self._count / elapsed
+            if self.rate is None:
+                self.rate = measured
+            else:
+                self.rate += self.smoothing * (measured - self.rate)
+            self._count = 0
+            self._start = now
+            self._adapt()
+        return self.ratio
+
+    def _adapt(self):
+        ideal = min(self.maxRatio, max(1.0, self.rate / self.targetRate))
+        if abs(math.log(ideal / self.ratio)) > math.log1p(self.hysteresis):
+            self.ratio = max(1, min(self.maxRatio, round(ideal)))
+
+    @property
+    def displayRate(self):
+        """
+        Points per second and channel that reach the display, or None before the first measurement.
+        """
+        return None if self.rate is None else self.rate / self.ratio
+
+    def reset(self):
+        self.rate = None
+        self.ratio = 1
+        self._count = 0
+        self._start = None
@@ -0,0 +1,101 @@
+"""
+Optional process pool decoding for CPU heavy decoders. Nothing here imports Qt.
+
+Payload batches are decoded in worker processes, outside the GIL of the GUI, and the
+results are handed back strictly in submission order. Decoders need no changes: each
+worker looks the decoder up by name, so entry point plugins work as well.
+
+Worker counts and batch sizes are configured per decoder in config.json:
+
+    "decodePool": {
+        "default": {"workers": 2, "batchSize": 256},
+        "My Compressed Decoder": {"workers": 6, "batchSize": 1024}
+    }
+"""
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .config_loader import load_config
+from .decoders import available_decoders, decode
+
+_workerDecoders = None
+
+
+def _initWorker():
+    global _workerDecoders
+    _workerDecoders = available_decoders(load_config())
+
+
+def _decodeInWorker(name, payloads):
+    return decode(_workerDecoders[name], payloads)
+
+
+def pool_options(decoderName, config):
+    """
+    Returns (workers, batchSize) for a decoder from the "decodePool" section of config.json.
+    """
+    section = config.get("decodePool", {})
+    options = dict(section.get("default", {}))
+    options.update(section.get(decoderName, {}))
+    workers = int(options.get("workers", max(1, (os.cpu_count() or 2) - 1)))
+    return max(1, workers), max(1, int(options.get("batchSize", 256)))
+
+
+class DecodePool:
+    """
+    Decodes payload batches of one decoder in a pool of worker processes.
+    """
+
+    def __init__(self, decoderName, workers=None, batchSize=None, config=None):
+        """
+        :param decoderName: Name of the decoder, as listed by available_decoders().
+        :param workers: Number of worker processes. Defaults to the config.json setting.
+        :param batchSize: Payloads per worker task. Defaults to the config.json setting.
+        :param config: The loaded config dictionary.
+        """
+        config = config or load_config()
+        defaultWorkers, defaultBatch = pool_options(decoderName, config)
+        self.decoderName = decoderName
+        self.workers = workers or defaultWorkers
+        self.batchSize = batchSize or defaultBatch
+        # a few batches per worker keep every core busy without unbounded buffering
+        self.maxInFlight = self.workers * 4
+        # spawn, never fork a process that runs a Qt event loop
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_initWorker)
+        self._futures = deque()
+        #: Payloads whose batches have been collected.
+        self.completed = 0
+
+    def __len__(self):
+        return len(self._futures)
+
+    def hasCapacity(self):
+        return len(self._futures) < self.maxInFlight
+
+    def submit(self, payloads):
+        """
+        Splits payloads into batches and queues them for decoding.
+        """
+        payloads = [bytes(p) for p in payloads]
+        for i in range(0, len(payloads), self.batchSize):
+            chunk = payloads[i:i + self.batchSize]
+            self._futures.append((len(chunk), self._executor.submit(_decodeInWorker, self.decoderName, chunk)))
+
+    def collect(self, wait=False):
+        """
+        Returns the decoded batches that are ready, in submission order.
+
+        :param wait: Block until every submitted batch is decoded.
+        """
+        ready = []
+        while self._futures and (wait or self._futures[0][1].done()):
+            count, future = self._futures.popleft()
+            ready.append(future.result())
+            self.completed += count
+        return ready
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._futures.clear()
@@ -0,0 +1,211 @@
+"""
+Decoder plugins.
+
+A decoder turns a batch of raw notification payloads into a 2D array with one row per
+payload and one column per output channel. Besides the decoders built from the
+"decodeOptions" of config.json and the two string decoders, third party packages can
+register decoders under the "btviz.decoders" entry point group:
+
+    [project.entry-points."btviz.decoders"]
+    my_sensor = "my_package.decoders:MySensorDecoder"
+
+The entry point may name a Decoder subclass, a Decoder instance, or a callable
+returning a Decoder or a list of Decoders.
+"""
+import logging
+import struct
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "btviz.decoders"
+
+
+class DecodeError(ValueError):
+    pass
+
+
+class DecodedBatch:
+    """
+    The result of decoding a batch of payloads.
+
+    :ivar values: Array of shape (n, channels), or None for text-only decoders.
+    :ivar text: One display/capture line per decoded payload.
+    :ivar errors: Number of payloads that could not be decoded and were skipped.
+    """
+
+    def __init__(self, values, text, errors=0):
+        self.values = values
+        self.text = text
+        self.errors = errors
+
+
+class Decoder:
+    """
+    Base class of decoder plugins.
+
+    Subclasses set name and channels and implement decode_batch(). decode_batch() may
+    return a plain array of shape (n, len(channels)) or a DecodedBatch when it needs to
+    report skipped payloads or custom text.
+    """
+    #: Name shown in the decode method dropdown.
+    name = None
+    #: Names of the output channels, or None when the count is only known from the data.
+    channels = None
+    #: False for decoders that only produce text, which are never plotted.
+    numeric = True
+    #: Name or column number of a rolling packet counter channel, checked for lost packets.
+    sequence = None
+    #: Wrap-around of the sequence counter, e.g. 256 for a uint8 counter, None if it never wraps.
+    sequenceModulus = None
+    #: Name or column number of a device timestamp channel, aligned to the host clock.
+    timestamp = None
+    #: Seconds per timestamp tick.
+    timestampScale = 1.0
+    #: Wrap-around of the timestamp in ticks, None if it never wraps.
+    timestampModulus = None
+
+    def decode_batch(self, payloads):
+        """
+        Decodes a list of payloads.
+
+        :param payloads: List of bytes-like notification values.
+        :return: Array of shape (n, channels) or a DecodedBatch.
+        """
+        raise NotImplementedError
+
+    def format_text(self, values):
+        """
+        Formats decoded rows as capture lines, one line per row.
+        """
+        rows = values.tolist()
+        if values.shape[1] == 1:
+            return [str(row[0]) for row in rows]
+        return [",".join(str(v) for v in row) for row in rows]
+
+
+class StructDecoder(Decoder):
+    """
+    Decodes fixed size binary packets with a struct format string, e.g. "<I" or "<hhh".
+    """
+
+    def __init__(self, name, format, channels=None, sequence=None, sequenceBits=None, timestamp=None,
+                 timestampScale=1.0, timestampBits=None):
+        self.name = name
+        self.sequence = sequence
+        self.sequenceModulus = 1 << sequenceBits if sequenceBits else None
+        self.timestamp = timestamp
+        self.timestampScale = timestampScale
+        self.timestampModulus = 1 << timestampBits if timestampBits else None
+        self._struct = struct.Struct(format)
+        fields = len(self._struct.unpack(bytes(self._struct.size)))
+        self.channels = list(channels) if channels else (
+            ["value"] if fields == 1 else [f"ch{i}" for i in range(fields)])
+
+    def decode_batch(self, payloads):
+        size = self._struct.size
+        valid = [bytes(p[:size]) for p in payloads if len(p) >= size]
+        if not valid:
+            return DecodedBatch(np.empty((0, len(self.channels))), [], len(payloads))
+        # one unpack call for the whole batch instead of one per payload
+        values = np.array(list(self._struct.iter_unpack(b"".join(valid))))
+        return DecodedBatch(values, self.format_text(values), len(payloads) - len(valid))
+
+
+class StringDecoder(Decoder):
+    """
+    Shows payloads as UTF-8 text without plotting them.
+    """
+    name = "String Literal"
+    channels = []
+    numeric = False
+
+    def decode_batch(self, payloads):
+        text = [bytes(p).decode("UTF-8", errors="replace") for p in payloads]
+        return DecodedBatch(None, text)
+
+
+class CommaDelimitedDecoder(Decoder):
+    """
+    Decodes UTF-8 packets of comma separated numbers, one channel per field.
+    """
+    name = "Comma Delimited String Literal"
+
+    def decode_batch(self, payloads):
+        text = []
+        rows = []
+        errors = 0
+        width = None
+        for p in payloads:
+            try:
+                line = bytes(p).decode("UTF-8").rstrip("\r\n\x00")
+                row = [float(field.replace('\x00', '')) for field in line.split(",")]
+            except (UnicodeDecodeError, ValueError):
+                errors += 1
+                continue
+            if width is None:
+                width = len(row)
+            if len(row) != width:
+                errors += 1
+                continue
+            text.append(line)
+            rows.append(row)
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), width or 0)
+        return DecodedBatch(values, text, errors)
+
+
+def decode(decoder, payloads):
+    """
+    Runs a decoder on a batch and normalizes its result to a DecodedBatch.
+    """
+    result = decoder.decode_batch(payloads)
+    if isinstance(result, DecodedBatch):
+        return result
+    if result is None:
+        raise DecodeError(f"Decoder '{decoder.name}' returned no data")
+    values = np.asarray(result)
+    if values.ndim == 1:
+        values = values.reshape(-1, 1)
+    return DecodedBatch(values, decoder.format_text(values))
+
+
+def _load_plugins():
+    from importlib.metadata import entry_points
+    plugins = []
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            obj = ep.load()
+            if isinstance(obj, type) and issubclass(obj, Decoder):
+                obj = obj()
+            elif not isinstance(obj, Decoder) and callable(obj):
+                obj = obj()
+            found = obj if isinstance(obj, (list, tuple)) else [obj]
+            for decoder in found:
+                if not isinstance(decoder, Decoder) or not decoder.name:
+                    raise TypeError(f"{decoder!r} is not a named Decoder")
+                plugins.append(decoder)
+        except Exception:
+            logger.exception("Failed to load decoder plugin '%s'", ep.name)
+    return plugins
+
+
+def available_decoders(config):
+    """
+    Lists every decoder: config.json formats, the string decoders, then entry point plugins.
+
+    :param config: The loaded config dictionary.
+    :return: Dict of decoder name to Decoder, in display order.
+    """
+    decoders = {}
+    for option in config['decodeOptions']:
+        decoders[option['name']] = StructDecoder(option['name'], option['format'], option.get('channels'),
+                                                 option.get('sequence'), option.get('sequenceBits'),
+                                                 option.get('timestamp'), option.get('timestampScale', 1.0),
+                                                 option.get('timestampBits'))
+    for decoder in (StringDecoder(), CommaDelimitedDecoder()):
+        decoders[decoder.name] = decoder
+    for decoder in _load_plugins():
+        if decoder.name in decoders:
+            logger.warning("Decoder plugin '%s' shadows an existing decoder", decoder.name)
+        decoders[decoder.name] = decoder
+    return decoders
@@ -0,0 +1,87 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QPlainTextEdit, QMessageBox
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont
+from .loop_monitor import get_monitor, get_profiler
+
+
+class DiagnosticsWidget(QWidget):
+    """
+    Shows event loop lag and the slowest callbacks, and starts or stops profiling captures.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.monitor = get_monitor()
+        self.profiler = get_profiler()
+        self.reportText = QPlainTextEdit()
+        self.profileButton = QPushButton()
+        self.saveButton = QPushButton("Save Report")
+        self.resetButton = QPushButton("Reset")
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Diagnostics")
+        self.resize(760, 480)
+        self.setStyleSheet("background-color: #4B9CD3; color: white;")
+
+        button_style = """
+        QPushButton {
+            background-color: #4B9CD3;
+            color: white;
+            border: .5px solid white;
+            border-radius: 5px;
+            font-size: 14px;
+            font-weight: bold;
+            padding: 5px;
+        }
+        QPushButton:hover {
+            background-color: #13294B;
+        }
+        """
+        self.reportText.setReadOnly(True)
+        self.reportText.setFont(QFont("Monospace"))
+        self.reportText.setStyleSheet("background-color: #E7EBEB; color: black; border-radius: 5px; padding: 5px;")
+
+        self.profileButton.clicked.connect(self.toggleProfiling)
+        self.saveButton.clicked.connect(self.saveReport)
+        self.resetButton.clicked.connect(self.reset)
+        buttons = QHBoxLayout()
+        for button in (self.profileButton, self.saveButton, self.resetButton):
+            button.setStyleSheet(button_style)
+            buttons.addWidget(button)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.reportText)
+        layout.addLayout(buttons)
+
+        self._timer.start(1000)
+        self.refresh()
+
+    def refresh(self):
+        self.profileButton.setText("Stop Profiling" if self.profiler.running else "Start Profiling")
+        text = self.monitor.report()
+        if not self.monitor.running:
+            text = "The loop monitor is not running.\n\n" + text
+        self.reportText.setPlainText(text)
+
+    def toggleProfiling(self):
+        if self.profiler.running:
+            path = self.profiler.stop()
+            QMessageBox.information(self, 'Info', f'Profile written to {path}')
+        else:
+            self.profiler.start()
+        self.refresh()
+
+    def saveReport(self):
+        path = self.monitor.writeReport()
+        QMessageBox.information(self, 'Info', f'Report written to {path}')
+
+    def reset(self):
+        self.monitor.reset()
+        self.refresh()
+
+    def closeEvent(self, event):
+        self._timer.stop()
+        super().closeEvent(event)
@@ -1,45 +1,77 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QPlainTextEdit, QMessageBox, QComboBox, QInputDialog, QLabel, QLineEdit
-from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QPlainTextEdit, QMessageBox, QComboBox, QInputDialog, QLabel, QLineEdit, QCheckBox, QFileDialog
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 import qasync
-import struct
 from collections import deque
+import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from .utils import calculate_window
 from .plot_settings_widget import PlotSettingsWidget
 from .config_loader import load_config
-import datetime
+from .decoders import available_decoders, decode
+from .decode_pool import DecodePool
+import asyncio
 import datetime
 import os
-from PyQt5.QtCore import QThread, pyqtSignal
+import time
+from PyQt5.QtCore import QThread, QMetaObject
 from .save_thread import SaveThread
+from .capture import capture_rows
+from .bounded_queue import queue_from_config, format_stats
+from .render_clock import shared_clock
+from .dashboard_widget import get_dashboard
+from .history_store import HistoryStore
+from .history_widget import HistoryWidget
+from .channel_stats import ChannelStats
+from .stats_widget import StatsWidget
+from .write_queue import WriteQueue
+from .transports import BleTransport
+from .trigger import Trigger, save_segment
+from .trigger_settings_widget import TriggerSettingsWidget
+from .remote_plot_widget import RemotePlotView
+from .shm_ring import default_tap_name, open_tap
+from .stream_server import shared_server
+from .loop_monitor import timed
+from .profiles import Profile, load_profiles, save_profile
+from .decimation import AdaptiveDecimator
+from .stacked_traces import StackedTraces, parse_scales
+from .sequence import SequenceTracker, format_sequence_stats, insert_gap_markers
+from .probe import Probe, default_steps, format_step, save_probe
+from .rules import RuleEngine, LatencyStats, load_rules, rules_path, format_latency
+from .clock_sync import ClockAligner, capture_names, format_clock_stats
 
 
 class DisplayWidget(QWidget):
-    incoming = pyqtSignal(str)
     """
     A widget for displaying BLE characteristic data and plotting it in real-time.
     """
+    #: Emitted once the widget has stopped its transport on close.
+    closed = pyqtSignal()
 
     
-    def __init__(self, client, char):
+    def __init__(self, client=None, char=None, transport=None):
         """
         Initializes the display widget.
 
         :param client: A BleakClient connected to the BLE device.
         :param char: The characteristic to monitor and display.
+        :param transport: A local Transport (UDP, serial, pipe) used instead of client and char.
+                          The widget closes it when it is closed.
         """
         super().__init__()
 
         self.config = None
+        self.decoders = {}
         self._thread = None
         self._decoderthread = None
 
         self.m_client = client
         self.m_char = char
+        self._ownsTransport = transport is not None
+        self.transport = transport if transport is not None else BleTransport(client, char)
 
-        self.dataframe = [deque(maxlen= 100)]
+        self.windowLength = 100
+        self.dataframe = [deque(maxlen=self.windowLength)]
 
         self.isNotif = False
         self.isRead = False
@@ -55,9 +87,30 @@ class DisplayWidget(QWidget):
         self._xlabel = None
         self._ylabel = None
         self._canvas = None
+        self._remoteView = None
+        self._stacked = None
+        # per-channel gain and offset of the stacked traces, as entered in the plot settings
+        self.traceScales = ""
+        self.remoteRenderCheck = None
+        self.stackedCheck = None
         self.animateInterval = None
-        self._animation = None
+        self.clock = shared_clock()
         self.isPlotting = False
+        self.isOnDashboard = False
+        self._dashboard = None
+
+        self.history = None
+        self.historyWindow = None
+        self.channelStats = None
+        self.statsWindow = None
+
+        # Pipeline stages: notification -> ingestQueue -> decode -> displayQueue -> plot,
+        # and decode -> save queue -> SaveThread. All are bounded, see "queues" in config.json.
+        self.ingestQueue = None
+        self.displayQueue = None
+        self._drainScheduled = False
+        self._statsTimer = None
+        self.pipelineLabel = None
         self._timer = None
 
         self.notifButton = None
@@ -68,13 +121,60 @@ class DisplayWidget(QWidget):
         self.intervalDropdown = None
         self.plotResampleDropdown = None
         self.settingsButton = None
+        self.dashboardButton = None
+        self.historyButton = None
+        self.statsButton = None
+        self.tapButton = None
+        self.tap = None
+        self.serverButton = None
+        self.server = None
+        self.sequence = None
+        self.clockAligner = None
+        self.displayTimes = None
 
         self.isSaving = False
+        self.saveFilename = None
+        # the capture name of the launched profile, saveFilename is the per-stream name derived from it
+        self.profileSave = None
+        self.profileButton = None
+        self._plotOnData = False
+
+        self.trigger = None
+        self.triggerSave = False
+        self.triggerPrefix = None
+        self.triggerEvents = 0
+        self.triggerWindow = None
+        self.triggerButton = None
+
+        self.writeQueue = WriteQueue(self.transport)
+        self.noResponseCheck = None
+        self.sendFileButton = None
+        self.runScriptButton = None
 
         self.resamplecounter = 0
         self.resampleratio = 1
-
+        self.decimator = None
+        self._decodeWarned = False
+
+        self.parallelCheck = None
+        self.decodePool = None
+        self._poolTimer = None
+
+        # Alert rules, see rules.py. Latencies are measured from the first notification of a batch.
+        self.rulesCheck = None
+        self.rules = None
+        self.ruleEngine = None
+        self.alerts = 0
+        self.decideLatency = LatencyStats()
+        self.writeLatency = LatencyStats()
+        self._ruleWrites = set()
+        self.lastAlert = None
+        self._firstArrival = None
+        self._batchArrival = None
+
+        # None picks the ratio from the measured input rate
         self.resampleratiodict = {
+            'Auto':None,
             '1:1':1,
             '5:1':5,
             '10:1':10,
@@ -141,10 +241,11 @@ class DisplayWidget(QWidget):
         # Dropdown for selecting data decoding method
         self.decodeMethodDropdown = QComboBox()
         self.config = load_config()
-        for option in self.config['decodeOptions']:
-            self.decodeMethodDropdown.addItem(option['name'])
-        self.decodeMethodDropdown.addItem("String Literal")
-        self.decodeMethodDropdown.addItem("Comma Delimited String Literal")
+        self.decoders = available_decoders(self.config)
+        self.ingestQueue = queue_from_config("ingest", self.config)
+        self.displayQueue = queue_from_config("display", self.config)
+        for name in self.decoders:
+            self.decodeMethodDropdown.addItem(name)
         self.decodeMethodDropdown.setStyleSheet(combo_style)
 
         self.textfield = QPlainTextEdit()
@@ -165,12 +266,22 @@ class DisplayWidget(QWidget):
         self.intervalDropdown.setStyleSheet(combo_style)
 
         self.plotResampleDropdown = QComboBox()
+        self.plotResampleDropdown.addItem('Auto')
+        self.plotResampleDropdown.setItemData(0, "Decimate to the display rate in config.json, following the input rate",
+                                              Qt.ToolTipRole)
         self.plotResampleDropdown.addItem('1:1')
         self.plotResampleDropdown.addItem('5:1')
         self.plotResampleDropdown.addItem('10:1')
         self.plotResampleDropdown.addItem('20:1')
         self.plotResampleDropdown.addItem('50:1')
         self.plotResampleDropdown.setStyleSheet(combo_style)
+        self.plotResampleDropdown.currentTextChanged.connect(self.onResampleChanged)
+        self.decimator = AdaptiveDecimator.fromConfig(self.config)
+
+        self.profileButton = QPushButton("Save as Profile")
+        self.profileButton.setToolTip("Save the source and the current settings to launch this session in one click")
+        self.profileButton.clicked.connect(self.saveAsProfile)
+        self.profileButton.setStyleSheet(button_style)
 
         self.saveButton = QPushButton("Save Data")
         self.saveButton.clicked.connect(self.startSaveData)
@@ -188,6 +299,35 @@ class DisplayWidget(QWidget):
         self.settingsButton.clicked.connect(self.onSettings)
         self.settingsButton.setStyleSheet(button_style)
 
+        self.dashboardButton = QPushButton("Add to Dashboard")
+        self.dashboardButton.clicked.connect(self.addToDashboard)
+        self.dashboardButton.setEnabled(False)
+        self.dashboardButton.setStyleSheet(button_style)
+
+        self.triggerButton = QPushButton("Trigger Settings")
+        self.triggerButton.clicked.connect(self.onTriggerSettings)
+        self.triggerButton.setEnabled(False)
+        self.triggerButton.setStyleSheet(button_style)
+
+        self.historyButton = QPushButton("Session History")
+        self.historyButton.clicked.connect(self.showHistory)
+        self.historyButton.setEnabled(False)
+        self.historyButton.setStyleSheet(button_style)
+
+        self.statsButton = QPushButton("Channel Statistics")
+        self.statsButton.clicked.connect(self.showStats)
+        self.statsButton.setEnabled(False)
+        self.statsButton.setStyleSheet(button_style)
+
+        self.tapButton = QPushButton("Publish Shared Memory Tap")
+        self.tapButton.clicked.connect(self.publishTap)
+        self.tapButton.setEnabled(False)
+        self.tapButton.setStyleSheet(button_style)
+
+        self.serverButton = QPushButton("Stream to Local Server")
+        self.serverButton.clicked.connect(self.startStreaming)
+        self.serverButton.setStyleSheet(button_style)
+
         self.writeEncodeLabel = QLabel("Write encoding")
         self.writeEncodeLabel.setStyleSheet(label_style)
 
@@ -207,43 +347,106 @@ class DisplayWidget(QWidget):
         self.writeButton.clicked.connect(self.writeData)
         self.writeButton.setStyleSheet(button_style)
 
+        self.noResponseCheck = QCheckBox("Write without response")
+        self.noResponseCheck.setStyleSheet(label_style)
+
+        self.parallelCheck = QCheckBox("Parallel decode (worker processes)")
+        self.parallelCheck.setToolTip("Decode in a process pool, for decoders that are expensive per packet")
+        self.parallelCheck.setStyleSheet(label_style)
+
+        self.remoteRenderCheck = QCheckBox("Render plot in a separate process")
+        self.remoteRenderCheck.setToolTip("Keeps plot rasterization from slowing down data ingestion")
+        self.remoteRenderCheck.setStyleSheet(label_style)
+
+        self.stackedCheck = QCheckBox("Stacked traces on one plot")
+        self.stackedCheck.setToolTip("Draws all channels in one axes with a single draw call, for many channels")
+        self.stackedCheck.setStyleSheet(label_style)
+
+        self.rulesCheck = QCheckBox("Run alert rules")
+        self.rulesCheck.setToolTip(f"Evaluates the rules in {rules_path()} on every batch and writes their commands back")
+        self.rulesCheck.setStyleSheet(label_style)
+        self.rulesCheck.toggled.connect(self.toggleRules)
+
+        self.sendFileButton = QPushButton("Send File")
+        self.sendFileButton.clicked.connect(self.sendFile)
+        self.sendFileButton.setStyleSheet(button_style)
+
+        self.runScriptButton = QPushButton("Run Command Script")
+        self.runScriptButton.clicked.connect(self.runScript)
+        self.runScriptButton.setStyleSheet(button_style)
+
+        self.probeButton = QPushButton("Run Probe")
+        self.probeButton.setToolTip("Measures round-trip latency and throughput with the 'probe' steps in config.json")
+        self.probeButton.clicked.connect(self.runProbe)
+        self.probeButton.setStyleSheet(button_style)
+
         left_layout.addWidget(self.writeInput)
         left_layout.addWidget(self.writeButton)
+        left_layout.addWidget(self.noResponseCheck)
+        left_layout.addWidget(self.sendFileButton)
+        left_layout.addWidget(self.runScriptButton)
+        left_layout.addWidget(self.probeButton)
         left_layout.addWidget(self.notifButton)
         left_layout.addWidget(self.readButton)
         left_layout.addWidget(self.decodeLabel)
         left_layout.addWidget(self.decodeMethodDropdown)
+        left_layout.addWidget(self.parallelCheck)
         left_layout.addWidget(self.readIntervalLabel)
         left_layout.addWidget(self.intervalDropdown)
         left_layout.addWidget(self.plotResampleLabel)
         left_layout.addWidget(self.plotResampleDropdown)
+        left_layout.addWidget(self.remoteRenderCheck)
+        left_layout.addWidget(self.stackedCheck)
         left_layout.addWidget(self.settingsButton)
+        left_layout.addWidget(self.triggerButton)
+        left_layout.addWidget(self.rulesCheck)
+        left_layout.addWidget(self.dashboardButton)
+        left_layout.addWidget(self.historyButton)
+        left_layout.addWidget(self.statsButton)
+        left_layout.addWidget(self.tapButton)
+        left_layout.addWidget(self.serverButton)
         left_layout.addWidget(self.saveButton)
+        left_layout.addWidget(self.profileButton)
         left_layout.addStretch()
 
+        self.pipelineLabel = QLabel()
+        self.pipelineLabel.setStyleSheet("font-size: 11px; color: white;")
+        self.pipelineLabel.setWordWrap(True)
+        self._statsTimer = QTimer(self)
+        self._statsTimer.timeout.connect(self.updatePipelineStats)
+        self._statsTimer.start(1000)
+
         self.right_layout.addWidget(self.textfield)
+        self.right_layout.addWidget(self.pipelineLabel)
         self.right_layout.addWidget(self.plotButton)
 
         self.main_layout.addLayout(left_layout, 1)
         self.main_layout.addLayout(self.right_layout, 2)
         
-        properties = self.m_char.properties
+        properties = self.transport.properties
         if 'notify' not in properties:
             self.notifButton.setEnabled(False)
             self.notifButton.setText("Notify Not Supported")
         if 'read' not in properties:
             self.readButton.setEnabled(False)
             self.readButton.setText("Read Not Supported")
-        if 'write' not in properties:
+        if 'write-without-response' not in properties:
+            self.noResponseCheck.setEnabled(False)
+        elif 'write' not in properties:
+            self.noResponseCheck.setChecked(True)
+            self.noResponseCheck.setEnabled(False)
+        if 'write' not in properties and 'write-without-response' not in properties:
             self.writeButton.setEnabled(False)
             self.writeButton.setText("Write Not Supported")
+            self.sendFileButton.setEnabled(False)
+            self.runScriptButton.setEnabled(False)
 
     @qasync.asyncSlot()
     async def onSettings(self):
         """
         Reveal plot settings scanServicesWindow
         """
-        self.window = PlotSettingsWidget()
+        self.window = PlotSettingsWidget(self.traceScales)
         self.window.gotPlotSetting.connect(self.onGotSettings)
         self.window.show()
 
@@ -252,16 +455,29 @@ class DisplayWidget(QWidget):
         Update plot settings
         """
         str_list = settings_str.split(",")
+        scaleText = str_list[4].strip() if len(str_list) > 4 else ""
+        if self._stacked is not None:
+            try:
+                self._stacked.setScales(parse_scales(scaleText, self._stacked.names))
+            except ValueError as e:
+                QMessageBox.warning(self, 'Warning', f'Stacked trace gain and offset: {e}')
+                return
+            self._markDirty()
+        self.traceScales = scaleText
         self._title = str_list[0]
         self._xlabel = str_list[1]
         self._ylabel = str_list[2]
+        self.windowLength = int(str_list[3])
         for i in range(len(self.dataframe)):
-            self.dataframe[i] = deque(maxlen=int(str_list[3]))
+            self.dataframe[i] = deque(maxlen=self.windowLength)
         if hasattr(self, "_axs") and self._axs:
             for ax in self._axs:
                 ax.set_title(self._title)
                 ax.set_xlabel(self._xlabel)
                 ax.set_ylabel(self._ylabel)
+        if self._remoteView is not None:
+            self._remoteView.setSettings(points=int(str_list[3]), title=self._title,
+                                         xlabel=self._xlabel, ylabel=self._ylabel)
 
     @qasync.asyncSlot()
     async def enableNotif(self):
@@ -274,7 +490,8 @@ class DisplayWidget(QWidget):
         self.intervalDropdown.setEnabled(False)
 
         try:
-            await self.m_client.start_notify(self.m_char, self.decodeRoutine)
+            self.startDecodePool()
+            await self.transport.start(self.onNotify)
             self.decodeMethodDropdown.setEnabled(False)
             self.isNotif = True
         except Exception as e:
@@ -294,7 +511,7 @@ class DisplayWidget(QWidget):
             elif self.writeEncodeDropdown.currentText() == "Binary (Hex)":
                 clean_hex = text_to_send.replace(" ", "")
                 data_bytes = bytes.fromhex(clean_hex)
-            await self.m_client.write_gatt_char(self.m_char, data_bytes)
+            await self._write(data_bytes)
             self.textfield.appendPlainText(f"Wrote ({self.writeEncodeDropdown.currentText()}): {text_to_send}")
             self.writeInput.clear()
         except ValueError:
@@ -302,75 +519,553 @@ class DisplayWidget(QWidget):
         except Exception as e:
             QMessageBox.information(self, 'Write Error', f'Unable to write data: {e}')
 
+    async def _write(self, data, progress=None):
+        self.writeQueue.response = not self.noResponseCheck.isChecked()
+        return await self.writeQueue.send(data, progress)
+
+    def _writeProgress(self, stats):
+        # report roughly every 10 % to keep the text field cheap
+        step = max(1, stats.total // 10)
+        if stats.sent == stats.total or stats.sent // step != (stats.sent - stats.chunkSize) // step:
+            self.textfield.appendPlainText(f"Sent {stats}")
+
+    @qasync.asyncSlot()
+    async def sendFile(self):
+        """
+        Streams a file (calibration table, firmware blob, ...) to the characteristic in MTU sized chunks.
+        """
+        path, _ = QFileDialog.getOpenFileName(self, 'Send File')
+        if not path:
+            return
+        self.sendFileButton.setEnabled(False)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            stats = await self._write(data, self._writeProgress)
+            self.textfield.appendPlainText(f"Finished {os.path.basename(path)}: {stats}")
+        except Exception as e:
+            QMessageBox.information(self, 'Write Error', f'Unable to send file: {e}')
+        finally:
+            self.sendFileButton.setEnabled(True)
+
+    @qasync.asyncSlot()
+    async def runScript(self):
+        """
+        Sends a text file of commands, one write per line. Lines starting with # are skipped.
+        """
+        path, _ = QFileDialog.getOpenFileName(self, 'Run Command Script')
+        if not path:
+            return
+        self.runScriptButton.setEnabled(False)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                lines = fh.readlines()
+            self.writeQueue.response = not self.noResponseCheck.isChecked()
+            results = await self.writeQueue.sendLines(lines)
+            sent = sum(r.sent for r in results)
+            self.textfield.appendPlainText(f"Ran {len(results)} commands ({sent} bytes) from {os.path.basename(path)}")
+        except Exception as e:
+            QMessageBox.information(self, 'Write Error', f'Unable to run script: {e}')
+        finally:
+            self.runScriptButton.setEnabled(True)
+
+    @qasync.asyncSlot()
+    async def runProbe(self):
+        """
+        Runs the latency and throughput probe against this characteristic and, if it cannot
+        both notify and be written, a partner characteristic of the same device.
+        """
+        label, ok = QInputDialog.getText(self, 'Run Probe', 'Label for the results, e.g. the firmware build:')
+        if not ok:
+            return
+        properties = self.transport.properties
+        notify = self.transport if 'notify' in properties else self._probePartner('notify')
+        writable = 'write' in properties or 'write-without-response' in properties
+        written = self.transport if writable else self._probePartner('write')
+        if notify is None or written is None:
+            QMessageBox.warning(self, 'Warning', 'The probe needs a characteristic that notifies and one that is written')
+            return
+        self.probeButton.setEnabled(False)
+        # the probe takes over the notifications of this characteristic until it is done
+        resume = self.isNotif and notify is self.transport
+        try:
+            if resume:
+                await self.transport.stop()
+            steps = default_steps(self.config)
+            self.textfield.appendPlainText(f"Probing {notify} and {written}, {len(steps)} steps")
+            probe = Probe(notify, written, self.config.get("probe", {}).get("connectionInterval"))
+            result = await probe.run(steps, label,
+                                     lambda step: self.textfield.appendPlainText("\n".join(format_step(step))))
+            self.textfield.appendPlainText(f"Probe results saved to {save_probe(result)}")
+        except Exception as e:
+            QMessageBox.information(self, 'Probe Error', f'Unable to run the probe: {e}')
+        finally:
+            if resume:
+                await self.transport.start(self.onNotify)
+            self.probeButton.setEnabled(True)
+
+    def _probePartner(self, prop):
+        """
+        Asks for another characteristic of the device that supports prop, 'notify' or 'write'.
+        """
+        if self.m_client is None:
+            return None
+        accepted = ('write', 'write-without-response') if prop == 'write' else (prop,)
+        chars = [c for service in self.m_client.services for c in service.characteristics
+                 if any(p in c.properties for p in accepted)]
+        if not chars:
+            return None
+        names = [f"{c.uuid} ({c.description})" for c in chars]
+        name, ok = QInputDialog.getItem(self, 'Run Probe', f"Characteristic to {'write' if prop == 'write' else 'notify'}:",
+                                        names, 0, False)
+        if not ok:
+            return None
+        return BleTransport(self.m_client, chars[names.index(name)])
+
+    def onNotify(self, char, value):
+        """
+        Notification callback. Only queues the raw payload; decoding happens in drainIngest().
+
+        :param char: The characteristic that sent the notification.
+        :param value: The value of the notification.
+        """
+        self.ingestQueue.put(value)
+        if not self._drainScheduled:
+            self._firstArrival = time.perf_counter()
+            self._drainScheduled = True
+            QTimer.singleShot(0, self.drainIngest)
+
+    @timed
+    def drainIngest(self, maxItems=256):
+        """
+        Decodes queued payloads in batches, yielding to the event loop between batches.
+        """
+        self._drainScheduled = False
+        self._batchArrival = self._firstArrival
+        if self.decodePool is not None:
+            # leave payloads queued while the workers are saturated, the ingest policy applies
+            while self.decodePool.hasCapacity() and len(self.ingestQueue):
+                self.decodePool.submit(self.ingestQueue.getBatch(self.decodePool.batchSize))
+            return
+        batch = self.ingestQueue.getBatch(maxItems)
+        if batch:
+            self.decodeBatch(batch)
+        if len(self.ingestQueue) and not self._drainScheduled:
+            self._drainScheduled = True
+            QTimer.singleShot(0, self.drainIngest)
+
+    def pumpDisplay(self):
+        """
+        Moves decoded rows from the display queue into the plot buffers.
+
+        :return: The plot buffers, one deque per channel.
+        """
+        rows = self.displayQueue.getBatch()
+        channels = len(self.dataframe)
+        if self.clockAligner is not None and (self.displayTimes is None
+                                              or self.displayTimes.maxlen != self.dataframe[0].maxlen):
+            self.displayTimes = deque(maxlen=self.dataframe[0].maxlen)
+        for row in rows:
+            for i in range(min(len(row), channels)):
+                self.dataframe[i].append(row[i])
+            if self.displayTimes is not None and len(row) > channels:
+                self.displayTimes.append(row[channels])
+        if self._remoteView is not None and rows:
+            self._remoteView.extend([row[:channels] for row in rows if len(row) >= channels])
+        return self.dataframe
+
+    def updatePipelineStats(self):
+        """
+        Shows occupancy and drop counters of every pipeline queue.
+        """
+        stats = [self.ingestQueue.stats(), self.displayQueue.stats()]
+        if self.isSaving:
+            stats.append(self.saver.queue.stats())
+        text = format_stats(stats)
+        if (self.isPlotting or self.isOnDashboard) and self.decimator.rate is not None \
+                and self.resampleratiodict[self.plotResampleDropdown.currentText()] is None:
+            text += (f" | display {self.resampleratio}:1 of {self.decimator.rate:.0f} samples/s"
+                     f" ({self.decimator.displayRate:.0f} points/s)")
+        if self.sequence is not None:
+            text += " | " + format_sequence_stats(self.sequence.stats())
+        if self.clockAligner is not None:
+            text += " | " + format_clock_stats(self.clockAligner.stats())
+        if self.ruleEngine is not None:
+            text += (f" | rules {self.alerts} alerts, {format_latency('decide', self.decideLatency)}, "
+                     f"{format_latency('write', self.writeLatency)}")
+            if self.lastAlert is not None:
+                text += f", last: {self.lastAlert}"
+        if self.server is not None:
+            server = self.server.stats()
+            text += f" | server {server['subscribers']} subscribers ({server['evicted']} evicted)"
+        self.pipelineLabel.setText(text)
+
     def decodeRoutine(self, char, value):
         """
-        Routine that Handles decoding of the BLE characteristic.
+        Routine that Handles decoding of a single value of the BLE characteristic.
 
         :param char: The characteristic that sent the notification.
         :param value: The value of the notification.
         """
-        decoded_value = None
-        self.resamplecounter += 1
-        if (self.decodeMethodDropdown.currentText() != "String Literal" and
-                self.decodeMethodDropdown.currentText() != "Comma Delimited String Literal"):
-            option = self.config['decodeOptions'][self.decodeMethodDropdown.currentIndex()]
-            format_str = option['format']
-
-            if len(value) >= struct.calcsize(format_str):
-                decoded_value = struct.unpack(format_str, value)[0]
-                if self.isPlotting and self.resamplecounter >= self.resampleratio:
-                    self.dataframe[0].append(decoded_value)
-                    self.resamplecounter = 0
-            else:
-                QMessageBox.warning(self, 'Error', 'Received data does not match expected format.')
-            if(self.isFirstTransactions):
-                self.isFirstTransactions = False
-                self.plotButton.setEnabled(True)
-                self.saveButton.setEnabled(True)
+        self.decodeBatch([value])
 
-        elif self.decodeMethodDropdown.currentText() == "String Literal":
-            decoded_value = value.decode("UTF-8")
+    def currentDecoder(self):
+        return self.decoders[self.decodeMethodDropdown.currentText()]
 
-        else:
-            try:
-                decoded_value = value.decode("UTF-8")
-                decoded_list = decoded_value[:-1].split(",")
-            except:
-                QMessageBox.warning(self,"Warning","Unable to decode")
-                self.close()
-            
-            self.textfield.appendPlainText(decoded_value)
-            if(self.isFirstTransactions):
-                self.dataframe = []
+    def decodeBatch(self, payloads):
+        """
+        Decodes a batch of payloads with the selected decoder and feeds the display, history and save stages.
+
+        :param payloads: List of raw characteristic values.
+        """
+        decoder = self.currentDecoder()
+        try:
+            batch = decode(decoder, payloads)
+        except Exception as e:
+            self._decodeFailed(f'Decoder {decoder.name} failed: {e}')
+            return
+        self.handleDecoded(batch)
+
+    def startDecodePool(self):
+        """
+        Starts the worker processes when parallel decoding is selected.
+        """
+        self.parallelCheck.setEnabled(False)
+        if not self.parallelCheck.isChecked() or self.decodePool is not None:
+            return
+        self.decodePool = DecodePool(self.currentDecoder().name, config=self.config)
+        self._poolTimer = QTimer(self)
+        self._poolTimer.timeout.connect(self.collectDecoded)
+        self._poolTimer.start(10)
+
+    @timed
+    def collectDecoded(self):
+        """
+        Hands batches decoded by the pool to the display, history and save stages, in order.
+        """
+        try:
+            for batch in self.decodePool.collect():
+                self.handleDecoded(batch)
+        except Exception as e:
+            decoder = self.currentDecoder()
+            self._decodeFailed(f'Decoder {decoder.name} failed: {e}')
+        if len(self.ingestQueue):
+            self.drainIngest()
+
+    def flushPipeline(self):
+        """
+        Decodes every payload still queued or in the workers and hands the batches on, waiting for the workers.
+        Used when the stream stops, so the end of a capture is not lost.
+        """
+        if self.decodePool is None:
+            while len(self.ingestQueue):
+                self.decodeBatch(self.ingestQueue.getBatch(256))
+            return
+        self._poolTimer.stop()
+        try:
+            while len(self.ingestQueue):
+                self.decodePool.submit(self.ingestQueue.getBatch(self.decodePool.batchSize))
+            for batch in self.decodePool.collect(wait=True):
+                self.handleDecoded(batch)
+        except Exception as e:
+            # no message box while closing
+            self.textfield.appendPlainText(f'Decoder {self.currentDecoder().name} failed: {e}')
+
+    @timed
+    def handleDecoded(self, batch):
+        """
+        Feeds a decoded batch to the display, history and save stages.
+
+        :param batch: The DecodedBatch of one or more payloads.
+        """
+        decoder = self.currentDecoder()
+        if batch.errors:
+            self._decodeFailed(f'{batch.errors} received packets do not match the {decoder.name} format.')
+
+        if batch.text:
+            self.textfield.appendPlainText("\n".join(batch.text[-self.textfield.maximumBlockCount():]))
+
+        values = batch.values
+        gaps = times = None
+        if values is not None and len(values):
+            if self.isFirstTransactions:
+                self.dataframe = [deque(maxlen=self.windowLength) for _ in range(values.shape[1])]
+                self.sequence = SequenceTracker.fromDecoder(decoder, values.shape[1], self.config)
+                self.clockAligner = ClockAligner.fromDecoder(decoder, values.shape[1], self.config)
+                if self.channelStats is None or self.channelStats.channels != values.shape[1]:
+                    self.channelStats = ChannelStats(values.shape[1], self.windowLength * self.resampleratio)
                 self._lines = []
-                for i in range(len(decoded_list)):
-                    self.dataframe.append(deque(maxlen= 100))
-                
-                self.isFirstTransactions = False
                 self.plotButton.setEnabled(True)
-                self.saveButton.setEnabled(True)
-            if self.isPlotting and self.resamplecounter >= self.resampleratio:
-                for i in range(len(decoded_list)):
-                    try:
-                        item = float(decoded_list[i].replace('\x00',''))
-                    except:
-                        QMessageBox.warning(self,"Warning","Unable to decode")
-                    self.dataframe[i].append(item)
-                self.resamplecounter=0
-
-        if self.isSaving and decoded_value is not None:
-            self.incoming.emit(str(decoded_value))
+                self.dashboardButton.setEnabled(True)
+                self.historyButton.setEnabled(True)
+                self.statsButton.setEnabled(True)
+                self.triggerButton.setEnabled(True)
+                self.tapButton.setEnabled(True)
+                if values.shape[1] >= self.config.get("display", {}).get("stackedChannels", 8):
+                    self.stackedCheck.setChecked(True)
+                if self._plotOnData:
+                    # the channel count is only known now
+                    self._plotOnData = False
+                    QTimer.singleShot(0, self._autoPlot)
+            if self.sequence is not None:
+                gaps = self.sequence.check(values)
+                if not self.config.get("sequence", {}).get("markGaps", True):
+                    gaps = None
+            times = self.clockAligner.update(values) if self.clockAligner is not None else None
+            if self.rules is not None:
+                self.applyRules(values, decoder)
+            self._recordHistory(values)
+            if self.tap is not None and values.shape[1] == self.tap.channels:
+                self.tap.extend(values)
+            # the input rate is tracked all the time so Auto is ready when plotting starts
+            ratio = self.decimator.update(len(values))
+            if self.resampleratiodict[self.plotResampleDropdown.currentText()] is None:
+                self.resampleratio = ratio
+            if self.channelStats is not None and self.channelStats.channels == values.shape[1]:
+                # the visible window holds windowLength points of resampleratio samples each
+                self.channelStats.setWindow(self.windowLength * self.resampleratio)
+                self.channelStats.update(values)
+            if self.trigger is not None:
+                for segment in self.trigger.feed(values):
+                    self.onTriggered(segment)
+            elif self.isPlotting or self.isOnDashboard:
+                first = max(0, self.resampleratio - 1 - self.resamplecounter)
+                # aligned host times travel as an extra last column
+                rows = (values if times is None else np.column_stack([values, times]))[first::self.resampleratio]
+                if gaps is not None and len(gaps):
+                    # a break before the first displayed row after each gap
+                    marks = np.unique(np.maximum(0, -((first - gaps) // self.resampleratio)))
+                    rows = insert_gap_markers(rows, marks)
+                for row in rows.tolist():
+                    self.displayQueue.put(row)
+                self._markDirty()
+            self.resamplecounter = (self.resamplecounter + len(values)) % self.resampleratio
+
+        if self.server is not None:
+            self.server.publish(str(self.transport), values, batch.text, self.currentDecoder().channels)
+
+        if self.isFirstTransactions and batch.text:
+            self.isFirstTransactions = False
+            self.saveButton.setEnabled(not self.isSaving)
 
-                    
+        if self.isSaving:
+            rows = capture_rows(values, batch.text, decoder, self.saver.binary, times, gaps)
+            if rows is not None:
+                self._queueSave(rows)
 
-    def plotUpdate(self, frame):
+    def _queueSave(self, rows):
+        """
+        Hands one batch of rows or lines to the save thread, without waiting.
+        A full save queue means the disk does not keep up, saving then stops rather than dropping rows.
         """
-        Updates the plot with new data.
+        if not self.saver.queue.put(rows):
+            self.onSaveError(f"the disk does not keep up, {self.saver.queue.maxsize} rows are waiting to be written")
 
-        :param frame: The current frame of the animation (unused).
+    def toggleRules(self, checked):
+        """
+        Loads the alert rules when enabled, drops them when disabled.
+        """
+        self.ruleEngine = None
+        self.lastAlert = None
+        if not checked:
+            self.rules = None
+            return
+        try:
+            rules = load_rules()
+        except (OSError, ValueError) as e:
+            rules, error = [], f'Unable to load rules: {e}'
+        else:
+            error = f'No rules in {rules_path()}' if not rules else None
+        if error:
+            QMessageBox.warning(self, 'Warning', error)
+            self.rulesCheck.setChecked(False)
+            return
+        self.rules = rules
+
+    def applyRules(self, values, decoder):
+        """
+        Evaluates the alert rules on a decoded batch and starts their write-backs.
+        """
+        if self.ruleEngine is None:
+            self.ruleEngine = RuleEngine(self.rules, values.shape[1], decoder.channels, decoder.name)
+            active = ", ".join(state.rule.describe() for state in self.ruleEngine.states) or "none"
+            self.textfield.appendPlainText(f"Rules: {active}")
+            for rule in self.ruleEngine.skipped:
+                self.textfield.appendPlainText(f"Rule {rule.name}: no channel {rule.channel} in this stream")
+        alerts = self.ruleEngine.evaluate(values)
+        arrival = self._batchArrival
+        for alert in alerts:
+            self.alerts += alert.active
+            if arrival is not None:
+                self.decideLatency.add(alert.decided - arrival)
+            # the text field scrolls with the data, the status line keeps the last alert
+            self.textfield.appendPlainText(str(alert))
+            self.lastAlert = alert
+            if alert.action is not None:
+                task = asyncio.ensure_future(self._writeBack(alert, arrival))
+                # keep a reference until the write is done
+                self._ruleWrites.add(task)
+                task.add_done_callback(self._ruleWrites.discard)
+
+    async def _writeBack(self, alert, arrival):
+        try:
+            await alert.action.send(self.transport)
+        except Exception as e:
+            self.textfield.appendPlainText(f"Rule {alert.rule.name}: write failed: {e}")
+            return
+        if arrival is not None:
+            self.writeLatency.add(time.perf_counter() - arrival)
+
+    def _decodeFailed(self, message):
+        """
+        Reports decode failures once instead of opening a message box per packet.
+        """
+        if not self._decodeWarned:
+            self._decodeWarned = True
+            QMessageBox.warning(self, 'Error', message)
+        else:
+            self.textfield.appendPlainText(message)
+
+    def _recordHistory(self, values):
+        """
+        Appends decoded samples to the session history, creating the store on the first batch.
+
+        :param values: Array of shape (n, channels).
+        """
+        if self.history is None:
+            self.history = HistoryStore(values.shape[1])
+        elif values.shape[1] != self.history.channels:
+            # comma delimited decoders size every batch, a short packet must not end the history
+            return
+        self.history.extend(values)
+        if self.historyWindow is not None:
+            self.historyWindow.markDirty()
+
+    def publishTap(self):
+        """
+        Publishes every decoded sample of this stream in a named shared memory ring for local readers.
+        """
+        name, ok = QInputDialog.getText(self, "Shared Memory Tap", "Name of the shared memory block:",
+                                        text=default_tap_name(self.transport))
+        if not ok or not name:
+            return
+        names = self.currentDecoder().channels
+        if names is not None and len(names) != len(self.dataframe):
+            names = None
+        try:
+            self.tap = open_tap(name, len(self.dataframe), names, self.config)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, 'Warning', f'Unable to create tap {name}: {e}')
+            return
+        self.tapButton.setEnabled(False)
+        self.tapButton.setText(f"Tap: {self.tap.name}")
+
+    @qasync.asyncSlot()
+    async def startStreaming(self):
+        """
+        Publishes decoded batches of this stream on the shared local streaming server.
+        """
+        try:
+            self.server = await shared_server(self.config)
+        except OSError as e:
+            QMessageBox.warning(self, 'Warning', f'Unable to start the streaming server: {e}')
+            return
+        self.serverButton.setEnabled(False)
+        self.serverButton.setText(f"Streaming on {self.server.url}")
+
+    def showHistory(self):
+        """
+        Opens a zoomable view of everything received during this session.
+        """
+        if self.history is None:
+            return
+        if self.historyWindow is None:
+            self.historyWindow = HistoryWidget(self.history, title=f"History - {self.transport}")
+        self.historyWindow.show()
+        self.historyWindow.raise_()
+
+    def showStats(self):
+        """
+        Opens the per-channel statistics of the visible window and of the whole session.
+        """
+        if self.channelStats is None:
+            return
+        if self.statsWindow is None or self.statsWindow.stats is not self.channelStats:
+            self.statsWindow = StatsWidget(self.channelStats, self.currentDecoder().channels,
+                                           title=f"Statistics - {self.transport}")
+        self.statsWindow.show()
+        self.statsWindow.raise_()
+
+    def onTriggerSettings(self):
+        """
+        Reveal trigger settings window
+        """
+        self.triggerWindow = TriggerSettingsWidget(len(self.dataframe))
+        self.triggerWindow.gotTriggerSetting.connect(self.onGotTrigger)
+        self.triggerWindow.show()
+
+    def onGotTrigger(self, settings):
+        """
+        Switch between continuous and triggered display.
+
+        :param settings: Dict of Trigger arguments plus "save" and "prefix", or None for continuous display.
+        """
+        if settings is None:
+            self.trigger = None
+            # captured segments replaced the columns with ones of the segment length
+            self.dataframe = [deque(column, maxlen=self.windowLength) for column in self.dataframe]
+            self.textfield.appendPlainText("Trigger off, continuous display")
+            return
+        settings = dict(settings)
+        self.triggerSave = settings.pop("save")
+        self.triggerPrefix = settings.pop("prefix")
+        self.trigger = Trigger(**settings)
+        self.displayQueue.clear()
+        self.textfield.appendPlainText(f"Trigger armed ({self.trigger.mode}, {self.trigger.condition} on channel {self.trigger.channel})")
+
+    def onTriggered(self, segment):
+        """
+        Shows a captured segment in place of the continuous plot and optionally saves it.
+        """
+        self.triggerEvents += 1
+        length = len(segment.values)
+        self.dataframe = [deque(segment.values[:, i].tolist(), maxlen=length) for i in range(segment.values.shape[1])]
+        self._markDirty()
+        message = f"Trigger {self.triggerEvents} at sample {segment.sampleNumber}{' (forced)' if segment.forced else ''}"
+        if self.triggerSave:
+            try:
+                message += f", saved {os.path.basename(save_segment(segment, self.triggerPrefix, self.triggerEvents))}"
+            except OSError as e:
+                message += f", unable to save: {e}"
+        if not self.trigger.armed:
+            message += ". Apply trigger settings again to re-arm."
+        self.textfield.appendPlainText(message)
+
+    def _markDirty(self):
+        """
+        Flags the plot and the dashboard panel of this stream for redraw on the next render clock tick.
         """
-        
         if self.isPlotting:
+            self.clock.markDirty(self)
+        if self.isOnDashboard:
+            self._dashboard.markDirty(self)
+
+    @timed
+    def plotUpdate(self, frame=None):
+        """
+        Updates the plot with new data. Called by the shared render clock when new samples arrived.
+
+        :param frame: Unused, kept for compatibility with animation callbacks.
+        """
+        
+        if self.isPlotting and self._remoteView is not None:
+            self.pumpDisplay()
+        elif self.isPlotting and self._stacked is not None:
+            self.pumpDisplay()
+            self._stacked.update(self.dataframe)
+            self._canvas.draw_idle()
+        elif self.isPlotting:
+            self.pumpDisplay()
             for i in range(len(self.dataframe)):
                 # Update plot data
                 self._lines[i].set_xdata(range(len(self.dataframe[i])))  # Set x-data as the index of the data points
@@ -383,16 +1078,44 @@ class DisplayWidget(QWidget):
                 # Set line color (optional)
                 self._lines[i].set_color('r')
 
-            # Return all line objects for animation update
+            self._canvas.draw_idle()
             return self._lines
 
     def _plot(self):
         """
         Starts plotting the BLE characteristic data in real-time.
         """
-        self.resampleratio = self.resampleratiodict[self.plotResampleDropdown.currentText()]
-        if self.isFirstPlot:
-            if self.decodeMethodDropdown.currentText() != "Comma Delimited String Literal":
+        self.onResampleChanged(self.plotResampleDropdown.currentText())
+        if self.isFirstPlot and self.remoteRenderCheck.isChecked():
+            self._title = "ADC"
+            self._xlabel = "Time (a.u.)"
+            self._ylabel = "Value (a.u.)"
+            self._remoteView = RemotePlotView(len(self.dataframe), self.dataframe[0].maxlen,
+                                              self._title, self._xlabel, self._ylabel)
+            self._remoteView.failed.connect(self.onRemoteRenderFailed)
+            self._canvas = self._remoteView
+            self.isFirstPlot = False
+        elif self.isFirstPlot and self.stackedCheck.isChecked() and len(self.dataframe) > 1:
+            self._title = "ADC"
+            self._xlabel = "Time (a.u.)"
+            self._ylabel = "Channel"
+            self._fig, self._ax = plt.subplots()
+            names = self.currentDecoder().channels
+            self._stacked = StackedTraces(self._ax, len(self.dataframe), names)
+            try:
+                # entered before the channels were known
+                self._stacked.setScales(parse_scales(self.traceScales, self._stacked.names))
+            except ValueError as e:
+                self.textfield.appendPlainText(f"Stacked trace gain and offset ignored: {e}")
+            self._ax.set_title(self._title)
+            self._ax.set_xlabel(self._xlabel)
+            self._ax.set_ylabel(self._ylabel)
+            self._axs = [self._ax]
+            self._lines = []
+            self._canvas = FigureCanvas(self._fig)
+            self.isFirstPlot = False
+        elif self.isFirstPlot:
+            if len(self.dataframe) == 1:
                 self._fig, self._ax = plt.subplots()
                 self._line, = self._ax.plot(self.dataframe[0])
                 self._title = "ADC"
@@ -430,13 +1153,50 @@ class DisplayWidget(QWidget):
                 self._canvas = FigureCanvas(self._fig)
 
         self.plotButton.setEnabled(False)
-        self.plotResampleDropdown.setEnabled(False)
+        self.remoteRenderCheck.setEnabled(False)
+        self.stackedCheck.setEnabled(False)
         self.right_layout.addWidget(self._canvas)
 
-        self._animation = FuncAnimation(self._fig, self.plotUpdate, interval=1, cache_frame_data=False)
-        
         self.isPlotting = True
-        self._canvas.draw_idle()
+        self.clock.register(self, self.plotUpdate)
+        if self._remoteView is not None:
+            self._remoteView.requestFrame()
+        else:
+            self._canvas.draw_idle()
+
+    def onRemoteRenderFailed(self, message):
+        """
+        Falls back to drawing the plot in this process when the render process fails.
+        """
+        self.textfield.appendPlainText(f"{message}, plotting in this window instead")
+        self.right_layout.removeWidget(self._remoteView)
+        self._remoteView.deleteLater()
+        self._remoteView = None
+        self.remoteRenderCheck.setChecked(False)
+        self.isFirstPlot = True
+        self._plot()
+
+    def onResampleChanged(self, text):
+        """
+        Applies a new display resample ratio, also while plotting. Saving is never decimated.
+        """
+        ratio = self.resampleratiodict.get(text)
+        self.resampleratio = self.decimator.ratio if ratio is None else ratio
+
+    def _autoPlot(self):
+        if not self.isPlotting:
+            self._plot()
+
+    def addToDashboard(self):
+        """
+        Adds the channels of this characteristic to the shared dashboard window.
+        """
+        self._dashboard = get_dashboard()
+        self._dashboard.addStream(self, str(self.transport), self.pumpDisplay, lambda: self.displayTimes)
+        self._dashboard.show()
+        self._dashboard.raise_()
+        self.isOnDashboard = True
+        self.dashboardButton.setEnabled(False)
 
     def enableTimedRead(self):
         """
@@ -452,8 +1212,9 @@ class DisplayWidget(QWidget):
         self.notifButton.setEnabled(False)
         self.decodeMethodDropdown.setEnabled(False)
         self.intervalDropdown.setEnabled(False)
+        self.startDecodePool()
 
-        if self.decodeMethodDropdown.currentText() != "String Literal":
+        if self.currentDecoder().numeric:
             self.plotButton.setEnabled(True)
 
         # TODO -change timer settings
@@ -467,23 +1228,102 @@ class DisplayWidget(QWidget):
         """
         Handles characteristic reading timer timeouts
         """
-        value = await self.m_client.read_gatt_char(self.m_char)
-        self.decodeRoutine(self.m_char, value)
+        value = await self.transport.read()
+        self.onNotify(self.transport, value)
+
+    def streamId(self):
+        """
+        Returns the characteristic UUID, or the URL of a local source.
+        """
+        if self.m_char is not None:
+            return self.m_char.uuid
+        return self.transport.url or str(self.transport)
+
+    def applyProfile(self, profile):
+        """
+        Applies the settings of a saved profile, then starts streaming, recording and plotting.
+
+        :param profile: The Profile being launched.
+        :return: False if the profile does not fit this source.
+        """
+        if profile.decoder not in self.decoders:
+            QMessageBox.warning(self, 'Warning', f'Profile {profile.name}: unknown decoder {profile.decoder}')
+            return False
+        self.setWindowTitle(f'Characteristic Reader - {profile.name}')
+        self.decodeMethodDropdown.setCurrentText(profile.decoder)
+        if profile.resample in self.resampleratiodict:
+            self.plotResampleDropdown.setCurrentText(profile.resample)
+        self.windowLength = profile.window
+        self.dataframe = [deque(maxlen=self.windowLength) for _ in self.dataframe]
+        self.remoteRenderCheck.setChecked(bool(profile.remote))
+        if profile.save:
+            self.startSaving(profile.captureName(self.streamId()))
+            self.profileSave = profile.save
+        self._plotOnData = profile.plot and self.currentDecoder().numeric
+        if profile.interval:
+            interval = str(profile.interval)
+            if self.intervalDropdown.findText(interval) < 0:
+                self.intervalDropdown.addItem(interval)
+            self.intervalDropdown.setCurrentText(interval)
+            self.enableTimedRead()
+        else:
+            self.enableNotif()
+        return True
+
+    def saveAsProfile(self):
+        """
+        Saves the source and the current settings as a profile. Saving windows of the same
+        device under one name collects their characteristics in one profile.
+        """
+        name, ok = QInputDialog.getText(self, 'Save as Profile', 'Profile name:')
+        if not ok or not name:
+            return
+        try:
+            existing = load_profiles().get(name)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, 'Warning', f'Unable to read saved profiles: {e}')
+            return
+        settings = dict(decoder=self.currentDecoder().name, interval=self.animateInterval if self.isRead else None,
+                        window=self.windowLength, resample=self.plotResampleDropdown.currentText(),
+                        plot=self.currentDecoder().numeric, remote=self.remoteRenderCheck.isChecked(),
+                        save=self.profileSave or self.saveFilename)
+        if self.m_char is not None:
+            chars = [self.streamId()]
+            if existing is not None and existing.address == self.m_client.address:
+                chars = existing.characteristics + [c for c in chars if c not in existing.characteristics]
+            profile = Profile(name, address=self.m_client.address, characteristics=chars, **settings)
+        else:
+            profile = Profile(name, url=self.streamId(), **settings)
+        try:
+            save_profile(profile)
+        except OSError as e:
+            QMessageBox.warning(self, 'Warning', f'Unable to save profile {name}: {e}')
+            return
+        self.textfield.appendPlainText(f"Saved profile {name}: {profile.describe()}")
 
     def startSaveData(self):
         text, ok = QInputDialog.getText(self, 'Save Data', 'Filename')
         if not ok or not text:
             return
-        
-        content = self.textfield.toPlainText()
+        self.startSaving(text)
+
+    def startSaving(self, filename):
+        """
+        Starts writing every decoded line to a capture file under results/<date>/.
 
+        :param filename: Name of the capture file.
+        """
+        self.saveFilename = filename
+        self.profileSave = None
         self._thread = QThread()
-        self.saver = SaveThread(text)
+        self.saver = SaveThread(filename, queue_from_config("save", self.config),
+                                int(self.config.get("capture", {}).get("indexEvery", 4096)),
+                                capture_names(self.currentDecoder()))
         self.saver.moveToThread(self._thread)
 
         self._thread.started.connect(self.saver.open)
-        self.incoming.connect(self.saver.enqueue)
         self.saver.finished.connect(self._thread.quit)
+        self.saver.error.connect(self.onSaveError)
 
         self._thread.finished.connect(self._thread.deleteLater)
         self._thread.finished.connect(self.saver.deleteLater)
@@ -494,17 +1334,62 @@ class DisplayWidget(QWidget):
         self.saveButton.setText("Saving...")
         self.isSaving = True
 
+    def stopSaving(self):
+        """
+        Stops writing the capture and closes it on the save thread.
+        """
+        if not self.isSaving:
+            return
+        self.isSaving = False
+        QMetaObject.invokeMethod(self.saver, "close", Qt.QueuedConnection)
+        self.saveButton.setText("Save Data")
+        self.saveButton.setEnabled(not self.isFirstTransactions)
+
+    def onSaveError(self, message):
+        """
+        Stops saving when the capture cannot be opened or written, instead of letting the queue fill up.
+        """
+        if not self.isSaving:
+            return
+        self.stopSaving()
+        # also called from the decode path, where a modal dialog must not start
+        QTimer.singleShot(0, lambda: QMessageBox.warning(self, 'Warning', f'Saving {self.saveFilename} stopped: {message}'))
+
     @qasync.asyncClose
     async def closeEvent(self, event):
         """
         Routine that terminates characteristic operations prior to scanServicesWindow closure
         """
         if self.isNotif:
-            await self.m_client.stop_notify(self.m_char)
-
+            await self.transport.stop()
         if self.isRead:
             self._timer.stop()
 
-        if self.isSaving:
-            self.saver.close()   # or emit a stop signal
+        # the end of the stream is decoded and saved, rule write-backs still have the transport
+        self.flushPipeline()
+        if self._ownsTransport:
+            await self.transport.close()
+
+        if self.decodePool is not None:
+            self.decodePool.close()
+
+        self.clock.unregister(self)
+        if self.isOnDashboard:
+            self._dashboard.removeStream(self)
+
+        if self._remoteView is not None:
+            self._remoteView.stop()
+        if self.tap is not None:
+            self.tap.close()
+
+        if self.historyWindow is not None:
+            self.historyWindow.close()
+        if self.statsWindow is not None:
+            self.statsWindow.close()
+        if self.history is not None:
+            self.history.close()
+
+        self.stopSaving()
+
+        self.closed.emit()
 
@@ -0,0 +1,357 @@
+"""
+Headless counterparts of the GUI pipeline, used by the command line. Nothing here imports Qt.
+"""
+import asyncio
+import logging
+import time
+from .bounded_queue import queue_from_config
+from .capture import capture_path, capture_rows, CaptureWriter
+from .config_loader import load_config
+from .decoders import available_decoders, decode
+from .decode_pool import DecodePool
+from .probe import Probe
+from .shm_ring import open_tap
+from .rules import RuleEngine, LatencyStats
+from .sequence import SequenceTracker
+from .clock_sync import ClockAligner, capture_names
+from .stream_server import StreamServer
+from .write_queue import WriteQueue
+from .transports import BleTransport, open_transport
+
+logger = logging.getLogger(__name__)
+
+
+def list_decoders(config=None):
+    """
+    Describes every available decoder, including entry point plugins.
+
+    :return: List of (name, channels, numeric) tuples.
+    """
+    decoders = available_decoders(config or load_config())
+    return [(d.name, d.channels, d.numeric) for d in decoders.values()]
+
+
+def get_decoder(name, config=None):
+    decoders = available_decoders(config or load_config())
+    if name not in decoders:
+        raise KeyError(f"Unknown decoder '{name}'. Available: {', '.join(decoders)}")
+    return decoders[name]
+
+
+def find_characteristic(client, uuid):
+    """
+    Looks up a characteristic of a connected BleakClient by UUID.
+    """
+    char = client.services.get_characteristic(uuid)
+    if char is None:
+        raise KeyError(f"Characteristic {uuid} not found on {client.address}")
+    return char
+
+
+class Recorder:
+    """
+    Records decoded notifications of one characteristic to a capture file.
+
+    Notifications are queued by onNotify() and decoded in batches by drain(), the same
+    ingest -> decode -> save structure the DisplayWidget uses. With workers set, batches
+    are decoded by a DecodePool and written in arrival order. With tap set, decoded
+    samples are also published in a named shared memory ring, and with server set
+    every decoded batch is sent to the subscribers of a StreamServer. With rules set,
+    every batch is checked against the alert rules and their writes are sent back
+    through the transport.
+    """
+
+    def __init__(self, decoder, filename, config=None, workers=None, tap=None, server=None, stream=None,
+                 rules=None, onAlert=None):
+        """
+        :param decoder: The Decoder applied to every payload.
+        :param filename: Name of the capture file under results/<date>/.
+        :param config: The loaded config dictionary.
+        :param workers: Decode in this many worker processes, 0 for the config.json default, None to decode inline.
+        :param tap: Name of a shared memory tap to publish the samples in.
+        :param server: A started StreamServer to publish the batches on.
+        :param stream: Stream name used on the server, defaults to the capture file name.
+        :param rules: List of alert Rules, see rules.py.
+        :param onAlert: Callable receiving every Alert.
+        """
+        config = config or load_config()
+        self.config = config
+        self.decoder = decoder
+        self.path = capture_path(filename)
+        self.ingestQueue = queue_from_config("ingest", config)
+        self.packets = 0
+        self.errors = 0
+        self._fh = None
+        self.tapName = tap
+        self.server = server
+        self.stream = stream or filename
+        self.tap = None
+        self.sequence = None
+        self.clockAligner = None
+        self._tracked = False
+        self.rules = rules
+        self.onAlert = onAlert
+        self.ruleEngine = None
+        self.alerts = 0
+        self.decideLatency = LatencyStats()
+        self.writeLatency = LatencyStats()
+        self.transport = None
+        self._firstArrival = None
+        self._drainScheduled = False
+        self._writes = set()
+        self.pool = None
+        if workers is not None:
+            self.pool = DecodePool(decoder.name, workers or None, config=config)
+
+    def onNotify(self, char, value):
+        if not len(self.ingestQueue):
+            self._firstArrival = time.perf_counter()
+        self.ingestQueue.put(value)
+        if self.rules and self.pool is None and not self._drainScheduled:
+            # rules decide as soon as the event loop is free instead of at the next decode pass
+            self._drainScheduled = True
+            asyncio.get_event_loop().call_soon(self.drain)
+
+    def drain(self, wait=False):
+        """
+        Decodes and writes everything queued so far.
+
+        :param wait: With a pool, block until every submitted batch is written.
+        :return: The last decoded batch, or None if nothing was decoded.
+        """
+        self._drainScheduled = False
+        arrival = self._firstArrival
+        if self.pool is not None:
+            while self.pool.hasCapacity() and len(self.ingestQueue):
+                self.pool.submit(self.ingestQueue.getBatch(self.pool.batchSize))
+            batches = self.pool.collect(wait)
+            self.packets = self.pool.completed
+        else:
+            payloads = self.ingestQueue.getBatch()
+            batches = [decode(self.decoder, payloads)] if payloads else []
+            self.packets += len(payloads)
+        for batch in batches:
+            self.errors += batch.errors
+            gaps, times = self._track(batch.values)
+            if self.rules and batch.values is not None and len(batch.values):
+                self._applyRules(batch.values, arrival)
+            rows = capture_rows(batch.values, batch.text, self.decoder, self._fh.binary, times, gaps)
+            if rows is not None and self._fh.binary:
+                self._fh.writeValues(rows)
+            elif rows is not None:
+                self._fh.writeLines(rows)
+            if batch.values is not None and len(batch.values):
+                self._publish(batch.values)
+            if self.server is not None:
+                self.server.publish(self.stream, batch.values, batch.text, self.decoder.channels)
+        if batches:
+            self._fh.flush()
+        return batches[-1] if batches else None
+
+    def _track(self, values):
+        """
+        Follows the decoder's sequence counter and device timestamp, if it names them.
+
+        :return: (row numbers that follow a gap or None, aligned host times or None)
+        """
+        if values is None or not len(values):
+            return None, None
+        if not self._tracked:
+            self._tracked = True
+            self.sequence = SequenceTracker.fromDecoder(self.decoder, values.shape[1], self.config)
+            self.clockAligner = ClockAligner.fromDecoder(self.decoder, values.shape[1], self.config)
+        gaps = times = None
+        if self.sequence is not None:
+            gaps = self.sequence.check(values)
+            if not self.config.get("sequence", {}).get("markGaps", True):
+                gaps = None
+        if self.clockAligner is not None:
+            times = self.clockAligner.update(values)
+        return gaps, times
+
+    def _applyRules(self, values, arrival):
+        if self.ruleEngine is None:
+            self.ruleEngine = RuleEngine(self.rules, values.shape[1], self.decoder.channels, self.decoder.name)
+            for rule in self.ruleEngine.skipped:
+                logger.warning("Rule %s: no channel %s in this stream", rule.name, rule.channel)
+        for alert in self.ruleEngine.evaluate(values):
+            self.alerts += alert.active
+            if arrival is not None:
+                self.decideLatency.add(alert.decided - arrival)
+            if self.onAlert is not None:
+                self.onAlert(alert)
+            if alert.action is not None and self.transport is not None:
+                task = asyncio.ensure_future(self._writeBack(alert, arrival))
+                # keep a reference until the write is done
+                self._writes.add(task)
+                task.add_done_callback(self._writes.discard)
+
+    async def _writeBack(self, alert, arrival):
+        try:
+            await alert.action.send(self.transport)
+        except Exception:
+            logger.exception("Rule %s: write failed", alert.rule.name)
+            return
+        if arrival is not None:
+            self.writeLatency.add(time.perf_counter() - arrival)
+
+    def _publish(self, values):
+        if self.tapName is None:
+            return
+        if self.tap is None:
+            names = self.decoder.channels
+            if names is not None and len(names) != values.shape[1]:
+                names = None
+            self.tap = open_tap(self.tapName, values.shape[1], names, self.config)
+        if values.shape[1] == self.tap.channels:
+            self.tap.extend(values)
+
+    async def run(self, transport, duration=None, interval=0.05):
+        """
+        Streams payloads of a transport into the capture file.
+
+        :param transport: An open Transport, e.g. a BleTransport.
+        :param duration: Seconds to record, or None to record until cancelled.
+        :param interval: Seconds between decode passes.
+        """
+        self._fh = CaptureWriter.fromConfig(self.path, self.config, capture_names(self.decoder))
+        self.transport = transport
+        start = time.monotonic()
+        await transport.start(self.onNotify)
+        try:
+            while duration is None or time.monotonic() - start < duration:
+                await asyncio.sleep(interval)
+                self.drain()
+        finally:
+            try:
+                await transport.stop()
+            finally:
+                self.drain(wait=True)
+                if self._writes:
+                    await asyncio.gather(*self._writes, return_exceptions=True)
+                self._fh.close()
+                if self.pool is not None:
+                    self.pool.close()
+                if self.tap is not None:
+                    self.tap.close()
+
+    def stats(self):
+        stats = {"packets": self.packets, "errors": self.errors, "ingest": self.ingestQueue.stats()}
+        if self.server is not None:
+            stats["server"] = self.server.stats()
+        if self.sequence is not None:
+            stats["sequence"] = self.sequence.stats()
+        if self.clockAligner is not None:
+            stats["clock"] = self.clockAligner.stats()
+        if self.ruleEngine is not None:
+            stats["rules"] = {"alerts": self.alerts, "decide": self.decideLatency.summary(),
+                              "write": self.writeLatency.summary()}
+        return stats
+
+
+async def record(address, char_uuid, decoder_name, filename, duration=None, url=None, workers=None, tap=None,
+                 serve=None, rules=None, onAlert=None):
+    """
+    Records one characteristic, or a local transport given by url, without a GUI.
+
+    :param serve: Also stream the decoded batches on this port, 0 for the config.json port.
+    :param rules: Alert rules checked on every batch, see rules.py.
+    :param onAlert: Callable receiving every Alert.
+    """
+    config = load_config()
+    server = None
+    if serve is not None:
+        server = StreamServer.fromConfig(config, serve or None)
+        await server.start()
+        logger.info("Streaming on %s", server.url)
+    recorder = Recorder(get_decoder(decoder_name, config), filename, config, workers, tap, server, url or char_uuid,
+                        rules, onAlert)
+    try:
+        return await _record(recorder, address, char_uuid, duration, url)
+    finally:
+        if server is not None:
+            await server.close()
+
+
+async def _record(recorder, address, char_uuid, duration, url):
+    if url is not None:
+        transport = await open_transport(url)
+        logger.info("Recording %s to %s", transport, recorder.path)
+        try:
+            await recorder.run(transport, duration)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await transport.close()
+        return recorder
+
+    import bleak
+    async with bleak.BleakClient(address) as client:
+        transport = BleTransport(client, find_characteristic(client, char_uuid))
+        logger.info("Recording %s from %s to %s", char_uuid, address, recorder.path)
+        try:
+            await recorder.run(transport, duration)
+        except asyncio.CancelledError:
+            pass
+    return recorder
+
+
+async def write(address, char_uuid, data=None, lines=None, response=True, window=8, progress=None, url=None):
+    """
+    Connects to a device by address and writes a payload or a command script to a characteristic,
+    or to a local transport given by url.
+
+    :param data: Bytes to stream in MTU sized chunks.
+    :param lines: Command script lines, one write per line.
+    :param response: Use write-with-response.
+    :param window: Maximum number of write-without-response chunks in flight.
+    :param progress: Optional callable receiving WriteStats after every chunk.
+    :return: List of WriteStats.
+    """
+    if url is not None:
+        transport = await open_transport(url)
+        try:
+            return await _writeAll(WriteQueue(transport, response=response, window=window), data, lines, progress)
+        finally:
+            await transport.close()
+
+    import bleak
+    async with bleak.BleakClient(address) as client:
+        transport = BleTransport(client, find_characteristic(client, char_uuid))
+        return await _writeAll(WriteQueue(transport, response=response, window=window), data, lines, progress)
+
+
+async def probe(address, char_uuid, write_uuid=None, steps=None, label=None, url=None, connectionInterval=None,
+                progress=None):
+    """
+    Runs a latency and throughput probe against a characteristic pair, or a local transport given by url.
+
+    :param char_uuid: Characteristic the device notifies on.
+    :param write_uuid: Characteristic written to, defaults to char_uuid.
+    :param steps: Probe steps, see probe.py.
+    :param label: Name of the run, e.g. the firmware build.
+    :param connectionInterval: Connection interval in milliseconds, None if unknown.
+    :param progress: Callable receiving every finished step.
+    :return: The probe result dict.
+    """
+    if url is not None:
+        transport = await open_transport(url)
+        try:
+            return await Probe(transport, connectionInterval=connectionInterval).run(steps, label, progress)
+        finally:
+            await transport.close()
+
+    import bleak
+    async with bleak.BleakClient(address) as client:
+        notify = BleTransport(client, find_characteristic(client, char_uuid))
+        written = BleTransport(client, find_characteristic(client, write_uuid)) if write_uuid else None
+        return await Probe(notify, written, connectionInterval).run(steps, label, progress)
+
+
+async def _writeAll(queue, data, lines, progress):
+    results = []
+    if data is not None:
+        results.append(await queue.send(data, progress))
+    if lines is not None:
+        results.extend(await queue.sendLines(lines, progress))
+    return results
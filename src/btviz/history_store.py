@@ -0,0 +1,185 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+
+
+class HistoryStore:
+    """
+    A disk-backed multi-resolution sample history.
+
+    Level 0 holds every raw sample. Each coarser level k holds one (min, max, mean)
+    record per ``factor ** k`` raw samples and is updated incrementally as samples
+    arrive. Queries read only the level whose resolution fits the requested number
+    of points, so the memory needed to draw any span of the session is bounded by
+    the number of pixels on screen rather than by the session length.
+    """
+
+    MAX_LEVELS = 12
+
+    def __init__(self, channels, folder=None, factor=8, chunk=4096):
+        """
+        Initializes the history store.
+
+        :param channels: Number of channels per sample.
+        :param folder: Folder for the level files. A temporary folder, removed on close(), is used if omitted.
+        :param factor: Number of records of one level summarized by one record of the next level.
+        :param chunk: Number of raw samples buffered in memory before they are written to disk.
+        """
+        self.channels = channels
+        self.factor = factor
+        self.chunk = chunk
+        self._ownsFolder = folder is None
+        self.folder = folder or tempfile.mkdtemp(prefix="btviz-history-")
+        os.makedirs(self.folder, exist_ok=True)
+
+        self._buf = []
+        self._files = []
+        self._counts = []
+        self._pending = []
+        self._addLevel()
+
+    def _addLevel(self):
+        level = len(self._files)
+        path = os.path.join(self.folder, f"level{level}.f64")
+        self._files.append(open(path, "w+b"))
+        self._counts.append(0)
+        self._pending.append(np.empty((0, self.channels, 3)))
+
+    def _recordWidth(self, level):
+        return self.channels if level == 0 else self.channels * 3
+
+    def __len__(self):
+        return self._counts[0] + len(self._buf)
+
+    @property
+    def levels(self):
+        return len(self._files)
+
+    def append(self, sample):
+        """
+        Appends one sample.
+
+        :param sample: A scalar for single channel stores or a sequence with one value per channel.
+        """
+        self._buf.append(sample)
+        if len(self._buf) >= self.chunk:
+            self.flush()
+
+    def extend(self, samples):
+        """
+        Appends a batch of samples.
+
+        :param samples: Array-like of shape (n,) or (n, channels).
+        """
+        self._buf.extend(samples)
+        if len(self._buf) >= self.chunk:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes buffered samples to level 0 and propagates summaries to the coarser levels.
+        """
+        if not self._buf:
+            return
+        buf, self._buf = self._buf, []
+        try:
+            raw = np.asarray(buf, dtype=np.float64).reshape(-1, self.channels)
+        except ValueError:
+            # rows of another width, e.g. a short packet of a comma delimited stream, are dropped
+            rows = [row for row in buf if np.size(row) == self.channels]
+            if not rows:
+                return
+            raw = np.asarray(rows, dtype=np.float64).reshape(-1, self.channels)
+        self._write(0, raw)
+        self._propagate(1, np.repeat(raw[:, :, None], 3, axis=2))
+
+    def _write(self, level, records):
+        fh = self._files[level]
+        fh.seek(0, os.SEEK_END)
+        fh.write(np.ascontiguousarray(records).tobytes())
+        self._counts[level] += len(records)
+
+    def _propagate(self, level, records):
+        """
+        Folds records of level - 1 into complete groups of level and recurses upwards.
+        """
+        if level >= self.MAX_LEVELS:
+            return
+        if level == len(self._files):
+            if self._counts[level - 1] < self.factor:
+                return
+            self._addLevel()
+            # The new level starts from everything written below it so far
+            records = self._read(level - 1, 0, self._counts[level - 1])
+            if level - 1 == 0:
+                records = np.repeat(records[:, :, None], 3, axis=2)
+        pending = np.concatenate([self._pending[level], records])
+        complete = len(pending) // self.factor * self.factor
+        self._pending[level] = pending[complete:]
+        if complete == 0:
+            return
+        groups = pending[:complete].reshape(-1, self.factor, self.channels, 3)
+        summary = np.empty((len(groups), self.channels, 3))
+        summary[:, :, 0] = groups[:, :, :, 0].min(axis=1)
+        summary[:, :, 1] = groups[:, :, :, 1].max(axis=1)
+        summary[:, :, 2] = groups[:, :, :, 2].mean(axis=1)
+        self._write(level, summary)
+        self._propagate(level + 1, summary)
+
+    def _read(self, level, start, stop):
+        width = self._recordWidth(level)
+        count = max(0, stop - start)
+        fh = self._files[level]
+        fh.flush()
+        fh.seek(start * width * 8)
+        data = np.fromfile(fh, dtype=np.float64, count=count * width)
+        if level == 0:
+            return data.reshape(-1, self.channels)
+        return data.reshape(-1, self.channels, 3)
+
+    def levelFor(self, start, stop, max_points):
+        """
+        Returns the finest level that covers [start, stop) with at most max_points records.
+        """
+        span = max(1, stop - start)
+        level = 0
+        while level + 1 < self.levels and span / self.factor ** level > max_points:
+            level += 1
+        return level
+
+    def query(self, start, stop, max_points=2000):
+        """
+        Reads a span of the history at the resolution that fits max_points.
+
+        :param start: First raw sample index.
+        :param stop: Raw sample index one past the end.
+        :param max_points: Maximum number of points the caller can display.
+        :return: Tuple (x, lo, hi, mean) where x holds raw sample indices and lo, hi
+                 and mean are arrays of shape (n, channels).
+        """
+        self.flush()
+        start = max(0, int(start))
+        stop = min(self._counts[0], int(stop))
+        if stop <= start:
+            empty = np.empty((0, self.channels))
+            return np.empty(0), empty, empty, empty
+        level = self.levelFor(start, stop, max_points)
+        scale = self.factor ** level
+        first = start // scale
+        last = min(self._counts[level], -(-stop // scale))
+        records = self._read(level, first, last)
+        x = (np.arange(first, first + len(records)) + 0.5) * scale - 0.5 if level else np.arange(first, last)
+        if level == 0:
+            return x, records, records, records
+        return x, records[:, :, 0], records[:, :, 1], records[:, :, 2]
+
+    def close(self):
+        """
+        Closes the level files and removes the folder if it was created by the store.
+        """
+        for fh in self._files:
+            fh.close()
+        self._files = []
+        if self._ownsFolder:
+            shutil.rmtree(self.folder, ignore_errors=True)
@@ -0,0 +1,153 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from .render_clock import shared_clock
+from .utils import calculate_window
+
+
+class HistoryWidget(QWidget):
+    """
+    A widget for zooming and panning through the whole session stored in a HistoryStore.
+
+    Every redraw reads only the history level that fits the pixel width of the axes,
+    showing the min/max envelope and the mean of each channel.
+    """
+
+    def __init__(self, store, title="History"):
+        """
+        Initializes the history widget.
+
+        :param store: The HistoryStore to display.
+        :param title: Title shown above the plot.
+        """
+        super().__init__()
+
+        self.store = store
+        self.clock = shared_clock()
+
+        self._title = title
+        self._rendering = False
+        self._fills = []
+        self._lines = []
+
+        self.followCheck = None
+        self.fullButton = None
+
+        self.initUI()
+
+    def initUI(self):
+        """
+        Initializes the user interface for the history widget.
+        """
+        self.setWindowTitle(self._title)
+        window_width, window_height, x_pos, y_pos = calculate_window(scale_width=0.7, scale_height=0.6)
+        self.setGeometry(x_pos, y_pos, window_width, window_height)
+        self.setStyleSheet("background-color: #4B9CD3; color: white;")
+
+        button_style = """
+        QPushButton {
+            background-color: #4B9CD3;
+            color: white;
+            border: .5px solid white;
+            border-radius: 5px;
+            font-size: 14px;
+            font-weight: bold;
+            padding: 5px;
+        }
+        QPushButton:hover {
+            background-color: #13294B;
+        }
+        """
+
+        self.figure = Figure(tight_layout=True)
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title(self._title)
+        self.ax.set_xlabel("Sample")
+        self.ax.callbacks.connect('xlim_changed', self.onViewChanged)
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        self.toolbar.setStyleSheet("background-color: #E7EBEB;")
+
+        self.followCheck = QCheckBox("Follow live data")
+        self.followCheck.setChecked(True)
+        self.followCheck.setStyleSheet("font-size: 14px; font-weight: bold; color: white;")
+        self.followCheck.stateChanged.connect(lambda _: self.markDirty())
+
+        self.fullButton = QPushButton("Full Session")
+        self.fullButton.clicked.connect(self.showFullSession)
+        self.fullButton.setStyleSheet(button_style)
+
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(self.followCheck)
+        header_layout.addWidget(self.fullButton)
+        header_layout.addStretch()
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(header_layout)
+        layout.addWidget(self.toolbar)
+        layout.addWidget(self.canvas, 1)
+
+    def markDirty(self):
+        """
+        Requests a redraw on the next render clock tick.
+        """
+        if self.followCheck.isChecked() or not self._lines:
+            self.clock.markDirty(self)
+
+    def onViewChanged(self, ax):
+        """
+        Re-reads the history at the resolution of the new view after a zoom or pan.
+        """
+        if not self._rendering:
+            self.followCheck.setChecked(False)
+            self.clock.markDirty(self)
+
+    def showFullSession(self):
+        self.followCheck.setChecked(False)
+        self._rendering = True
+        self.ax.set_xlim(0, max(1, len(self.store)))
+        self._rendering = False
+        self.clock.markDirty(self)
+
+    def render(self):
+        """
+        Queries the store for the visible span and redraws the envelopes.
+        """
+        self._rendering = True
+        try:
+            if self.followCheck.isChecked() or not self._lines:
+                start, stop = 0, max(1, len(self.store))
+                self.ax.set_xlim(start, stop)
+            else:
+                start, stop = self.ax.get_xlim()
+            pixels = max(100, int(self.ax.get_window_extent().width))
+            x, lo, hi, mean = self.store.query(int(start), int(stop) + 1, max_points=pixels)
+
+            for fill in self._fills:
+                fill.remove()
+            self._fills = []
+            while len(self._lines) < self.store.channels:
+                line, = self.ax.plot([], [], linewidth=1)
+                self._lines.append(line)
+            for i, line in enumerate(self._lines):
+                line.set_data(x, mean[:, i])
+                if lo is not mean:
+                    self._fills.append(self.ax.fill_between(x, lo[:, i], hi[:, i],
+                                                            color=line.get_color(), alpha=0.25, linewidth=0))
+            if len(x):
+                ymin, ymax = lo.min(), hi.max()
+                pad = (ymax - ymin) * 0.05 or 1
+                self.ax.set_ylim(ymin - pad, ymax + pad)
+            self.canvas.draw_idle()
+        finally:
+            self._rendering = False
+
+    def showEvent(self, event):
+        # registered only while shown, so a closed and reopened window redraws again
+        self.clock.register(self, self.render)
+        event.accept()
+
+    def hideEvent(self, event):
+        self.clock.unregister(self)
+        event.accept()
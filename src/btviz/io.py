@@ -0,0 +1,299 @@
+"""
+Offline access to capture files for analysis scripts. Nothing here imports Qt.
+
+Captures are opened lazily. Binary captures (".bin") are memory-mapped, so
+``capture.values`` is a read-only NumPy array of shape (samples, channels) backed by
+the file, and slicing it reads only the pages touched. Text captures are parsed in
+chunks of rows. Both kinds support the same chunked operations, which never hold more
+than one chunk in memory:
+
+    from btviz.io import open_capture
+    capture = open_capture("results/2026-10-19/imu.bin")
+    capture.stats()["mean"]              # per-channel mean over the whole file
+    lo, hi = capture.resample(2000, "minmax")
+    for rows in capture.chunks():        # arrays of shape (n, channels)
+        ...
+
+Rows of NaN are the gap markers written after lost packets. They keep their place in
+the sample numbering, so len() and the chunks include them, but stats() and the
+"mean" and "minmax" resampling skip NaN values.
+"""
+import itertools
+import os
+import numpy as np
+from .capture import CaptureFile, is_binary_capture, read_binary_header, load_index
+from .channel_stats import moments, merge, summarize
+
+DEFAULT_CHUNK = 1 << 16
+RESAMPLE_METHODS = ("mean", "minmax", "first")
+
+
+def open_capture(path):
+    """
+    Opens a capture written by BTViz.
+
+    :param path: A text capture or a ".bin" binary capture.
+    :return: A BinaryCapture or a TextCapture.
+    """
+    if is_binary_capture(path):
+        return BinaryCapture(path)
+    return TextCapture(path)
+
+
+def _nanmean(values, axis, keepdims=False):
+    """
+    Mean ignoring NaN, NaN without the warning of np.nanmean where every value is NaN.
+    """
+    valid = ~np.isnan(values)
+    total = np.where(valid, values, 0.0).sum(axis=axis, keepdims=keepdims)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / valid.sum(axis=axis, keepdims=keepdims)
+
+
+def _nanmin(values, axis, keepdims=False):
+    return np.fmin.reduce(values, axis=axis, keepdims=keepdims)
+
+
+def _nanmax(values, axis, keepdims=False):
+    return np.fmax.reduce(values, axis=axis, keepdims=keepdims)
+
+
+def _reduce(func, groups, tail):
+    """
+    Applies func to every group of shape (factor, channels) and to the incomplete last group.
+    """
+    parts = [func(groups, axis=1)]
+    if len(tail):
+        parts.append(func(tail, axis=0, keepdims=True))
+    return np.concatenate(parts)
+
+
+class Capture:
+    """
+    Common chunked operations of binary and text captures.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.channels = None
+        self.names = None
+        self._file = None
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def chunks(self, chunkSize=DEFAULT_CHUNK, start=0, stop=None):
+        """
+        Yields the samples [start, stop) as arrays of shape (n, channels), at most chunkSize rows each.
+        """
+        raise NotImplementedError
+
+    def read(self, start=0, stop=None):
+        """
+        Returns the samples [start, stop) as one array.
+        """
+        parts = list(self.chunks(start=start, stop=stop))
+        return np.concatenate(parts) if parts else np.empty((0, self.channels or 0))
+
+    def stats(self, start=0, stop=None, chunkSize=DEFAULT_CHUNK):
+        """
+        Computes per-channel summary statistics in one pass over the samples [start, stop).
+        NaN values, e.g. gap marker rows, are skipped.
+
+        :return: Dict with "count", the samples without gap markers, "gaps", the gap markers,
+                 and arrays "min", "max", "mean" and "std", one value per channel.
+        """
+        count = gaps = 0
+        total = None
+        for rows in self.chunks(chunkSize, start, stop):
+            if not len(rows):
+                continue
+            rows = np.asarray(rows, dtype=np.float64)
+            markers = int(np.isnan(rows).all(axis=1).sum())
+            gaps += markers
+            count += len(rows) - markers
+            chunk = moments(rows)
+            # merge the chunk's moments into the running ones
+            total = chunk if total is None else merge(*(np.stack(pair) for pair in zip(total, chunk)))
+        if total is None:
+            empty = np.full(self.channels or 0, np.nan)
+            return {"count": 0, "gaps": 0, "min": empty, "max": empty, "mean": empty, "std": empty}
+        summary = summarize(*total)
+        return {"count": count, "gaps": gaps, "min": summary["min"], "max": summary["max"],
+                "mean": summary["mean"], "std": summary["std"]}
+
+    def resample(self, points=None, method="mean", factor=None, start=0, stop=None):
+        """
+        Reduces the samples [start, stop) to about points rows, or to one row per factor samples.
+
+        :param points: Target number of rows. Ignored when factor is given.
+        :param method: "mean" averages each group, "first" keeps its first sample and
+                       "minmax" returns (lo, hi) arrays, the envelope used for plotting.
+                       "mean" and "minmax" skip NaN, a group of gap markers only gives NaN.
+        :param factor: Number of samples per output row.
+        :return: Array of shape (n, channels), or (lo, hi) for "minmax".
+        """
+        if method not in RESAMPLE_METHODS:
+            raise ValueError(f"Unknown resample method '{method}', expected one of {', '.join(RESAMPLE_METHODS)}")
+        stop = len(self) if stop is None else min(stop, len(self))
+        if factor is None:
+            if not points:
+                raise ValueError("Give points or factor")
+            factor = max(1, -(-(stop - start) // points))
+        # chunks are a multiple of factor so groups never straddle two chunks
+        chunkSize = max(factor, DEFAULT_CHUNK // factor * factor)
+        outputs = []
+        for rows in self.chunks(chunkSize, start, stop):
+            whole = len(rows) // factor * factor
+            groups = rows[:whole].reshape(-1, factor, rows.shape[1])
+            tail = rows[whole:]
+            if method == "first":
+                out = [rows[::factor]]
+            elif method == "mean":
+                out = [_reduce(_nanmean, groups, tail)]
+            else:
+                out = [_reduce(_nanmin, groups, tail), _reduce(_nanmax, groups, tail)]
+            outputs.append(out)
+        width = self.channels or 0
+        if not outputs:
+            empty = np.empty((0, width))
+            return (empty, empty) if method == "minmax" else empty
+        if method == "minmax":
+            return np.concatenate([o[0] for o in outputs]), np.concatenate([o[1] for o in outputs])
+        return np.concatenate([o[0] for o in outputs])
+
+    def _indexed(self):
+        if self._file is None:
+            self._file = CaptureFile(self.path)
+        return self._file
+
+    def sampleAt(self, t):
+        """
+        Estimates the first sample written at or after host time t, from the capture's index.
+        """
+        return self._indexed().sampleAt(t)
+
+    def timeOf(self, sample):
+        return self._indexed().timeOf(sample)
+
+    def readTime(self, t0, t1):
+        """
+        Returns the samples written between host times t0 and t1 and the number of the first one.
+
+        :return: (first sample number, array of shape (n, channels))
+        """
+        start, stop = self.sampleAt(t0), self.sampleAt(t1)
+        return start, self.read(start, stop)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryCapture(Capture):
+    """
+    A binary capture, memory-mapped without copying.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        with open(self.path, "rb") as fh:
+            self.dataOffset, self.channels, self.dtype, self.names = read_binary_header(fh)
+        self._values = None
+
+    @property
+    def values(self):
+        """
+        Read-only array of shape (samples, channels) backed by the file.
+
+        Samples appended after the first access are not included; reopen the capture to see them.
+        """
+        if self._values is None:
+            rows = (os.path.getsize(self.path) - self.dataOffset) // (self.channels * self.dtype.itemsize)
+            if rows == 0:
+                self._values = np.empty((0, self.channels), dtype=self.dtype)
+            else:
+                self._values = np.memmap(self.path, dtype=self.dtype, mode="r", offset=self.dataOffset,
+                                         shape=(rows, self.channels))
+        return self._values
+
+    def __len__(self):
+        return len(self.values)
+
+    def channel(self, name):
+        """
+        Returns one channel, by name or number, as a strided view of the mapped file.
+        """
+        return self.values[:, self.names.index(name) if isinstance(name, str) else name]
+
+    def chunks(self, chunkSize=DEFAULT_CHUNK, start=0, stop=None):
+        values = self.values
+        stop = len(values) if stop is None else min(stop, len(values))
+        for first in range(max(0, start), stop, chunkSize):
+            yield values[first:min(first + chunkSize, stop)]
+
+    def read(self, start=0, stop=None):
+        # a view, not a copy
+        return self.values[start:stop]
+
+    def close(self):
+        super().close()
+        if isinstance(self._values, np.memmap):
+            self._values._mmap.close()
+        self._values = None
+
+
+class TextCapture(Capture):
+    """
+    A text capture with one line of comma separated numbers per sample, parsed in chunks.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        with open(self.path, "rb") as fh:
+            first = fh.readline().decode("utf-8", errors="replace").strip()
+        self.channels = len(first.split(",")) if first else 0
+        self.names = [f"ch{i}" for i in range(self.channels)]
+        self._length = None
+
+    def __len__(self):
+        # the index makes this a bounded read, older captures are counted once
+        if load_index(self.path)[0].size:
+            return len(self._indexed())
+        if self._length is None:
+            with open(self.path, "rb") as fh:
+                self._length = sum(chunk.count(b"\n") for chunk in iter(lambda: fh.read(1 << 20), b""))
+        return self._length
+
+    def lines(self, start=0, stop=None):
+        """
+        Yields the raw lines of the samples [start, stop), e.g. for text-only decoders.
+        """
+        with open(self.path, "rb") as fh:
+            if start > 0 and load_index(self.path)[0].size:
+                entry = self._indexed()._entryBefore(start)
+                fh.seek(int(entry["offset"]))
+                skip = start - int(entry["sample"])
+            else:
+                skip = max(0, start)
+            rows = itertools.islice(fh, skip, None if stop is None else skip + max(0, stop - start))
+            for line in rows:
+                yield line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def chunks(self, chunkSize=DEFAULT_CHUNK, start=0, stop=None):
+        lines = self.lines(start, stop)
+        while True:
+            block = list(itertools.islice(lines, chunkSize))
+            if not block:
+                return
+            try:
+                yield np.loadtxt(block, delimiter=",", dtype=np.float64, ndmin=2)
+            except ValueError as e:
+                raise ValueError(f"{self.path} does not hold numeric samples: {e}") from e
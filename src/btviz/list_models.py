@@ -0,0 +1,124 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+
+#: Role holding the object behind an entry, e.g. a BLEDevice or a characteristic.
+ObjectRole = Qt.UserRole
+#: Role holding the entry name, used for sorting by name.
+NameRole = Qt.UserRole + 1
+#: Role holding the signal strength, used for sorting by RSSI.
+RssiRole = Qt.UserRole + 2
+
+
+class EntryListModel(QAbstractListModel):
+    """
+    A list of keyed entries that is updated in place.
+
+    upsert() appends unknown keys with a single row insert and updates known keys with
+    a single dataChanged, so views only repaint what changed and repeated scans never
+    create duplicates.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys = []
+        self._rows = {}
+        self._entries = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        obj, name, rssi = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return name if rssi is None else f"{name}    {rssi} dBm"
+        if role == Qt.ToolTipRole:
+            return str(obj)
+        if role == ObjectRole:
+            return obj
+        if role == NameRole:
+            return name.lower()
+        if role == RssiRole:
+            return -1000 if rssi is None else rssi
+        return None
+
+    def upsert(self, key, obj, name, rssi=None):
+        """
+        Adds an entry or updates the entry with the same key.
+
+        :param key: Unique key, e.g. the device address.
+        :param obj: Object returned for ObjectRole.
+        :param name: Display name.
+        :param rssi: Signal strength in dBm, or None.
+        """
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._entries)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._keys.append(key)
+            self._rows[key] = row
+            self._entries.append((obj, name, rssi))
+            self.endInsertRows()
+        else:
+            changed = self._entries[row][1:] != (name, rssi)
+            self._entries[row] = (obj, name, rssi)
+            if changed:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+    def upsertMany(self, entries):
+        """
+        Applies several upserts, inserting all new keys with one row insert.
+
+        :param entries: Iterable of (key, obj, name, rssi).
+        """
+        new = {}
+        for key, obj, name, rssi in entries:
+            if key in self._rows:
+                self.upsert(key, obj, name, rssi)
+            else:
+                new[key] = (obj, name, rssi)
+        if not new:
+            return
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        for key, (obj, name, rssi) in new.items():
+            self._rows[key] = len(self._entries)
+            self._keys.append(key)
+            self._entries.append((obj, name, rssi))
+        self.endInsertRows()
+
+    def get(self, key):
+        row = self._rows.get(key)
+        return None if row is None else self._entries[row][0]
+
+    def clear(self):
+        self.beginResetModel()
+        self._keys = []
+        self._rows = {}
+        self._entries = []
+        self.endResetModel()
+
+
+class EntryFilterModel(QSortFilterProxyModel):
+    """
+    Sorts and filters an EntryListModel without touching the source rows.
+    """
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setFilterRole(Qt.DisplayRole)
+        self.setDynamicSortFilter(True)
+
+    def sortByName(self):
+        self.setSortRole(NameRole)
+        self.sort(0, Qt.AscendingOrder)
+
+    def sortByRssi(self):
+        self.setSortRole(RssiRole)
+        self.sort(0, Qt.DescendingOrder)
+
+    def objectAt(self, index):
+        return self.data(index, ObjectRole) if index.isValid() else None
@@ -0,0 +1,239 @@
+"""
+Event loop lag monitoring and on-demand profiling. Nothing here imports Qt.
+
+The LoopMonitor measures how late a periodic heartbeat on the event loop fires. Any
+synchronous work that holds the loop, a slow slot, a modal message box or a long
+decode, shows up as lag, which is exactly the delay BLE callbacks see. To attribute
+the lag, every asyncio callback and every function decorated with @timed that runs
+longer than a threshold is recorded with its duration.
+
+Environment variables:
+
+    BTVIZ_PROFILE=1     run cProfile for the whole session and write the report on exit
+"""
+import asyncio
+import cProfile
+import functools
+import heapq
+import io
+import os
+import pstats
+import time
+from collections import deque
+from .capture import capture_path
+
+_monitor = None
+_originalRun = None
+
+
+def _describe(callback):
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Future) and hasattr(owner, "get_coro"):
+        coro = owner.get_coro()
+        return f"task {getattr(coro, '__qualname__', coro)}"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+def _timedRun(handle):
+    if _monitor is None or not _monitor.running or hasattr(handle._callback, "__wrapped__"):
+        # @timed functions record themselves
+        return _originalRun(handle)
+    start = time.perf_counter()
+    try:
+        return _originalRun(handle)
+    finally:
+        _monitor.record(_describe(handle._callback), time.perf_counter() - start)
+
+
+def timed(func):
+    """
+    Records calls of func that take longer than the monitor's threshold. Meant for Qt
+    slots and timer callbacks, which do not run as asyncio callbacks.
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _monitor is None or not _monitor.running:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _monitor.record(name, time.perf_counter() - start)
+    return wrapper
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag and keeps the slowest callbacks.
+    """
+
+    def __init__(self, interval=0.05, slowThreshold=0.02, stallThreshold=0.1, keep=25):
+        """
+        :param interval: Seconds between heartbeats.
+        :param slowThreshold: Callbacks running longer than this many seconds are recorded.
+        :param stallThreshold: Lag above this many seconds counts as a stall.
+        :param keep: Number of slowest individual calls kept.
+        """
+        self.interval = interval
+        self.slowThreshold = slowThreshold
+        self.stallThreshold = stallThreshold
+        self.keep = keep
+        self.running = False
+        self._task = None
+        self.reset()
+
+    def reset(self):
+        self.lags = deque(maxlen=1200)
+        self.maxLag = 0.0
+        self.stalls = 0
+        self.slowest = []
+        self.byName = {}
+
+    def start(self, loop=None):
+        """
+        Starts the heartbeat on loop, or on the current event loop.
+        """
+        global _originalRun
+        if _originalRun is None:
+            _originalRun = asyncio.events.Handle._run
+            asyncio.events.Handle._run = _timedRun
+        loop = loop or asyncio.get_event_loop()
+        self.running = True
+        self._task = loop.create_task(self._heartbeat())
+
+    def stop(self):
+        self.running = False
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.lags.append(lag)
+            self.maxLag = max(self.maxLag, lag)
+            if lag > self.stallThreshold:
+                self.stalls += 1
+
+    def record(self, name, duration):
+        """
+        Records one call of name that took duration seconds, if it was slow.
+        """
+        if duration < self.slowThreshold:
+            return
+        count, total, longest = self.byName.get(name, (0, 0.0, 0.0))
+        self.byName[name] = (count + 1, total + duration, max(longest, duration))
+        entry = (duration, time.time(), name)
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def stats(self):
+        lags = sorted(self.lags)
+        return {
+            "last": self.lags[-1] if self.lags else 0.0,
+            "p99": lags[int(len(lags) * 0.99)] if lags else 0.0,
+            "max": self.maxLag,
+            "stalls": self.stalls,
+        }
+
+    def report(self):
+        """
+        Returns a text report of the lag and the slowest callbacks.
+        """
+        stats = self.stats()
+        lines = [f"Event loop lag: last {stats['last'] * 1000:.1f} ms, p99 {stats['p99'] * 1000:.1f} ms, "
+                 f"max {stats['max'] * 1000:.1f} ms, {stats['stalls']} stalls over "
+                 f"{self.stallThreshold * 1000:.0f} ms",
+                 "",
+                 f"Slow callbacks (over {self.slowThreshold * 1000:.0f} ms) by total time:"]
+        for name, (count, total, longest) in sorted(self.byName.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"  {total * 1000:9.1f} ms total  {count:6d} calls  max {longest * 1000:8.1f} ms  {name}")
+        lines += ["", "Slowest calls:"]
+        for duration, when, name in sorted(self.slowest, reverse=True):
+            lines.append(f"  {duration * 1000:9.1f} ms  {time.strftime('%H:%M:%S', time.localtime(when))}  {name}")
+        return "\n".join(lines) + "\n"
+
+    def writeReport(self):
+        """
+        Writes the report under results/<date>/ and returns its path.
+        """
+        path = capture_path(f"loop_report_{time.strftime('%H%M%S')}.txt")
+        with open(path, "w") as fh:
+            fh.write(self.report())
+        return path
+
+
+class Profiler:
+    """
+    Starts and stops cProfile captures of the GUI thread.
+    """
+
+    def __init__(self):
+        self._profile = None
+
+    @property
+    def running(self):
+        return self._profile is not None
+
+    def start(self):
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self, top=40):
+        """
+        Stops the capture and writes profile_<time>.prof and a text summary under results/<date>/.
+
+        :param top: Number of functions listed in the summary.
+        :return: Path of the summary, or None if no capture was running.
+        """
+        if self._profile is None:
+            return None
+        profile, self._profile = self._profile, None
+        profile.disable()
+        base = capture_path(f"profile_{time.strftime('%H%M%S')}")
+        profile.dump_stats(base + ".prof")
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(top)
+        with open(base + ".txt", "w") as fh:
+            fh.write(out.getvalue())
+        return base + ".txt"
+
+
+_profiler = None
+
+
+def get_monitor():
+    """
+    Returns the application wide loop monitor, creating it on first use.
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor()
+    return _monitor
+
+
+def get_profiler():
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+def profile_from_env():
+    """
+    Starts a session wide profile when BTVIZ_PROFILE is set.
+
+    :return: The running Profiler, or None.
+    """
+    if os.environ.get("BTVIZ_PROFILE", "") in ("", "0"):
+        return None
+    profiler = get_profiler()
+    profiler.start()
+    return profiler
@@ -8,12 +8,17 @@ class PlotSettingsWidget(QWidget):
     """
     gotPlotSetting = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, scales=""):
+        """
+        :param scales: The current per-channel gains and offsets of stacked traces.
+        """
         super().__init__()
         self.titleText = QTextEdit()
         self.xAxisText = QTextEdit()
         self.yAxisText = QTextEdit()
         self.windowText = QTextEdit()
+        self.scaleText = QTextEdit()
+        self._scales = scales
         self.saveButton = QPushButton("save settings")
         self.init_ui()
 
@@ -46,6 +51,9 @@ class PlotSettingsWidget(QWidget):
         self.yAxisText.setStyleSheet(text_style)
         self.windowText.setPlainText("50")
         self.windowText.setStyleSheet(text_style)
+        self.scaleText.setPlainText(self._scales)
+        self.scaleText.setPlaceholderText("channel:gain:offset, e.g. x:0.5:0 y:2, empty for automatic")
+        self.scaleText.setStyleSheet(text_style)
         
         self.saveButton.setStyleSheet(button_style)
         self.saveButton.clicked.connect(self.on_save)
@@ -71,6 +79,11 @@ class PlotSettingsWidget(QWidget):
         window_label.setStyleSheet(label_style)
         layout.addWidget(window_label)
         layout.addWidget(self.windowText)
+
+        scale_label = QLabel("Stacked Trace Gain and Offset")
+        scale_label.setStyleSheet(label_style)
+        layout.addWidget(scale_label)
+        layout.addWidget(self.scaleText)
         
         layout.addWidget(self.saveButton)
 
@@ -78,6 +91,7 @@ class PlotSettingsWidget(QWidget):
         ret_str = self.titleText.toPlainText() + ',' \
                   + self.xAxisText.toPlainText() + ',' \
                   + self.yAxisText.toPlainText() + ',' \
-                  + self.windowText.toPlainText()
+                  + self.windowText.toPlainText() + ',' \
+                  + self.scaleText.toPlainText().replace(',', ' ')
         self.gotPlotSetting.emit(ret_str)
         self.close()
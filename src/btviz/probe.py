@@ -0,0 +1,380 @@
+"""
+Round-trip latency and throughput probe for a characteristic pair. Nothing here imports Qt.
+
+A probe runs a script of timed steps against a notify characteristic and a write
+characteristic, which may be the same one. The script is a list of steps, by default
+the "probe" section of config.json, or a JSON file given to 'btviz probe --script':
+
+    [
+        {"test": "echo", "count": 100, "size": 20, "response": true, "timeout": 1.0},
+        {"test": "notify", "duration": 5, "start": {"text": "STREAM ON\\n"}, "stop": {"text": "STREAM OFF\\n"}},
+        {"test": "write", "duration": 5, "size": null, "window": 8}
+    ]
+
+echo    writes tagged payloads one at a time and waits for the device to notify them
+        back, for a round-trip latency histogram. The firmware has to echo writes.
+notify  counts the notifications the device sends during duration seconds, after
+        writing the optional start command, for the notify goodput.
+write   streams write-without-response chunks of size bytes (null for the largest
+        write) for duration seconds, for the write goodput accepted by the host stack.
+
+Packets per connection interval need the interval, which the host stacks do not
+report: give it in milliseconds as "connectionInterval". Without it only the arrival
+bursts are reported, i.e. notifications delivered together, usually one connection
+event. Results are saved as JSON under results/<date>/ together with the host
+details, so firmware builds and hosts can be compared with 'btviz probe --compare'.
+"""
+import asyncio
+import datetime
+import json
+import platform
+import re
+import time
+import numpy as np
+from .capture import capture_path
+from .rules import WriteAction
+from .write_queue import WriteQueue
+
+#: Upper edges of the round-trip histogram bins in milliseconds, fixed so that runs can be compared.
+HISTOGRAM_EDGES = (2.5, 5, 7.5, 10, 15, 20, 30, 40, 50, 75, 100, 150, 200, 300, 500, 1000)
+
+#: Notifications closer together than this, in seconds, belong to the same arrival burst.
+BURST_GAP = 0.001
+
+DEFAULT_STEPS = [
+    {"test": "echo", "count": 100, "size": 20, "response": True, "timeout": 1.0},
+    {"test": "notify", "duration": 5},
+    {"test": "write", "duration": 5, "size": None, "window": 8},
+]
+
+
+def _percentiles(ms):
+    if not len(ms):
+        return {}
+    return {"min": float(ms.min()), "p50": float(np.percentile(ms, 50)), "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)), "max": float(ms.max()), "mean": float(ms.mean())}
+
+
+def histogram(ms):
+    """
+    Counts round trips per HISTOGRAM_EDGES bin, the last bin holds everything slower.
+
+    :param ms: Round-trip times in milliseconds.
+    :return: List of (upper edge or None, count).
+    """
+    edges = list(HISTOGRAM_EDGES)
+    counts = np.bincount(np.searchsorted(edges, ms, side="left"), minlength=len(edges) + 1)
+    return list(zip(edges + [None], counts.tolist()))
+
+
+def arrival_bursts(arrivals):
+    """
+    Groups notification arrival times into bursts.
+
+    :param arrivals: Increasing arrival times in seconds.
+    :return: (number of bursts, median spacing of burst starts in seconds or None)
+    """
+    if len(arrivals) < 2:
+        return len(arrivals), None
+    gaps = np.diff(arrivals)
+    spacing = gaps[gaps > BURST_GAP]
+    return int(len(spacing) + 1), float(np.median(spacing)) if len(spacing) else None
+
+
+class Probe:
+    """
+    Runs probe steps against a notify transport and a write transport.
+    """
+
+    def __init__(self, notifyTransport, writeTransport=None, connectionInterval=None):
+        """
+        :param notifyTransport: Transport the device notifies on.
+        :param writeTransport: Transport written to, defaults to notifyTransport.
+        :param connectionInterval: Connection interval in milliseconds, None if unknown.
+        """
+        self.notifyTransport = notifyTransport
+        self.writeTransport = writeTransport or notifyTransport
+        self.connectionInterval = connectionInterval
+        self._arrivals = []
+        self._sizes = []
+        self._expected = None
+        self._echo = None
+
+    def _onNotify(self, sender, data):
+        now = time.perf_counter()
+        self._arrivals.append(now)
+        self._sizes.append(len(data))
+        if self._expected is not None and self._expected in bytes(data) and not self._echo.done():
+            self._echo.set_result(now)
+
+    def _reset(self):
+        self._arrivals = []
+        self._sizes = []
+
+    def _perInterval(self, packets, elapsed):
+        if self.connectionInterval is None or elapsed <= 0:
+            return None
+        return packets / elapsed * self.connectionInterval / 1000
+
+    async def echo(self, count=100, size=20, response=True, timeout=1.0, gap=0.0):
+        """
+        Measures write-then-notify round trips.
+
+        :param size: Payload size in bytes, at least 10 for the tag.
+        :param gap: Seconds to wait between round trips.
+        """
+        loop = asyncio.get_running_loop()
+        rtts, writes, lost = [], [], 0
+        for i in range(count):
+            # the tag identifies the echo, the newline frames it on line based transports
+            tag = f"#{i:08x}".encode()
+            payload = tag + b"." * max(0, size - len(tag) - 1) + b"\n"
+            self._expected, self._echo = tag, loop.create_future()
+            start = time.perf_counter()
+            await self.writeTransport.write(payload, response)
+            writes.append(time.perf_counter() - start)
+            try:
+                arrived = await asyncio.wait_for(self._echo, timeout)
+            except asyncio.TimeoutError:
+                lost += 1
+            else:
+                rtts.append(arrived - start)
+            if gap:
+                await asyncio.sleep(gap)
+        self._expected = None
+        ms = np.array(rtts) * 1000
+        return {"sent": count, "received": len(rtts), "lost": lost, "size": len(payload),
+                "rtt": _percentiles(ms), "write": _percentiles(np.array(writes) * 1000),
+                "histogram": histogram(ms)}
+
+    async def notify(self, duration=5.0, start=None, stop=None):
+        """
+        Counts the notifications received during duration seconds.
+
+        :param start: WriteAction sent first, e.g. a command that starts streaming.
+        :param stop: WriteAction sent at the end.
+        """
+        self._reset()
+        if start is not None:
+            await start.send(self.writeTransport)
+        await asyncio.sleep(duration)
+        arrivals, sizes = np.array(self._arrivals), list(self._sizes)
+        if stop is not None:
+            await stop.send(self.writeTransport)
+        packets = len(arrivals)
+        # rates are taken between the first and the last notification, so a slow start does not count
+        elapsed = float(arrivals[-1] - arrivals[0]) if packets > 1 else 0.0
+        rate = (packets - 1) / elapsed if elapsed > 0 else 0.0
+        goodput = sum(sizes[1:]) / elapsed if elapsed > 0 else 0.0
+        bursts, spacing = arrival_bursts(arrivals)
+        return {"packets": packets, "bytes": sum(sizes), "elapsed": elapsed, "packetRate": rate, "goodput": goodput,
+                "perInterval": self._perInterval(packets - 1, elapsed),
+                "perBurst": packets / bursts if bursts else 0.0,
+                "burstSpacing": spacing * 1000 if spacing is not None else None}
+
+    async def write(self, duration=5.0, size=None, window=8):
+        """
+        Streams write-without-response chunks for duration seconds.
+
+        :param size: Chunk size, None for the largest write the transport allows.
+        """
+        queue = WriteQueue(self.writeTransport, response=False, window=window, chunkSize=size)
+        chunk = queue.chunkSize()
+        block = (bytes(range(256)) * (chunk * window * 4 // 256 + 1))[:chunk * window * 4]
+        sent = chunks = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            stats = await queue.send(block)
+            sent += stats.sent
+            chunks += stats.chunks
+        elapsed = time.perf_counter() - start
+        return {"bytes": sent, "packets": chunks, "size": chunk, "elapsed": elapsed,
+                "packetRate": chunks / elapsed, "goodput": sent / elapsed,
+                "perInterval": self._perInterval(chunks, elapsed)}
+
+    async def runStep(self, step):
+        """
+        Runs one script step and returns the step with its results under "result", or "error".
+        """
+        step = dict(step)
+        test = step.get("test")
+        try:
+            if test == "echo":
+                result = await self.echo(int(step.get("count", 100)), int(step.get("size", 20)),
+                                         bool(step.get("response", True)), float(step.get("timeout", 1.0)),
+                                         float(step.get("gap", 0.0)))
+            elif test == "notify":
+                result = await self.notify(float(step.get("duration", 5.0)), WriteAction.fromDict(step.get("start")),
+                                           WriteAction.fromDict(step.get("stop")))
+            elif test == "write":
+                result = await self.write(float(step.get("duration", 5.0)), step.get("size"),
+                                          int(step.get("window", 8)))
+            else:
+                raise ValueError(f"Unknown probe test '{test}', expected echo, notify or write")
+        except (asyncio.CancelledError, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            step["error"] = str(e) or type(e).__name__
+        else:
+            step["result"] = result
+        return step
+
+    async def run(self, steps=None, label=None, progress=None):
+        """
+        Runs a probe script.
+
+        :param steps: List of step dicts, defaults to DEFAULT_STEPS.
+        :param label: Name of the run, e.g. the firmware build.
+        :param progress: Callable receiving every finished step.
+        :return: The result dict, see save_probe().
+        """
+        steps = DEFAULT_STEPS if steps is None else steps
+        result = {"label": label or "", "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                  "host": host_info(), "notify": str(self.notifyTransport), "write": str(self.writeTransport),
+                  "connectionInterval": self.connectionInterval, "steps": []}
+        await self.notifyTransport.start(self._onNotify)
+        try:
+            for step in steps:
+                done = await self.runStep(step)
+                result["steps"].append(done)
+                if progress is not None:
+                    progress(done)
+        finally:
+            await self.notifyTransport.stop()
+        return result
+
+
+def host_info():
+    """
+    Describes the host, so results from different machines can be told apart.
+    """
+    info = {"platform": platform.platform(), "python": platform.python_version(), "node": platform.node()}
+    try:
+        from importlib.metadata import version
+        info["bleak"] = version("bleak")
+    except Exception:
+        info["bleak"] = None
+    return info
+
+
+def default_steps(config=None):
+    """
+    Returns the probe steps of config.json, or DEFAULT_STEPS.
+    """
+    return list((config or {}).get("probe", {}).get("steps", DEFAULT_STEPS))
+
+
+def load_probe_script(path):
+    """
+    Reads a probe script, a JSON list of steps.
+    """
+    with open(path, encoding="utf-8") as fh:
+        steps = json.load(fh)
+    if not isinstance(steps, list):
+        raise ValueError(f"{path} should hold a list of probe steps")
+    return steps
+
+
+def save_probe(result):
+    """
+    Writes a probe result under results/<date>/ and returns its path.
+    """
+    label = re.sub(r"[^\w.-]+", "_", result.get("label") or "") or "probe"
+    path = capture_path(f"probe_{label}_{time.strftime('%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    return path
+
+
+def load_probe(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _rate(value):
+    return f"{value / 1024:.1f} KiB/s" if value is not None else "-"
+
+
+def format_step(step):
+    """
+    Formats the result of one step as text lines.
+    """
+    test = step.get("test")
+    if "error" in step:
+        return [f"{test}: failed: {step['error']}"]
+    r = step["result"]
+    if test == "echo":
+        rtt = r["rtt"]
+        if not rtt:
+            return [f"echo: no echo received for {r['sent']} writes of {r['size']} bytes"]
+        lines = [f"echo: {r['received']}/{r['sent']} round trips of {r['size']} bytes, rtt p50 {rtt['p50']:.1f} ms, "
+                 f"p95 {rtt['p95']:.1f} ms, p99 {rtt['p99']:.1f} ms, max {rtt['max']:.1f} ms"]
+        peak = max(count for _, count in r["histogram"]) or 1
+        low = 0
+        for edge, count in r["histogram"]:
+            if count:
+                bin = f"{low:g}-{edge:g}" if edge is not None else f">{low:g}"
+                lines.append(f"  {bin:>10} ms {count:6d} {'#' * max(1, round(count / peak * 40))}")
+            low = edge
+        return lines
+    perInterval = f", {r['perInterval']:.2f} packets per interval" if r.get("perInterval") is not None else ""
+    if test == "notify":
+        bursts = f", {r['perBurst']:.2f} per burst"
+        if r["burstSpacing"] is not None:
+            bursts += f" every {r['burstSpacing']:.1f} ms"
+        return [f"notify: {r['packets']} packets, {r['bytes']} bytes, {_rate(r['goodput'])}, "
+                f"{r['packetRate']:.0f} packets/s{perInterval}{bursts}"]
+    return [f"write: {r['packets']} chunks of {r['size']} bytes, {_rate(r['goodput'])}, "
+            f"{r['packetRate']:.0f} packets/s{perInterval}"]
+
+
+def format_probe(result):
+    """
+    Formats a probe result as text lines.
+    """
+    lines = [f"Probe {result.get('label') or ''} on {result['host']['platform']}, notify {result['notify']}, "
+             f"write {result['write']}"]
+    for step in result["steps"]:
+        lines.extend(format_step(step))
+    return lines
+
+
+def _summary(result):
+    values = {}
+    for step in result["steps"]:
+        r = step.get("result")
+        if r is None:
+            continue
+        test = step["test"]
+        if test == "echo" and r["rtt"]:
+            values["echo p50 ms"] = f"{r['rtt']['p50']:.1f}"
+            values["echo p95 ms"] = f"{r['rtt']['p95']:.1f}"
+            values["echo lost"] = f"{r['lost']}/{r['sent']}"
+        elif test in ("notify", "write"):
+            values[f"{test} KiB/s"] = f"{r['goodput'] / 1024:.1f}"
+            values[f"{test} packets/s"] = f"{r['packetRate']:.0f}"
+            if r.get("perInterval") is not None:
+                values[f"{test} per interval"] = f"{r['perInterval']:.2f}"
+    return values
+
+
+def compare_probes(results):
+    """
+    Lays out the key numbers of several probe results side by side.
+
+    :param results: Probe result dicts, e.g. from load_probe().
+    :return: Text lines of a table, one column per result.
+    """
+    summaries = [_summary(r) for r in results]
+    rows = []
+    for summary in summaries:
+        rows.extend(key for key in summary if key not in rows)
+    headers = [r.get("label") or r.get("time", "") for r in results]
+    hosts = [r["host"].get("node") or r["host"]["platform"] for r in results]
+    width = max([len(key) for key in rows] + [4])
+    columns = [max(len(h), len(n), 8) for h, n in zip(headers, hosts)]
+    lines = [" " * width + "".join(f"  {h:>{w}}" for h, w in zip(headers, columns)),
+             f"{'host':<{width}}" + "".join(f"  {n:>{w}}" for n, w in zip(hosts, columns))]
+    for key in rows:
+        lines.append(f"{key:<{width}}" + "".join(f"  {s.get(key, '-'):>{w}}" for s, w in zip(summaries, columns)))
+    return lines
@@ -0,0 +1,185 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QMessageBox
+from PyQt5.QtCore import pyqtSignal, QTimer
+import asyncio
+import logging
+from .list_models import EntryListModel, EntryFilterModel
+from .profiles import load_profiles, delete_profile, profiles_path
+from .scan_widget import make_list_view
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileSession:
+    """
+    The display windows of one launched profile and the connection they share.
+
+    The BLE connection is made directly by address, without a scan, and is closed once
+    the last window of the session is closed.
+    """
+
+    def __init__(self, profile, onClosed=None):
+        """
+        :param profile: The Profile to launch.
+        :param onClosed: Optional callable invoked with the session once it is closed.
+        """
+        self.profile = profile
+        self.onClosed = onClosed
+        self.client = None
+        self.windows = []
+        self._open = 0
+
+    async def start(self):
+        """
+        Connects, opens one DisplayWidget per characteristic or local source and applies the profile.
+
+        :return: False if a window rejected the profile, its windows are then closed again.
+        """
+        # matplotlib and bleak are only loaded once a profile is launched
+        from .display_widget import DisplayWidget
+        from .headless import get_decoder
+        # fail before connecting when the decoder plugin is gone
+        get_decoder(self.profile.decoder)
+        try:
+            if self.profile.url is not None:
+                from .transports import open_transport
+                transport = await open_transport(self.profile.url)
+                self.windows.append(DisplayWidget(transport=transport))
+            else:
+                import bleak
+                from .headless import find_characteristic
+                self.client = bleak.BleakClient(self.profile.address)
+                await self.client.connect()
+                for uuid in self.profile.characteristics:
+                    self.windows.append(DisplayWidget(self.client, find_characteristic(self.client, uuid)))
+        except Exception:
+            await self.close()
+            raise
+        for window in self.windows:
+            window.closed.connect(self.onWindowClosed)
+            self._open += 1
+            window.show()
+        for window in self.windows:
+            if not window.applyProfile(self.profile):
+                # the windows share the profile, so the others would not fit either
+                for opened in self.windows:
+                    # closing runs a coroutine, it cannot start inside this one
+                    QTimer.singleShot(0, opened.close)
+                return False
+        return True
+
+    def onWindowClosed(self):
+        self._open -= 1
+        if self._open == 0:
+            asyncio.ensure_future(self.close())
+
+    async def close(self):
+        if self.client is not None:
+            client, self.client = self.client, None
+            try:
+                await client.disconnect()
+            except Exception:
+                logger.exception("Failed to disconnect profile %s", self.profile.name)
+        if self.onClosed is not None:
+            self.onClosed(self)
+
+
+class ProfilesWidget(QWidget):
+    """
+    Lists the saved session profiles and launches or deletes them.
+    """
+    launchRequested = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.profilesModel = EntryListModel(self)
+        self.profilesProxy = EntryFilterModel(self.profilesModel, self)
+        self.profilesList = None
+        self.infoLabel = QLabel()
+        self.launchButton = QPushButton("Launch")
+        self.deleteButton = QPushButton("Delete")
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Session Profiles")
+        self.resize(560, 420)
+        self.setStyleSheet("background-color: #4B9CD3; color: white;")
+
+        button_style = """
+        QPushButton {
+            background-color: #4B9CD3;
+            color: white;
+            border: .5px solid white;
+            border-radius: 5px;
+            font-size: 14px;
+            font-weight: bold;
+            padding: 5px;
+        }
+        QPushButton:hover {
+            background-color: #13294B;
+        }
+        """
+        self.profilesList = make_list_view(self.profilesProxy, self)
+        self.profilesList.selectionModel().currentChanged.connect(self.onProfileSelected)
+        self.profilesList.doubleClicked.connect(self.launch)
+        self.profilesProxy.sortByName()
+
+        self.infoLabel.setWordWrap(True)
+        self.infoLabel.setStyleSheet("font-size: 12px; color: white;")
+
+        self.launchButton.clicked.connect(self.launch)
+        self.deleteButton.clicked.connect(self.delete)
+        buttons = QHBoxLayout()
+        for button in (self.launchButton, self.deleteButton):
+            button.setStyleSheet(button_style)
+            buttons.addWidget(button)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.profilesList)
+        layout.addWidget(self.infoLabel)
+        layout.addLayout(buttons)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-reads the profiles file.
+        """
+        self.profilesModel.clear()
+        try:
+            profiles = load_profiles()
+        except (OSError, ValueError) as e:
+            self.infoLabel.setText(f"Unable to read {profiles_path()}: {e}")
+            return
+        self.profilesModel.upsertMany((name, p, name, None) for name, p in profiles.items())
+        if not profiles:
+            self.infoLabel.setText("No saved profiles yet. Use 'Save as Profile' in a characteristic window.")
+        else:
+            self.infoLabel.setText(f"{len(profiles)} profiles in {profiles_path()}")
+
+    def currentProfile(self):
+        return self.profilesProxy.objectAt(self.profilesList.currentIndex())
+
+    def onProfileSelected(self, current=None, previous=None):
+        profile = self.currentProfile()
+        if profile is not None:
+            self.infoLabel.setText(profile.describe())
+
+    def launch(self):
+        profile = self.currentProfile()
+        if profile is None:
+            QMessageBox.warning(self, 'Warning', 'Select a profile first.')
+            return
+        self.launchRequested.emit(profile)
+
+    def delete(self):
+        profile = self.currentProfile()
+        if profile is None:
+            return
+        try:
+            delete_profile(profile.name)
+        except OSError as e:
+            QMessageBox.warning(self, 'Warning', f'Unable to delete profile {profile.name}: {e}')
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh()
+        super().showEvent(event)
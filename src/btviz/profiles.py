@@ -0,0 +1,156 @@
+"""
+Saved session profiles. Nothing here imports Qt.
+
+A profile remembers everything needed to go from launch to live data without scanning:
+the device address and characteristics (or a local source URL), the decoder, how the
+values are read, the plot window and resample ratio, and the capture file. Profiles are
+kept in a JSON file, by default ~/.btviz/profiles.json; set BTVIZ_PROFILES to use
+another file. An entry looks like:
+
+    "imu": {
+        "address": "C0:FF:EE:00:00:01",
+        "characteristics": ["6e400003-b5a3-f393-e0a9-e50e24dcca9e"],
+        "decoder": "Comma Delimited String Literal",
+        "interval": null,        # None for notifications, else timed reads every N ms
+        "window": 500,           # plotted points per channel
+        "resample": "5:1",
+        "plot": true,
+        "remote": false,         # render the plot in a separate process
+        "save": "imu.txt"        # capture file under results/<date>/, or null
+    }
+
+Local sources use "url" instead of "address" and "characteristics".
+"""
+import json
+import os
+
+_FIELDS = ("address", "characteristics", "url", "decoder", "interval", "window", "resample", "plot", "remote",
+           "save")
+
+
+class Profile:
+    """
+    One saved session.
+    """
+
+    def __init__(self, name, address=None, characteristics=(), url=None, decoder=None, interval=None, window=100,
+                 resample="Auto", plot=True, remote=False, save=None):
+        """
+        :param name: Name the profile is launched by.
+        :param address: Device address to connect to.
+        :param characteristics: UUIDs of the characteristics to stream, one window each.
+        :param url: Local source URL used instead of address and characteristics.
+        :param decoder: Decoder name, see 'btviz decoders'.
+        :param interval: Read every interval ms instead of enabling notifications.
+        :param window: Number of points plotted per channel.
+        :param resample: Plot resample ratio, e.g. "10:1", or "Auto" to follow the input rate.
+        :param plot: Open the plot as soon as the first values arrive.
+        :param remote: Render the plot in a separate process.
+        :param save: Capture file name, or None to not record.
+        """
+        self.name = name
+        self.address = address
+        self.characteristics = list(characteristics)
+        self.url = url
+        self.decoder = decoder
+        self.interval = interval
+        self.window = int(window)
+        self.resample = resample
+        self.plot = plot
+        self.remote = remote
+        self.save = save
+
+    @classmethod
+    def fromDict(cls, name, data):
+        unknown = set(data) - set(_FIELDS)
+        if unknown:
+            raise ValueError(f"Profile '{name}' has unknown settings: {', '.join(sorted(unknown))}")
+        profile = cls(name, **data)
+        if profile.url is None and (profile.address is None or not profile.characteristics):
+            raise ValueError(f"Profile '{name}' needs an address and characteristics, or a url")
+        return profile
+
+    def toDict(self):
+        return {field: getattr(self, field) for field in _FIELDS}
+
+    def captureName(self, stream):
+        """
+        Returns the capture file name of one stream, or None when the profile does not record.
+
+        Profiles with several characteristics write one file per characteristic, named with
+        the full UUID, as UUIDs of one vendor often differ only after the first 8 digits.
+
+        :param stream: The characteristic UUID or source URL.
+        """
+        if not self.save:
+            return None
+        if len(self.characteristics) <= 1:
+            return self.save
+        stem, ext = os.path.splitext(self.save)
+        return f"{stem}_{stream}{ext}"
+
+    def describe(self):
+        source = self.url or f"{self.address} [{', '.join(self.characteristics)}]"
+        mode = f"read every {self.interval} ms" if self.interval else "notify"
+        text = f"{source}, {self.decoder}, {mode}, window {self.window}, {self.resample}"
+        if self.save:
+            text += f", saving to {self.save}"
+        return text
+
+    def __repr__(self):
+        return f"Profile({self.name!r}, {self.describe()})"
+
+
+def profiles_path():
+    """
+    Returns the profiles file, BTVIZ_PROFILES or ~/.btviz/profiles.json.
+    """
+    return os.environ.get("BTVIZ_PROFILES") or os.path.join(os.path.expanduser("~"), ".btviz", "profiles.json")
+
+
+def load_profiles(path=None):
+    """
+    Reads every saved profile.
+
+    :param path: Profiles file, defaults to profiles_path().
+    :return: Dict of name to Profile, empty when the file does not exist yet.
+    """
+    path = path or profiles_path()
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return {name: Profile.fromDict(name, entry) for name, entry in data.items()}
+
+
+def get_profile(name, path=None):
+    profiles = load_profiles(path)
+    if name not in profiles:
+        raise KeyError(f"Unknown profile '{name}'. Saved profiles: {', '.join(profiles) or 'none'}")
+    return profiles[name]
+
+
+def _write_profiles(profiles, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({name: p.toDict() for name, p in profiles.items()}, fh, indent=4)
+    # replace in one step so a crash never leaves a truncated file
+    os.replace(tmp, path)
+
+
+def save_profile(profile, path=None):
+    """
+    Adds the profile, replacing a saved profile of the same name.
+    """
+    path = path or profiles_path()
+    profiles = load_profiles(path)
+    profiles[profile.name] = profile
+    _write_profiles(profiles, path)
+
+
+def delete_profile(name, path=None):
+    path = path or profiles_path()
+    profiles = load_profiles(path)
+    if profiles.pop(name, None) is not None:
+        _write_profiles(profiles, path)
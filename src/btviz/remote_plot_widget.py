@@ -0,0 +1,104 @@
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+from .remote_render import RemoteRenderer
+
+
+class RemotePlotView(QWidget):
+    """
+    Shows a plot rasterized by a separate render process.
+
+    update() stores new rows in the shared sample ring and asks for a frame; finished
+    frames are picked up by a short poll timer and blitted in paintEvent(). If the render
+    process fails or dies, the view stops and emits failed with the reason.
+    """
+    failed = pyqtSignal(str)
+
+    def __init__(self, channels, points=100, title="ADC", xlabel="Time (a.u.)", ylabel="Value (a.u.)"):
+        """
+        :param channels: Number of channels plotted.
+        :param points: Number of most recent samples shown.
+        """
+        super().__init__()
+        self.renderer = RemoteRenderer(channels)
+        self.settings = {"points": points, "title": title, "xlabel": xlabel, "ylabel": ylabel}
+        self._image = None
+        self._data = None
+        self._stale = False
+        self._poll = QTimer(self)
+        self._poll.timeout.connect(self.pollFrame)
+        self._poll.start(5)
+        self.setMinimumSize(200, 150)
+
+    def setSettings(self, **settings):
+        self.settings.update(settings)
+        self.requestFrame()
+
+    def extend(self, rows):
+        """
+        Adds decoded rows and requests a new frame.
+
+        :param rows: Array-like of shape (n, channels).
+        """
+        if self.renderer is None:
+            return
+        if len(rows):
+            self.renderer.ring.extend(rows)
+        self.requestFrame()
+
+    def requestFrame(self):
+        if self.renderer is None:
+            return
+        ratio = self.devicePixelRatioF()
+        try:
+            sent = self.renderer.request(int(self.width() * ratio), int(self.height() * ratio),
+                                         dpi=100 * ratio, **self.settings)
+        except OSError as e:
+            self._fail(f"Render process is gone: {e}")
+            return
+        # data that arrives while a frame is drawn is shown by one more frame
+        self._stale = not sent
+
+    def pollFrame(self):
+        if self.renderer is None:
+            return
+        try:
+            frame = self.renderer.poll()
+        except EOFError:
+            self._fail("Render process exited")
+            return
+        except Exception as e:
+            # an exception escaping a Qt slot would abort the application
+            self._fail(f"Render process failed: {e!r}")
+            return
+        if frame is None:
+            return
+        data, width, height = frame
+        # QImage does not own the bytes, keep them alive with it
+        self._data = data
+        self._image = QImage(data, width, height, QImage.Format_RGBA8888)
+        self._image.setDevicePixelRatio(self.devicePixelRatioF())
+        self.update()
+        if self._stale:
+            self.requestFrame()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.requestFrame()
+
+    def _fail(self, message):
+        self.stop()
+        self.failed.emit(message)
+
+    def paintEvent(self, event):
+        if self._image is not None:
+            QPainter(self).drawImage(0, 0, self._image)
+
+    def stop(self):
+        """
+        Ends the render process and frees the shared memory.
+        """
+        self._poll.stop()
+        if self.renderer is not None:
+            renderer, self.renderer = self.renderer, None
+            renderer.close()
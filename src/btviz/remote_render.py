@@ -0,0 +1,164 @@
+"""
+Plot rasterization in a separate process. Nothing here imports Qt.
+
+The GUI writes decoded rows into a SampleRing and asks the render process for a frame
+of a given size. The render process draws the latest rows with matplotlib's Agg backend
+into a frame buffer in shared memory and answers with its size. Only one request is in
+flight at a time, so the buffer is never written while the GUI takes the frame out of
+it, and Agg never competes with the ingest path for the GIL of the GUI process.
+"""
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from .shm_ring import SampleRing
+
+
+class _Renderer:
+    """
+    Runs in the render process, draws the rows of the ring.
+    """
+
+    def __init__(self, ringName):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self.ring = SampleRing.attach(ringName)
+        self.fig = Figure()
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.axs = []
+        self.lines = []
+        self.frames = None
+        self.frameNumber = 0
+        if self.ring.channels == 1:
+            self.axs = [self.fig.add_subplot(1, 1, 1)]
+        else:
+            self.axs = list(self.fig.subplots(self.ring.channels, 1))
+            for ax in self.axs:
+                ax.tick_params(labelleft=False)
+        self.lines = [ax.plot([], [], color='r')[0] for ax in self.axs]
+
+    def _frameBuffer(self, size):
+        if self.frames is None or self.frames.size < size:
+            if self.frames is not None:
+                self.frames.close()
+                self.frames.unlink()
+            self.frames = shared_memory.SharedMemory(create=True, size=size)
+        return self.frames
+
+    def render(self, request):
+        """
+        Draws one frame and returns (buffer name, width, height, frame number).
+        """
+        width, height, dpi = request["width"], request["height"], request.get("dpi", 100)
+        self.fig.set_size_inches(width / dpi, height / dpi)
+        self.fig.set_dpi(dpi)
+        self.axs[0].set_title(request.get("title", ""))
+        self.axs[-1].set_xlabel(request.get("xlabel", ""))
+        self.axs[len(self.axs) // 2].set_ylabel(request.get("ylabel", ""))
+
+        values = self.ring.latest(request.get("points", 100))
+        x = np.arange(len(values))
+        for i, (ax, line) in enumerate(zip(self.axs, self.lines)):
+            line.set_data(x, values[:, i])
+            ax.relim()
+            ax.autoscale_view()
+        self.canvas.draw()
+
+        rgba = np.asarray(self.canvas.buffer_rgba())
+        height, width = rgba.shape[:2]
+        size = width * height * 4
+        frames = self._frameBuffer(size)
+        frames.buf[:size] = rgba.tobytes()
+        self.frameNumber += 1
+        return frames.name, width, height, self.frameNumber
+
+    def close(self):
+        self.ring.close()
+        if self.frames is not None:
+            self.frames.close()
+            self.frames.unlink()
+
+
+def _renderMain(conn, ringName):
+    renderer = _Renderer(ringName)
+    try:
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            try:
+                conn.send(renderer.render(request))
+            except Exception as e:
+                conn.send(e)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        renderer.close()
+
+
+class RemoteRenderer:
+    """
+    Owns the sample ring and the render process of one plot.
+    """
+
+    def __init__(self, channels, capacity=65536):
+        """
+        :param channels: Number of channels plotted.
+        :param capacity: Rows kept in the shared sample ring.
+        """
+        self.ring = SampleRing(channels, capacity)
+        self._conn, child = multiprocessing.Pipe()
+        # spawn, never fork a process that runs a Qt event loop
+        context = multiprocessing.get_context("spawn")
+        self._process = context.Process(target=_renderMain, args=(child, self.ring.name),
+                                        name="btviz-render", daemon=True)
+        self._process.start()
+        child.close()
+        self._frames = None
+        self.busy = False
+        self.frameNumber = 0
+
+    def request(self, width, height, **settings):
+        """
+        Asks for a new frame unless one is being drawn.
+
+        :param width: Frame width in pixels.
+        :param height: Frame height in pixels.
+        :param settings: points, title, xlabel, ylabel and dpi of the plot.
+        :return: True if the request was sent.
+        """
+        if self.busy or width < 1 or height < 1:
+            return False
+        self._conn.send(dict(settings, width=width, height=height))
+        self.busy = True
+        return True
+
+    def poll(self):
+        """
+        Returns the finished frame as (RGBA bytes, width, height), or None.
+        """
+        if not self.busy or not self._conn.poll():
+            return None
+        reply = self._conn.recv()
+        self.busy = False
+        if isinstance(reply, Exception):
+            raise reply
+        name, width, height, self.frameNumber = reply
+        if self._frames is None or self._frames.name != name:
+            if self._frames is not None:
+                self._frames.close()
+            self._frames = shared_memory.SharedMemory(name=name)
+        # a single copy of the finished frame, the process is idle until the next request
+        return bytes(self._frames.buf[:width * height * 4]), width, height
+
+    def close(self):
+        try:
+            self._conn.send(None)
+        except OSError:
+            pass
+        self._process.join(2)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
+        if self._frames is not None:
+            self._frames.close()
+        self.ring.close()
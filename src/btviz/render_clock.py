@@ -0,0 +1,85 @@
+from PyQt5.QtCore import QObject, QTimer
+from .loop_monitor import timed
+
+
+class RenderClock(QObject):
+    """
+    A single redraw timer shared by every plot in the application.
+
+    Views register a render callback and call markDirty() whenever new samples
+    arrive. On each tick only the dirty views are redrawn, so the redraw cost
+    follows the number of changed views instead of the number of open streams.
+    """
+
+    def __init__(self, interval=33):
+        """
+        Initializes the render clock.
+
+        :param interval: The tick interval in milliseconds.
+        """
+        super().__init__()
+        self._views = {}
+        self._dirty = set()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.tick)
+        self._timer.setInterval(interval)
+
+    def register(self, view, render):
+        """
+        Registers a view with the clock.
+
+        :param view: Any hashable object identifying the view.
+        :param render: Callable invoked on a tick when the view is dirty.
+        """
+        self._views[view] = render
+        self._dirty.add(view)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def unregister(self, view):
+        """
+        Removes a view from the clock, stopping the timer once no view is left.
+        """
+        self._views.pop(view, None)
+        self._dirty.discard(view)
+        if not self._views:
+            self._timer.stop()
+
+    def markDirty(self, view):
+        """
+        Flags a view for redraw on the next tick.
+        """
+        if view in self._views:
+            self._dirty.add(view)
+
+    def setInterval(self, interval):
+        self._timer.setInterval(interval)
+
+    def interval(self):
+        return self._timer.interval()
+
+    @timed
+    def tick(self):
+        """
+        Redraws every dirty view once.
+        """
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        for view in dirty:
+            render = self._views.get(view)
+            if render is not None:
+                render()
+
+
+_shared_clock = None
+
+
+def shared_clock():
+    """
+    Returns the application wide render clock, creating it on first use.
+    """
+    global _shared_clock
+    if _shared_clock is None:
+        _shared_clock = RenderClock()
+    return _shared_clock
@@ -0,0 +1,310 @@
+"""
+Threshold and alert rules evaluated on decoded batches, with optional write-back. Nothing here imports Qt.
+
+Rules are kept in a JSON file, by default ~/.btviz/rules.json; set BTVIZ_RULES to use
+another file. The file holds a list of rules:
+
+    [
+        {
+            "name": "overheat",
+            "channel": "temp",        # channel name or column number
+            "measure": "mean",        # "value", "mean" over window samples, or "rate": change over window samples
+            "window": 20,
+            "above": 80.0,            # or "below"
+            "hysteresis": 2.0,        # the alert clears at 78.0
+            "holdoff": 1.0,           # seconds before the rule can alert again
+            "decoder": null,          # only streams using this decoder, null for all
+            "write": {"text": "FAN ON\\n", "response": false, "char": null},
+            "clearWrite": {"text": "FAN OFF\\n"}
+        }
+    ]
+
+A rule alerts when its condition becomes true and clears when it is false again by
+more than the hysteresis. "write" is sent to the device when the rule alerts and
+"clearWrite" when it clears, as "text" or "hex", to the streamed characteristic or to
+the characteristic "char" of the same device. Each batch is evaluated with NumPy
+operations over all of its samples, never sample by sample.
+"""
+import json
+import os
+import time
+from collections import deque
+import numpy as np
+
+MEASURES = ("value", "mean", "rate")
+
+
+class WriteAction:
+    """
+    Bytes written to the device when a rule alerts or clears.
+    """
+
+    def __init__(self, data, response=True, char=None):
+        self.data = data
+        self.response = response
+        self.char = char
+
+    @classmethod
+    def fromDict(cls, data):
+        if data is None:
+            return None
+        if "hex" in data:
+            payload = bytes.fromhex(data["hex"].replace(" ", ""))
+        elif "text" in data:
+            payload = data["text"].encode("utf-8")
+        else:
+            raise ValueError("A write needs 'hex' or 'text'")
+        return cls(payload, bool(data.get("response", True)), data.get("char"))
+
+    async def send(self, transport):
+        """
+        Writes to the streamed characteristic, or to self.char of the same BLE device.
+        """
+        if self.char is not None and hasattr(transport, "client"):
+            await transport.client.write_gatt_char(self.char, self.data, response=self.response)
+        else:
+            await transport.write(self.data, self.response)
+
+
+class Rule:
+    """
+    One condition on one channel.
+    """
+
+    def __init__(self, name, channel=0, measure="value", window=1, above=None, below=None, hysteresis=0.0,
+                 holdoff=0.0, decoder=None, write=None, clearWrite=None):
+        """
+        :param name: Name shown in alerts.
+        :param channel: Channel name or column number.
+        :param measure: "value", "mean" over window samples, or "rate", the change over window samples.
+        :param window: Samples of the mean or rate.
+        :param above: Alert when the measure rises above this.
+        :param below: Alert when the measure falls below this.
+        :param hysteresis: Distance back past the threshold needed to clear the alert.
+        :param holdoff: Seconds after an alert in which the rule does not alert again.
+        :param decoder: Only apply to streams using this decoder.
+        :param write: WriteAction sent when the rule alerts.
+        :param clearWrite: WriteAction sent when the alert clears.
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Rule '{name}': unknown measure '{measure}', expected one of {', '.join(MEASURES)}")
+        if (above is None) == (below is None):
+            raise ValueError(f"Rule '{name}' needs exactly one of 'above' and 'below'")
+        self.name = name
+        self.channel = channel
+        self.measure = measure
+        self.window = max(1, int(window))
+        self.above = above
+        self.below = below
+        self.hysteresis = abs(hysteresis)
+        self.holdoff = holdoff
+        self.decoder = decoder
+        self.write = write
+        self.clearWrite = clearWrite
+
+    @classmethod
+    def fromDict(cls, data):
+        data = dict(data)
+        name = data.pop("name", "rule")
+        write = WriteAction.fromDict(data.pop("write", None))
+        clearWrite = WriteAction.fromDict(data.pop("clearWrite", None))
+        try:
+            return cls(name, write=write, clearWrite=clearWrite, **data)
+        except TypeError as e:
+            raise ValueError(f"Rule '{name}': {e}") from e
+
+    def describe(self):
+        measure = {"value": "", "mean": f"mean of {self.window} ", "rate": f"change over {self.window} "}[self.measure]
+        comparison = f"> {self.above}" if self.above is not None else f"< {self.below}"
+        return f"{self.name}: {measure}{self.channel} {comparison}"
+
+
+class Alert:
+    """
+    A rule that alerted or cleared.
+
+    :ivar sample: Number of the sample that changed the state, counted from the first evaluated sample.
+    :ivar value: The measure at that sample.
+    :ivar active: True when the rule alerted, False when it cleared.
+    :ivar decided: time.perf_counter() when the batch was evaluated.
+    """
+
+    def __init__(self, rule, sample, value, active, decided):
+        self.rule = rule
+        self.sample = sample
+        self.value = value
+        self.active = active
+        self.decided = decided
+
+    @property
+    def action(self):
+        return self.rule.write if self.active else self.rule.clearWrite
+
+    def __str__(self):
+        state = "ALERT" if self.active else "cleared"
+        return f"{state} {self.rule.name} at sample {self.sample}: {self.value:.6g}"
+
+
+class _RuleState:
+    def __init__(self, rule, column):
+        self.rule = rule
+        self.column = column
+        self.active = False
+        self.lastAlert = -np.inf
+        # samples carried over for windows that reach into the previous batch
+        self.history = np.empty(0)
+
+
+class RuleEngine:
+    """
+    Evaluates rules on every decoded batch of one stream.
+    """
+
+    def __init__(self, rules, channels, names=None, decoder=None):
+        """
+        :param rules: List of Rules.
+        :param channels: Number of decoded channels.
+        :param names: Channel names of the stream.
+        :param decoder: Decoder name of the stream, rules for other decoders are skipped.
+        """
+        self.states = []
+        self.skipped = []
+        self.count = 0
+        for rule in rules:
+            if rule.decoder is not None and rule.decoder != decoder:
+                continue
+            column = rule.channel
+            if isinstance(column, str):
+                column = names.index(column) if names and column in names else None
+            if column is None or not 0 <= column < channels:
+                self.skipped.append(rule)
+                continue
+            self.states.append(_RuleState(rule, column))
+
+    def _measure(self, state, x):
+        rule = state.rule
+        if rule.measure == "value":
+            return x
+        keep = rule.window if rule.measure == "rate" else rule.window - 1
+        extended = np.concatenate([state.history, x])
+        state.history = extended[len(extended) - keep:] if keep else extended[:0]
+        lead = len(extended) - len(x)
+        if rule.measure == "rate":
+            y = np.full(len(x), np.nan)
+            start = max(0, rule.window - lead)
+            y[start:] = extended[lead + start:] - extended[lead + start - rule.window:len(extended) - rule.window]
+            return y
+        sums = np.cumsum(np.concatenate([[0.0], extended]))
+        ends = np.arange(lead + 1, len(extended) + 1)
+        y = (sums[ends] - sums[np.maximum(0, ends - rule.window)]) / rule.window
+        # windows not yet full are not evaluated
+        y[ends < rule.window] = np.nan
+        return y
+
+    def evaluate(self, values, now=None):
+        """
+        Evaluates every rule on a batch.
+
+        :param values: Decoded array of shape (n, channels).
+        :param now: time.perf_counter() of the decision, defaults to now.
+        :return: List of Alerts, in sample order.
+        """
+        alerts = []
+        n = len(values)
+        if not n:
+            return alerts
+        for state in self.states:
+            if values.shape[1] <= state.column:
+                # a batch of another width, e.g. a short line of a text stream
+                continue
+            rule = state.rule
+            y = self._measure(state, values[:, state.column].astype(np.float64))
+            with np.errstate(invalid="ignore"):
+                if rule.above is not None:
+                    on, off = y > rule.above, y <= rule.above - rule.hysteresis
+                else:
+                    on, off = y < rule.below, y >= rule.below + rule.hysteresis
+            # the state after each sample is set by the last sample that switched it on or off
+            switched = np.where(on | off, np.arange(n), -1)
+            last = np.maximum.accumulate(switched)
+            active = np.where(last >= 0, on[np.maximum(last, 0)], state.active)
+            previous = np.concatenate([[state.active], active[:-1]])
+            changes = np.flatnonzero(active != previous)
+            state.active = bool(active[-1])
+            for i in changes.tolist():
+                alerts.append((i, state, bool(active[i]), float(y[i])))
+        decided = time.perf_counter() if now is None else now
+        result = []
+        # rules whose last alert fell in the holdoff, their clear is not reported either
+        suppressed = set()
+        for i, state, active, value in sorted(alerts, key=lambda a: a[0]):
+            if active:
+                if decided - state.lastAlert < state.rule.holdoff:
+                    suppressed.add(state)
+                    continue
+                state.lastAlert = decided
+            elif state in suppressed:
+                suppressed.discard(state)
+                continue
+            result.append(Alert(state.rule, self.count + i, value, active, decided))
+        # a suppressed alert leaves the rule inactive, so it alerts once the holdoff has passed
+        for state in suppressed:
+            state.active = False
+        self.count += n
+        return result
+
+
+class LatencyStats:
+    """
+    Keeps the last latencies of a measurement and summarizes them.
+    """
+
+    def __init__(self, keep=1000):
+        self.samples = deque(maxlen=keep)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        """
+        :return: Dict with count and p50, p95 and max in milliseconds, None before the first sample.
+        """
+        if not self.samples:
+            return None
+        ms = np.array(self.samples) * 1000
+        return {"count": self.count, "p50": float(np.percentile(ms, 50)), "p95": float(np.percentile(ms, 95)),
+                "max": float(ms.max())}
+
+
+def format_latency(name, stats):
+    summary = stats.summary()
+    if summary is None:
+        return f"{name} -"
+    return (f"{name} p50 {summary['p50']:.1f} ms, p95 {summary['p95']:.1f} ms, max {summary['max']:.1f} ms "
+            f"({summary['count']})")
+
+
+def rules_path():
+    """
+    Returns the rules file, BTVIZ_RULES or ~/.btviz/rules.json.
+    """
+    return os.environ.get("BTVIZ_RULES") or os.path.join(os.path.expanduser("~"), ".btviz", "rules.json")
+
+
+def load_rules(path=None):
+    """
+    Reads the rules file.
+
+    :param path: Rules file, defaults to rules_path().
+    :return: List of Rules, empty when the file does not exist.
+    """
+    path = path or rules_path()
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if not isinstance(data, list):
+        raise ValueError(f"{path} should hold a list of rules")
+    return [Rule.fromDict(entry) for entry in data]
@@ -1,26 +1,43 @@
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, QTimer
-import os, datetime
+import numpy as np
+from .bounded_queue import BoundedQueue, FAIL
+from .capture import capture_path, is_binary_capture, CaptureWriter
 
 class SaveThread(QObject):
     finished = pyqtSignal()
     error = pyqtSignal(str)
+    _wake = pyqtSignal()
 
-    def __init__(self, filename):
+    def __init__(self, filename, queue=None, indexEvery=4096, names=None):
+        """
+        :param filename: Name of the capture file under results/<date>/. Names ending in ".bin"
+                         are written as binary rows and the producer queues value arrays instead of lines.
+        :param queue: BoundedQueue the producer fills with one item per decoded batch, a list of
+                      lines or an array of rows, and counted in rows. Defaults to a queue that
+                      refuses a batch when full, the producer then stops saving instead of waiting
+                      on the event loop or dropping rows.
+        :param indexEvery: Samples between entries of the capture's seek index.
+        :param names: Channel names stored in a binary capture.
+        """
         super().__init__()
         self.filename = filename
-        self._buf = []
+        self.binary = is_binary_capture(filename)
+        self.indexEvery = indexEvery
+        self.names = names
+        self.queue = queue if queue is not None else BoundedQueue("save", 1 << 20, policy=FAIL)
+        self.queue.sizeOf = len
+        # producers may put() from any thread; a half full queue wakes the writer early
+        self.queue.notify = self._wake.emit
+        self._wake.connect(self.flush)
         self._fh = None
         self._timer = None
 
     @pyqtSlot()
     def open(self):
         try:
-            date_str = str(datetime.datetime.now())[:10]
-            folder = os.path.join(".", "results", date_str)
-            os.makedirs(folder, exist_ok=True)
-            path = os.path.join(folder, self.filename)
+            path = capture_path(self.filename)
 
-            self._fh = open(path, "a", buffering=1)  # line-buffered
+            self._fh = CaptureWriter(path, self.indexEvery, self.names)
 
             # flush every 0.5s (reduces disk churn)
             self._timer = QTimer()
@@ -30,18 +47,20 @@ class SaveThread(QObject):
         except Exception as e:
             self.error.emit(str(e))
 
-    @pyqtSlot(str)
-    def enqueue(self, line: str):
-        # cheap: just buffer
-        self._buf.append(line)
-
     @pyqtSlot()
     def flush(self):
-        if not self._fh or not self._buf:
+        if not self._fh:
+            return
+        items = self.queue.getBatch()
+        if not items:
             return
         try:
-            self._fh.write("\n".join(self._buf) + "\n")
-            self._buf.clear()
+            # the index records the flush time, so index times are accurate to the 0.5 s flush interval
+            if self.binary:
+                self._fh.writeValues(np.concatenate(items))
+            else:
+                self._fh.writeLines([line for lines in items for line in lines])
+            self._fh.flush()
         except Exception as e:
             self.error.emit(str(e))
 
@@ -1,8 +1,40 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QLabel, QMessageBox, QTextEdit
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListView, QLabel, QMessageBox, QTextEdit, QInputDialog, QLineEdit, QComboBox
+from PyQt5.QtCore import QTimer
+import asyncio
 import qasync
-import bleak
-from .connect_widget import ConnectWidget
 from .utils import calculate_window
+from .list_models import EntryListModel, EntryFilterModel
+
+#: Seconds a scan listens for advertisements.
+SCAN_SECONDS = 5.0
+
+LIST_STYLE = """
+    QListView {
+        background-color: #E7EBEB;
+        color: black;
+        padding: 2px;
+        border-radius: 5px;
+    }
+    QListView::item {
+        padding: 6px;
+    }
+    QListView::item:selected {
+        background-color: #7BAFD4;
+        color: white;
+    }
+"""
+
+
+def make_list_view(model, parent=None):
+    """
+    Returns a QListView set up for long, frequently updated lists.
+    """
+    view = QListView(parent)
+    view.setModel(model)
+    view.setUniformItemSizes(True)
+    view.setEditTriggers(QListView.NoEditTriggers)
+    view.setStyleSheet(LIST_STYLE)
+    return view
 
 
 class ScanWidget(QWidget):
@@ -18,14 +50,27 @@ class ScanWidget(QWidget):
         self.m_client = None
         self.isDeviceDiscovered = False
 
-        self.devicesDict = {}
+        self.devicesModel = EntryListModel(self)
+        self.devicesProxy = EntryFilterModel(self.devicesModel, self)
+        self._pendingDevices = {}
+        self._flushTimer = QTimer(self)
+        self._flushTimer.timeout.connect(self.flushDevices)
 
         # UI elements
         self.scanButton = None
         self.connectButton = None
         self.devicesList = None
+        self.filterInput = None
+        self.sortDropdown = None
 
         self.scanServicesWindow = None
+        self.localSourceButton = None
+        self.localWindows = []
+        self.diagnosticsButton = None
+        self.diagnosticsWindow = None
+        self.profilesButton = None
+        self.profilesWindow = None
+        self.profileSessions = []
 
         self.initUI()
 
@@ -86,30 +131,23 @@ class ScanWidget(QWidget):
         right_layout = QVBoxLayout()
         right_layout.addLayout(right_header_layout)
 
-        self.devicesList = QListWidget(self)
-        self.devicesList.setStyleSheet("""
-            QListWidget {
-                background-color: #E7EBEB; 
-                color: black; 
-                padding: 2px;
-                border-radius: 5px;
-            }
-            QListWidget::item {
-                background-color: white;
-                margin: 3px;
-                padding: 10px;
-                border-radius: 8px;
-                border: 1px solid #4B9CD3;
-            }
-            QListWidget::item:selected {
-                background-color: #7BAFD4;
-                color: white;
-            }
-            QListWidget::item:hover {
-                background-color: #4B9CD3;
-            }
-        """)
-        self.devicesList.itemSelectionChanged.connect(self.onDeviceSelected)
+        filter_layout = QHBoxLayout()
+        self.filterInput = QLineEdit(self)
+        self.filterInput.setPlaceholderText("Filter by name or address")
+        self.filterInput.setStyleSheet("background-color: #E7EBEB; color: black; border-radius: 5px; padding: 5px;")
+        self.filterInput.textChanged.connect(self.devicesProxy.setFilterFixedString)
+        self.sortDropdown = QComboBox(self)
+        self.sortDropdown.addItems(["Sort by RSSI", "Sort by name"])
+        self.sortDropdown.setStyleSheet("background-color: #E7EBEB; color: black; border-radius: 5px; padding: 5px;")
+        self.sortDropdown.currentIndexChanged.connect(self.onSortChanged)
+        filter_layout.addWidget(self.filterInput, 3)
+        filter_layout.addWidget(self.sortDropdown, 1)
+        right_layout.addLayout(filter_layout)
+
+        self.devicesList = make_list_view(self.devicesProxy, self)
+        self.devicesList.selectionModel().currentChanged.connect(self.onDeviceSelected)
+        self.devicesList.doubleClicked.connect(self.scanServices)
+        self.devicesProxy.sortByRssi()
         right_layout.addWidget(self.devicesList)
 
         self.connectButton = QPushButton('Connect to Device', self)
@@ -138,6 +176,21 @@ class ScanWidget(QWidget):
         """)
         right_layout.addWidget(self.connectButton)
 
+        self.localSourceButton = QPushButton('Open Local Source (UART / UDP / Pipe)', self)
+        self.localSourceButton.clicked.connect(self.openLocalSource)
+        self.localSourceButton.setStyleSheet(self.connectButton.styleSheet())
+        right_layout.addWidget(self.localSourceButton)
+
+        self.diagnosticsButton = QPushButton('Diagnostics', self)
+        self.diagnosticsButton.clicked.connect(self.showDiagnostics)
+        self.diagnosticsButton.setStyleSheet(self.connectButton.styleSheet())
+        left_layout.addWidget(self.diagnosticsButton)
+
+        self.profilesButton = QPushButton('Session Profiles', self)
+        self.profilesButton.clicked.connect(self.showProfiles)
+        self.profilesButton.setStyleSheet(self.connectButton.styleSheet())
+        left_layout.addWidget(self.profilesButton)
+
         main_layout.addLayout(right_layout, 2)
 
     @qasync.asyncSlot()
@@ -147,12 +200,22 @@ class ScanWidget(QWidget):
         """
         self.statusBox.append("Scanning for devices...")
         self.scanButton.setEnabled(False)
-        devices = await bleak.BleakScanner.discover()
-        for device in devices:
-            self.devicesList.addItem(device.name)
-            self.devicesDict[device.name] = device
+        # bleak is imported on first scan to keep it off the startup path
+        import bleak
+        scanner = bleak.BleakScanner(detection_callback=self.onAdvertisement)
+        # advertisements are coalesced and applied to the list a few times per second
+        self._flushTimer.start(250)
+        try:
+            await scanner.start()
+            await asyncio.sleep(SCAN_SECONDS)
+            await scanner.stop()
+        except Exception as e:
+            QMessageBox.warning(self, 'Warning', f'Scan failed: {e}')
+        finally:
+            self._flushTimer.stop()
+            self.flushDevices()
 
-        self.statusBox.append(f"Found {len(devices)} devices. Select one to connect.")
+        self.statusBox.append(f"Found {self.devicesModel.rowCount()} devices. Select one to connect.")
         self.isDeviceDiscovered = True
         self.scanButton.setText('Clear All')
         self.scanButton.disconnect()
@@ -166,9 +229,8 @@ class ScanWidget(QWidget):
         Clears all discovered devices and resets the UI.
         """
 
-        self.devicesList.clear()
-
-        self.devicesDict = {}
+        self.devicesModel.clear()
+        self._pendingDevices = {}
 
         self.scanButton.setText('Scan for Devices')
         self.scanButton.disconnect()
@@ -177,17 +239,123 @@ class ScanWidget(QWidget):
         self.connectButton.setEnabled(False)
         self.statusBox.append("Cleared device list. Ready to scan...")
 
-    def onDeviceSelected(self):
-        if self.devicesList.currentItem():
-            device_name = self.devicesList.currentItem().text()
-            self.statusBox.append(f"Selected: {device_name}")
+    def onAdvertisement(self, device, advertisement):
+        """
+        Collects scan results; the list is updated by flushDevices().
+        """
+        name = device.name or advertisement.local_name or device.address
+        self._pendingDevices[device.address] = (device.address, device, f"{name}  ({device.address})",
+                                                advertisement.rssi)
+
+    def flushDevices(self):
+        """
+        Applies the advertisements received since the last flush to the device list.
+        """
+        if self._pendingDevices:
+            pending, self._pendingDevices = self._pendingDevices, {}
+            self.devicesModel.upsertMany(pending.values())
+
+    def onSortChanged(self, index):
+        if index == 0:
+            self.devicesProxy.sortByRssi()
+        else:
+            self.devicesProxy.sortByName()
+
+    def currentDevice(self):
+        return self.devicesProxy.objectAt(self.devicesList.currentIndex())
+
+    def onDeviceSelected(self, current=None, previous=None):
+        device = self.currentDevice()
+        if device is not None:
+            self.statusBox.append(f"Selected: {device.name or device.address}")
 
     def scanServices(self):
-        if self.devicesList.currentItem() and self.devicesList.currentItem().text():
-            device_name = self.devicesList.currentItem().text()
-            device = self.devicesDict[device_name]
+        device = self.currentDevice()
+        if device is not None:
+            device_name = device.name or device.address
             self.statusBox.append(f"Connecting to {device_name}...")
+            from .connect_widget import ConnectWidget
             self.scanServicesWindow = ConnectWidget(device)
             self.scanServicesWindow.show()
         else:
             QMessageBox.warning(self, 'Warning', 'Select Valid Device')
+
+    def showDiagnostics(self):
+        """
+        Opens the event loop lag and profiling window.
+        """
+        from .diagnostics_widget import DiagnosticsWidget
+        if self.diagnosticsWindow is None:
+            self.diagnosticsWindow = DiagnosticsWidget()
+        self.diagnosticsWindow.show()
+        self.diagnosticsWindow.raise_()
+
+    def showProfiles(self):
+        """
+        Opens the list of saved session profiles.
+        """
+        from .profile_widget import ProfilesWidget
+        if self.profilesWindow is None:
+            self.profilesWindow = ProfilesWidget()
+            self.profilesWindow.launchRequested.connect(self.launchProfile)
+        self.profilesWindow.show()
+        self.profilesWindow.raise_()
+
+    @qasync.asyncSlot(object)
+    async def launchProfile(self, profile):
+        """
+        Connects to the source of a saved profile by address, skipping scan and discovery,
+        and starts streaming with its settings.
+        """
+        from .profile_widget import ProfileSession
+        self.statusBox.append(f"Launching profile {profile.name}: {profile.describe()}")
+        session = ProfileSession(profile, self.onProfileClosed)
+        try:
+            started = await session.start()
+        except Exception as e:
+            QMessageBox.warning(self, 'Warning', f'Unable to launch profile {profile.name}: {e}')
+            return
+        if not started:
+            self.statusBox.append(f"Profile {profile.name} did not start.")
+            return
+        self.profileSessions.append(session)
+        self.statusBox.append(f"Profile {profile.name} is streaming.")
+
+    def onProfileClosed(self, session):
+        """
+        Forgets a profile session once its last window is closed.
+        """
+        if session in self.profileSessions:
+            self.profileSessions.remove(session)
+            self.statusBox.append(f"Profile {session.profile.name} closed.")
+
+    @qasync.asyncSlot()
+    async def openLocalSource(self):
+        """
+        Opens a display for a non-BLE source that uses the same framing, e.g. during bring-up.
+        """
+        url, ok = QInputDialog.getText(self, 'Open Local Source',
+                                       'Source URL (udp://127.0.0.1:9000, serial:///dev/ttyUSB0?baud=115200, pipe:///tmp/btviz.fifo)')
+        if not ok or not url:
+            return
+        from .transports import open_transport
+        from .display_widget import DisplayWidget
+        self.statusBox.append(f"Opening {url}...")
+        try:
+            transport = await open_transport(url)
+        except Exception as e:
+            QMessageBox.warning(self, 'Warning', f'Unable to open {url}: {e}')
+            return
+        self.statusBox.append(f"Opened {transport}")
+        window = DisplayWidget(transport=transport)
+        window.closed.connect(lambda: self.onLocalClosed(window))
+        window.show()
+        self.localWindows.append(window)
+
+    def onLocalClosed(self, window):
+        """
+        Forgets a local source window once it is closed.
+        """
+        if window in self.localWindows:
+            self.localWindows.remove(window)
+            self.statusBox.append(f"Closed {window.transport}")
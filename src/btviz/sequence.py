@@ -0,0 +1,195 @@
+"""
+Sequence counter checks for telling lost, duplicated and reordered packets apart. Nothing here imports Qt.
+
+Notifications can be dropped by the radio or the OS stack without any error reaching
+the application. Decoders whose packets carry a rolling counter name its channel with
+``Decoder.sequence`` and its wrap-around with ``Decoder.sequenceModulus``, or in
+config.json:
+
+    {"name": "IMU", "format": "<Hhhh", "channels": ["seq", "x", "y", "z"],
+     "sequence": "seq", "sequenceBits": 16}
+
+A SequenceTracker then follows the counter across batches. Losses counted here happened
+before the host decoded the packets, unlike the drops of the pipeline queues, which
+are host-side overload.
+"""
+import logging
+import time
+from collections import deque
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+#: Backward steps larger than this are a counter restart, not a late packet.
+MAX_REORDER = 64
+
+
+class SequenceTracker:
+    """
+    Follows a rolling packet counter and keeps loss statistics.
+
+    A step of one is the next packet, a larger step is a gap of step - 1 lost packets,
+    a step of zero a duplicate, and a small backward step a packet that arrived late,
+    which is counted as reordered and no longer as lost.
+    """
+
+    def __init__(self, column, modulus=None, window=5.0):
+        """
+        :param column: Column of the decoded values that holds the counter.
+        :param modulus: Counter wrap-around, e.g. 256 for an 8 bit counter, None if it never wraps.
+        :param window: Seconds covered by recentLossRate.
+        """
+        self.column = column
+        self.modulus = modulus
+        self.window = window
+        self.last = None
+        self.received = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.restarts = 0
+        self._recent = deque()
+
+    @classmethod
+    def fromDecoder(cls, decoder, channels, config=None):
+        """
+        Creates a tracker for a decoder that names a sequence channel.
+
+        :param channels: Number of decoded channels.
+        :return: A SequenceTracker, or None when the decoder has no usable sequence channel.
+        """
+        sequence = getattr(decoder, "sequence", None)
+        if sequence is None:
+            return None
+        if isinstance(sequence, str):
+            names = decoder.channels or []
+            if sequence not in names:
+                logger.warning("Decoder '%s' has no channel '%s' to track", decoder.name, sequence)
+                return None
+            column = names.index(sequence)
+        else:
+            column = int(sequence)
+        if not 0 <= column < channels:
+            logger.warning("Decoder '%s' sequence column %s is out of range", decoder.name, column)
+            return None
+        section = (config or {}).get("sequence", {})
+        return cls(column, getattr(decoder, "sequenceModulus", None), float(section.get("window", 5.0)))
+
+    def _steps(self, counters):
+        steps = np.diff(counters, prepend=counters[0] - 1 if self.last is None else self.last)
+        if self.modulus:
+            # signed distance on the counter circle, so a wrap is a step forward
+            steps = (steps + self.modulus // 2) % self.modulus - self.modulus // 2
+        return steps
+
+    def _step(self, counter):
+        if self.last is None:
+            return 1
+        step = counter - self.last
+        if self.modulus:
+            step = (step + self.modulus // 2) % self.modulus - self.modulus // 2
+        return step
+
+    def check(self, values, now=None):
+        """
+        Checks the counters of a decoded batch.
+
+        :param values: Decoded array of shape (n, channels).
+        :param now: Monotonic time in seconds, defaults to time.monotonic().
+        :return: Row numbers that follow a gap, for gap markers.
+        """
+        if not len(values) or values.shape[1] <= self.column:
+            # a batch without the counter column, e.g. a short line of a text stream, is not counted
+            return np.empty(0, dtype=np.intp)
+        counters = values[:, self.column].astype(np.int64)
+        steps = self._steps(counters)
+        lost = 0
+        if (steps >= 1).all():
+            # the usual case, decided without a per packet loop
+            gaps = np.flatnonzero(steps > 1)
+            lost = int((steps[gaps] - 1).sum())
+            self.last = int(counters[-1])
+        else:
+            gaps = []
+            for i, counter in enumerate(counters.tolist()):
+                step = self._step(counter)
+                if step >= 1:
+                    if step > 1:
+                        gaps.append(i)
+                        lost += step - 1
+                    self.last = counter
+                elif step == 0:
+                    self.duplicates += 1
+                elif -step <= MAX_REORDER:
+                    self.reordered += 1
+                    lost -= 1
+                else:
+                    self.restarts += 1
+                    self.last = counter
+            gaps = np.array(gaps, dtype=np.intp)
+        self.received += len(counters)
+        self.lost = max(0, self.lost + lost)
+        now = time.monotonic() if now is None else now
+        self._recent.append((now, len(counters), lost))
+        while self._recent and now - self._recent[0][0] > self.window:
+            self._recent.popleft()
+        return gaps
+
+    @property
+    def lossRate(self):
+        """
+        Fraction of the packets sent since the first one that never arrived.
+        """
+        expected = self.received + self.lost
+        return self.lost / expected if expected else 0.0
+
+    @property
+    def recentLossRate(self):
+        """
+        Loss rate over the last window seconds.
+        """
+        received = sum(r for _, r, _ in self._recent)
+        lost = max(0, sum(n for _, _, n in self._recent))
+        return lost / (received + lost) if received + lost else 0.0
+
+    def stats(self):
+        return {"received": self.received, "lost": self.lost, "duplicates": self.duplicates,
+                "reordered": self.reordered, "restarts": self.restarts, "lossRate": self.lossRate,
+                "recentLossRate": self.recentLossRate}
+
+    def reset(self):
+        self.last = None
+        self.received = self.lost = self.duplicates = self.reordered = self.restarts = 0
+        self._recent.clear()
+
+
+def format_sequence_stats(stats):
+    """
+    Formats tracker stats as a status line fragment.
+    """
+    return (f"loss {stats['recentLossRate']:.2%} now, {stats['lossRate']:.2%} total ({stats['lost']} lost, "
+            f"{stats['duplicates']} dup, {stats['reordered']} reordered)")
+
+
+def insert_gap_markers(values, gaps):
+    """
+    Inserts a row of NaN before every row that follows a gap, which breaks plotted lines there.
+
+    :param values: Array of shape (n, channels).
+    :param gaps: Row numbers from SequenceTracker.check().
+    """
+    if not len(gaps):
+        return values
+    return np.insert(values.astype(np.float64, copy=False), gaps, np.nan, axis=0)
+
+
+def insert_gap_lines(lines, gaps, marker):
+    """
+    Inserts marker before every capture line that follows a gap.
+    """
+    if not len(gaps):
+        return lines
+    lines = list(lines)
+    for i in reversed(gaps.tolist()):
+        lines.insert(i, marker)
+    return lines
@@ -0,0 +1,239 @@
+"""
+A ring of samples in shared memory. Nothing here imports Qt.
+
+The ring is written by one process and read by any number of others without copies
+through a pipe or socket. A fixed 512 byte header describes the layout, so a process
+that only knows the name of the block can attach to it:
+
+    offset  type      field
+    0       8s        magic "BTVZRNG1"
+    8       int64     header size, the offset of the first row
+    16      int64     channels
+    24      int64     capacity in rows
+    32      8s        NumPy dtype string of the samples, e.g. "<f8"
+    40      int64     rows written since creation; the next row goes to index count % capacity
+    48      int64     sequence number, incremented once per written batch
+    56      int64     length of the channel names
+    64      bytes     channel names, UTF-8, separated by newlines
+
+The writer never waits for readers. It stores the rows first and publishes them by
+advancing the count afterwards; readers use the count to find new rows and to detect
+rows that were overwritten while they were reading them.
+
+Reading a live stream from another process:
+
+    from btviz.shm_ring import TapReader
+    tap = TapReader("btviz_imu")
+    while True:
+        rows, missed = tap.read()     # new rows since the last call
+"""
+import os
+import sys
+import zlib
+import numpy as np
+from multiprocessing import shared_memory
+
+MAGIC = b"BTVZRNG1"
+HEADER_SIZE = 512
+_COUNT = 5
+_SEQUENCE = 6
+
+
+def _attach_untracked(name):
+    """
+    Attaches to a block without handing it to this process's resource tracker, which
+    would otherwise remove the block of another program when this process exits.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SampleRing:
+    """
+    A fixed size ring of (capacity, channels) rows in a SharedMemory block.
+    """
+
+    def __init__(self, channels=1, capacity=65536, name=None, create=True, dtype=np.float64, names=None,
+                 track=True):
+        """
+        :param channels: Number of columns per row. Ignored when attaching.
+        :param capacity: Number of rows kept. Ignored when attaching.
+        :param name: Name of the shared memory block, generated when creating and omitted.
+        :param create: Create a new block, or attach to the existing block called name.
+        :param dtype: Sample type. Ignored when attaching.
+        :param names: Channel names stored in the header. Ignored when attaching.
+        :param track: When attaching, let this process's resource tracker manage the block. Only
+            processes started by the creator should do so.
+        """
+        if create:
+            dtype = np.dtype(dtype)
+            self._shm = shared_memory.SharedMemory(name=name, create=True,
+                                                   size=HEADER_SIZE + capacity * channels * dtype.itemsize)
+            encoded = "\n".join(names or [f"ch{i}" for i in range(channels)]).encode()
+            if len(encoded) > HEADER_SIZE - 64:
+                raise ValueError("Channel names do not fit into the ring header")
+            buf = self._shm.buf
+            buf[0:8] = MAGIC
+            self._ints()[1:4] = (HEADER_SIZE, channels, capacity)
+            buf[32:40] = dtype.str.encode().ljust(8, b"\0")
+            self._ints()[5:8] = (0, 0, len(encoded))
+            buf[64:64 + len(encoded)] = encoded
+        else:
+            self._shm = shared_memory.SharedMemory(name=name) if track else _attach_untracked(name)
+            if bytes(self._shm.buf[0:8]) != MAGIC:
+                self._shm.close()
+                raise ValueError(f"Shared memory block '{name}' is not a BTViz sample ring")
+        self.owner = create
+        self._header = self._ints()
+        offset, self.channels, self.capacity = (int(v) for v in self._header[1:4])
+        self.dtype = np.dtype(bytes(self._shm.buf[32:40]).rstrip(b"\0").decode())
+        length = int(self._header[7])
+        self.names = bytes(self._shm.buf[64:64 + length]).decode().split("\n")
+        self.rows = np.ndarray((self.capacity, self.channels), dtype=self.dtype, buffer=self._shm.buf,
+                               offset=offset)
+
+    def _ints(self):
+        return np.ndarray((8,), dtype=np.int64, buffer=self._shm.buf)
+
+    @classmethod
+    def attach(cls, name, track=True):
+        return cls(name=name, create=False, track=track)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def count(self):
+        """
+        Number of rows written since the ring was created.
+        """
+        return int(self._header[_COUNT])
+
+    @property
+    def sequence(self):
+        """
+        Number of batches written since the ring was created.
+        """
+        return int(self._header[_SEQUENCE])
+
+    def extend(self, values):
+        """
+        Appends rows, overwriting the oldest ones once the ring is full.
+
+        :param values: Array-like of shape (n, channels).
+        """
+        values = np.asarray(values, dtype=self.dtype).reshape(-1, self.channels)
+        total = len(values)
+        values = values[-self.capacity:]
+        n = len(values)
+        if not n:
+            return
+        # rows older than the last capacity are skipped but still counted
+        start = (self.count + total - n) % self.capacity
+        first = min(n, self.capacity - start)
+        self.rows[start:start + first] = values[:first]
+        self.rows[:n - first] = values[first:]
+        # publish the rows only after they are written
+        self._header[_COUNT] += total
+        self._header[_SEQUENCE] += 1
+
+    def segments(self, start, stop):
+        """
+        Returns the rows [start, stop) as up to two views into the ring, without copying.
+
+        The views are overwritten once the writer gets capacity rows ahead of start; check
+        with valid(start) after using them.
+        """
+        if stop - start > self.capacity:
+            raise ValueError("Requested more rows than the ring holds")
+        a, b = start % self.capacity, stop % self.capacity
+        if stop == start:
+            return []
+        if a < b:
+            return [self.rows[a:b]]
+        return [self.rows[a:], self.rows[:b]]
+
+    def valid(self, start):
+        """
+        Returns True if row number start has not been overwritten yet.
+        """
+        return start >= self.count - self.capacity
+
+    def latest(self, n):
+        """
+        Returns a copy of the last n rows, oldest first.
+        """
+        count = self.count
+        n = min(n, count, self.capacity)
+        parts = self.segments(count - n, count)
+        return np.concatenate(parts) if parts else np.empty((0, self.channels), dtype=self.dtype)
+
+    def close(self):
+        """
+        Detaches from the block, removing it when this ring created it.
+        """
+        self._header = self.rows = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+
+def default_tap_name(label):
+    """
+    Returns a short block name that is stable for a stream label, e.g. a characteristic.
+    """
+    return f"btviz_{zlib.crc32(str(label).encode()):08x}"
+
+
+def open_tap(name, channels, names=None, config=None):
+    """
+    Publishes a stream as a named ring sized by the "tap" section of config.json.
+    """
+    capacity = int((config or {}).get("tap", {}).get("capacity", 262144))
+    return SampleRing(channels, capacity, name=name, names=names)
+
+
+class TapReader:
+    """
+    Follows a sample ring published by another process. Reading never blocks the writer.
+    """
+
+    def __init__(self, name, fromStart=False):
+        """
+        :param name: Name of the shared memory block, as shown by BTViz.
+        :param fromStart: Start with the oldest rows still in the ring instead of only new ones.
+        """
+        self.ring = SampleRing.attach(name, track=False)
+        self.channels = self.ring.channels
+        self.names = self.ring.names
+        self.cursor = max(0, self.ring.count - self.ring.capacity) if fromStart else self.ring.count
+
+    def read(self, maxRows=None):
+        """
+        Returns the rows written since the last call and the number of rows that were
+        overwritten before they could be read.
+
+        :param maxRows: Read at most this many rows, the rest is returned by the next call.
+        :return: (array of shape (n, channels), missed rows)
+        """
+        count = self.ring.count
+        start = max(self.cursor, count - self.ring.capacity)
+        stop = count if maxRows is None else min(count, start + maxRows)
+        parts = self.ring.segments(start, stop)
+        rows = np.concatenate(parts) if parts else np.empty((0, self.channels), dtype=self.ring.dtype)
+        # the writer may have lapped the copy while it was made
+        overrun = min(stop - start, self.ring.count - self.ring.capacity - start)
+        if overrun > 0:
+            rows = rows[overrun:]
+        missed = start - self.cursor + max(0, overrun)
+        self.cursor = stop
+        return rows, missed
+
+    def close(self):
+        self.ring.close()
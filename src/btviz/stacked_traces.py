@@ -0,0 +1,143 @@
+"""
+Stacked trace view for streams with many channels. Imports matplotlib but not Qt.
+
+All channels are drawn by a single LineCollection on one axes, each in its own lane
+with a per-channel gain and offset. The axes limits are fixed, so a frame costs one
+set_segments() and one draw regardless of the channel count, instead of one line,
+one relim() and one autoscale per subplot.
+"""
+import numpy as np
+from matplotlib.collections import LineCollection
+
+#: Fraction of a lane a channel fills when it is scaled automatically.
+LANE_FILL = 0.8
+
+
+def lane_names(names, channels):
+    """
+    Returns the lane labels, the channel names when they match the channel count.
+    """
+    return list(names) if names and len(names) == channels else [f"ch{i}" for i in range(channels)]
+
+
+def parse_scales(text, names):
+    """
+    Parses per-channel scales written as "channel:gain:offset", separated by spaces,
+    commas or semicolons, e.g. "x:0.5:0 y:2". The channel is a name or a number; a gain
+    or offset that is left out or "auto" is set automatically.
+
+    :param names: The lane names, see lane_names().
+    :return: Dict of channel number to (gain, offset), None for automatic.
+    """
+    scales = {}
+    for entry in text.replace(";", " ").replace(",", " ").split():
+        parts = entry.split(":")
+        if len(parts) > 3:
+            raise ValueError(f"Expected channel:gain:offset, got '{entry}'")
+        if parts[0] in names:
+            channel = names.index(parts[0])
+        elif parts[0].isdigit() and int(parts[0]) < len(names):
+            channel = int(parts[0])
+        else:
+            raise ValueError(f"Unknown channel '{parts[0]}'")
+        try:
+            values = [None if part in ("", "auto") else float(part) for part in parts[1:]]
+        except ValueError:
+            raise ValueError(f"Gain and offset of '{entry}' must be numbers or auto") from None
+        values += [None] * (2 - len(values))
+        scales[channel] = tuple(values)
+    return scales
+
+
+class StackedTraces:
+    """
+    Draws the channels of a stream as stacked traces on one axes.
+
+    Lane i is centred at y = channels - 1 - i, so the first channel is on top. In
+    automatic mode each channel is scaled to its lane from the min and max of the
+    visible window; setGain() and setOffset() fix the scale of a channel instead.
+    """
+
+    def __init__(self, ax, channels, names=None, linewidth=0.8):
+        """
+        :param ax: The matplotlib axes to draw on.
+        :param channels: Number of channels.
+        :param names: Channel names used as lane labels.
+        :param linewidth: Line width of every trace.
+        """
+        self.ax = ax
+        self.channels = channels
+        self.names = lane_names(names, channels)
+        self.gains = np.full(channels, np.nan)
+        self.offsets = np.full(channels, np.nan)
+        self.lanes = np.arange(channels - 1, -1, -1, dtype=np.float64)
+        self._length = 0
+
+        colors = [f"C{i % 10}" for i in range(channels)]
+        self.collection = LineCollection([], colors=colors, linewidths=linewidth)
+        ax.add_collection(self.collection)
+        ax.set_ylim(-0.5, channels - 0.5)
+        ax.set_yticks(self.lanes)
+        ax.set_yticklabels(self.names, fontsize=7 if channels > 16 else 9)
+        ax.tick_params(axis="y", length=0)
+        ax.grid(axis="y", linewidth=0.3, alpha=0.5)
+
+    def setGain(self, channel, gain):
+        """
+        Fixes the scale of a channel in lane units per value unit, None to scale automatically.
+        """
+        self.gains[channel] = np.nan if gain is None else gain
+
+    def setOffset(self, channel, offset):
+        """
+        Fixes the value drawn at the lane centre of a channel, None to centre automatically.
+        """
+        self.offsets[channel] = np.nan if offset is None else offset
+
+    def setScales(self, scales):
+        """
+        Sets the gain and offset of every channel at once, see parse_scales(). Channels
+        that are not listed are scaled automatically.
+        """
+        self.gains[:] = np.nan
+        self.offsets[:] = np.nan
+        for channel, (gain, offset) in scales.items():
+            self.setGain(channel, gain)
+            self.setOffset(channel, offset)
+
+    def window(self, dataframe):
+        """
+        Returns the visible samples as an array of shape (channels, n).
+        """
+        n = min((len(channel) for channel in dataframe), default=0)
+        rows = np.empty((self.channels, n))
+        for i, channel in enumerate(dataframe[:self.channels]):
+            # deques do not slice, skip the oldest extra samples of longer channels
+            values = np.fromiter(channel, dtype=np.float64, count=len(channel))
+            rows[i] = values[len(values) - n:]
+        return rows
+
+    def update(self, dataframe):
+        """
+        Pushes the per-channel sample sequences into the collection.
+
+        :param dataframe: One sequence of samples per channel.
+        """
+        data = self.window(dataframe)
+        n = data.shape[1]
+        if n == 0:
+            return
+        # NaN rows are gap markers, all-NaN channels are drawn flat on their lane
+        valid = ~np.isnan(data)
+        lo = np.nan_to_num(data.min(axis=1, initial=np.inf, where=valid), posinf=0.0)
+        hi = np.nan_to_num(data.max(axis=1, initial=-np.inf, where=valid), neginf=0.0)
+        span = np.where(hi > lo, hi - lo, 1.0)
+        gains = np.where(np.isnan(self.gains), LANE_FILL / span, self.gains)
+        offsets = np.where(np.isnan(self.offsets), (lo + hi) / 2, self.offsets)
+        segments = np.empty((self.channels, n, 2))
+        segments[:, :, 0] = np.arange(n)
+        segments[:, :, 1] = (data - offsets[:, None]) * gains[:, None] + self.lanes[:, None]
+        self.collection.set_segments(segments)
+        if n != self._length:
+            self._length = n
+            self.ax.set_xlim(0, max(1, n - 1))
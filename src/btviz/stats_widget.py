@@ -0,0 +1,88 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView
+from PyQt5.QtCore import Qt, QTimer
+from .utils import calculate_window
+
+STATS = ("mean", "std", "min", "max", "rms")
+
+
+class StatsWidget(QWidget):
+    """
+    A table of per-channel statistics over the visible window and over the whole session.
+
+    The numbers are maintained incrementally by a ChannelStats, the table only reads
+    them a few times per second while it is shown.
+    """
+
+    def __init__(self, stats, names=None, title="Statistics", interval=500):
+        """
+        Initializes the statistics widget.
+
+        :param stats: The ChannelStats to display.
+        :param names: Channel names used as row labels.
+        :param title: Window title.
+        :param interval: Milliseconds between refreshes.
+        """
+        super().__init__()
+
+        self.stats = stats
+        self.names = list(names) if names and len(names) == stats.channels else \
+            [f"ch{i}" for i in range(stats.channels)]
+        self._title = title
+
+        self.rateLabel = None
+        self.table = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.refresh)
+
+        self.initUI()
+
+    def initUI(self):
+        """
+        Initializes the user interface for the statistics widget.
+        """
+        self.setWindowTitle(self._title)
+        window_width, window_height, x_pos, y_pos = calculate_window(scale_width=0.5, scale_height=0.4)
+        self.setGeometry(x_pos, y_pos, window_width, window_height)
+        self.setStyleSheet("background-color: #4B9CD3; color: white;")
+
+        self.rateLabel = QLabel()
+        self.rateLabel.setStyleSheet("font-size: 14px; font-weight: bold; color: white;")
+
+        self.table = QTableWidget(self.stats.channels, 2 * len(STATS))
+        self.table.setHorizontalHeaderLabels([f"{name} ({scope})" for scope in ("window", "session")
+                                              for name in STATS])
+        self.table.setVerticalHeaderLabels(self.names)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setStyleSheet("background-color: #E7EBEB; color: black; border-radius: 5px;")
+        for row in range(self.stats.channels):
+            for column in range(2 * len(STATS)):
+                item = QTableWidgetItem()
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.rateLabel)
+        layout.addWidget(self.table, 1)
+
+    def refresh(self):
+        """
+        Copies the current statistics into the table.
+        """
+        window, session = self.stats.windowStats(), self.stats.sessionStats()
+        self.rateLabel.setText(f"Window: {window['count'].max(initial=0)} samples, {window['rate']:.1f} samples/s   "
+                               f"Session: {self.stats.samples} samples, {session['rate']:.1f} samples/s")
+        for offset, values in ((0, window), (len(STATS), session)):
+            for column, name in enumerate(STATS):
+                for row, value in enumerate(values[name].tolist()):
+                    self.table.item(row, offset + column).setText("-" if value != value else f"{value:.6g}")
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start()
+        event.accept()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        event.accept()
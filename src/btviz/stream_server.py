@@ -0,0 +1,290 @@
+"""
+Local publish server for decoded samples. Nothing here imports Qt.
+
+Subscribers connect over TCP and receive one JSON object per decoded batch:
+
+    {"stream": "udp://127.0.0.1:9000", "seq": 12, "time": 1760870400.123, "index": 3072,
+     "channels": ["ch0", "ch1"], "values": [[1.0, 2.0], ...]}
+
+"time" is the host time the batch was decoded and "index" the stream sample number of its
+first row. Text-only decoders send "text": [...] instead of "values".
+
+Plain TCP clients (e.g. ``nc 127.0.0.1 8765``) get newline delimited JSON. Clients that
+open with an HTTP upgrade request get the same objects as WebSocket text messages, so a
+browser dashboard can use ``new WebSocket("ws://127.0.0.1:8765/")``. A path other than
+"/" subscribes to that stream only, e.g. ``ws://127.0.0.1:8765/udp://127.0.0.1:9000``.
+
+publish() never waits for a subscriber. Every subscriber has its own bounded send
+buffer; a subscriber whose buffer overflows is disconnected, so a stalled client can
+never back-pressure ingestion.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import struct
+import time
+from collections import deque
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC11B65"
+# raw clients usually send nothing, wait this long for an upgrade request
+_SNIFF_TIMEOUT = 0.3
+
+
+def _ws_frame(payload, opcode=0x1):
+    header = bytes([0x80 | opcode])
+    n = len(payload)
+    if n < 126:
+        header += bytes([n])
+    elif n < 65536:
+        header += bytes([126]) + struct.pack(">H", n)
+    else:
+        header += bytes([127]) + struct.pack(">Q", n)
+    return header + payload
+
+
+class _Subscriber:
+    """
+    One connected client with its bounded send buffer.
+    """
+
+    def __init__(self, writer, websocket, stream, maxBytes):
+        self.writer = writer
+        self.websocket = websocket
+        self.stream = stream
+        self.maxBytes = maxBytes
+        self.peer = writer.get_extra_info("peername")
+        self.frames = deque()
+        self.buffered = 0
+        self.sent = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def push(self, payload):
+        """
+        Queues an encoded frame. Returns False when the buffer overflowed.
+        """
+        frame = _ws_frame(payload) if self.websocket else payload + b"\n"
+        if self.buffered + len(frame) > self.maxBytes:
+            return False
+        self.frames.append(frame)
+        self.buffered += len(frame)
+        self._ready.set()
+        return True
+
+    async def send(self):
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self.frames and not self.closed:
+                    frame = self.frames.popleft()
+                    self.buffered -= len(frame)
+                    self.writer.write(frame)
+                    self.sent += 1
+                await self.writer.drain()
+        except ConnectionError:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._ready.set()
+            self.writer.close()
+
+
+class StreamServer:
+    """
+    Publishes decoded batches of any number of streams to local subscribers.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, maxBufferBytes=1 << 20):
+        """
+        :param host: Interface to listen on. Keep the loopback default unless remote hosts should read the data.
+        :param port: TCP port, 0 picks a free one.
+        :param maxBufferBytes: Send buffer per subscriber. A subscriber that falls further behind is disconnected.
+        """
+        self.host = host
+        self.port = port
+        self.maxBufferBytes = maxBufferBytes
+        self.subscribers = []
+        self.evicted = 0
+        self._server = None
+        self._handlers = set()
+        self._seq = {}
+        self._index = {}
+
+    @classmethod
+    def fromConfig(cls, config, port=None):
+        """
+        Creates a server from the "server" section of config.json.
+        """
+        section = config.get("server", {})
+        return cls(section.get("host", "127.0.0.1"), section.get("port", 8765) if port is None else port,
+                   int(section.get("maxBufferBytes", 1 << 20)))
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Streaming server listening on %s", self.url)
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/"
+
+    @property
+    def running(self):
+        return self._server is not None
+
+    async def _handshake(self, reader, writer, first):
+        """
+        Completes a WebSocket upgrade. Returns the requested stream or None for all streams.
+        """
+        request = first + await reader.readuntil(b"\r\n\r\n")
+        lines = request.decode("latin-1").split("\r\n")
+        path = lines[0].split(" ")[1] if len(lines[0].split(" ")) > 1 else "/"
+        headers = {}
+        for line in lines[1:]:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1(headers["sec-websocket-key"].encode() + _WS_GUID).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        stream = unquote(path[1:])
+        return stream or None
+
+    async def _readWebSocket(self, reader, subscriber):
+        """
+        Consumes client frames: answers pings and stops on close.
+        """
+        while True:
+            head = await reader.readexactly(2)
+            opcode, n = head[0] & 0x0F, head[1] & 0x7F
+            if n == 126:
+                n = struct.unpack(">H", await reader.readexactly(2))[0]
+            elif n == 127:
+                n = struct.unpack(">Q", await reader.readexactly(8))[0]
+            mask = await reader.readexactly(4) if head[1] & 0x80 else b"\0\0\0\0"
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(n)))
+            if opcode == 0x8:
+                return
+            if opcode == 0x9:
+                # control frames bypass the data buffer
+                subscriber.writer.write(_ws_frame(data, 0xA))
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            await self._serve(reader, writer)
+        finally:
+            self._handlers.discard(task)
+
+    async def _serve(self, reader, writer):
+        websocket = False
+        stream = None
+        try:
+            first = await asyncio.wait_for(reader.readexactly(4), _SNIFF_TIMEOUT)
+        except asyncio.TimeoutError:
+            first = b""
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        try:
+            if first == b"GET ":
+                stream = await self._handshake(reader, writer, first)
+                websocket = True
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, KeyError, ConnectionError):
+            writer.close()
+            return
+
+        subscriber = _Subscriber(writer, websocket, stream, self.maxBufferBytes)
+        self.subscribers.append(subscriber)
+        logger.info("Subscriber %s connected", subscriber.peer)
+        sender = asyncio.ensure_future(subscriber.send())
+        try:
+            if websocket:
+                await self._readWebSocket(reader, subscriber)
+            else:
+                while await reader.read(4096):
+                    pass
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            sender.cancel()
+            self._remove(subscriber)
+
+    def _remove(self, subscriber):
+        subscriber.close()
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+            logger.info("Subscriber %s disconnected", subscriber.peer)
+
+    def publish(self, stream, values=None, text=None, channels=None, timestamp=None):
+        """
+        Sends a decoded batch to every subscriber of the stream. Never waits.
+
+        :param stream: Name of the stream, e.g. the characteristic or transport URL.
+        :param values: Array of shape (n, channels), or None for text-only decoders.
+        :param text: Text lines, sent when values is None.
+        :param channels: Channel names.
+        :param timestamp: Host time of the batch, defaults to now.
+        """
+        rows = len(values) if values is not None else len(text or ())
+        seq = self._seq.get(stream, 0)
+        index = self._index.get(stream, 0)
+        self._seq[stream] = seq + 1
+        self._index[stream] = index + rows
+        targets = [s for s in self.subscribers if s.stream is None or s.stream == stream]
+        if not targets or not rows:
+            return
+        message = {"stream": stream, "seq": seq, "time": time.time() if timestamp is None else timestamp,
+                   "index": index}
+        if values is not None:
+            if not channels or len(channels) != values.shape[1]:
+                channels = [f"ch{i}" for i in range(values.shape[1])]
+            message["channels"] = list(channels)
+            message["values"] = values.tolist()
+        else:
+            message["text"] = list(text)
+        payload = json.dumps(message, separators=(",", ":")).encode()
+        for subscriber in targets:
+            if not subscriber.push(payload):
+                logger.warning("Disconnecting slow subscriber %s", subscriber.peer)
+                self.evicted += 1
+                self._remove(subscriber)
+
+    def stats(self):
+        return {"subscribers": len(self.subscribers), "evicted": self.evicted,
+                "buffered": sum(s.buffered for s in self.subscribers)}
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        for subscriber in list(self.subscribers):
+            self._remove(subscriber)
+        # closed connections end their handlers, let them finish instead of cancelling them
+        if self._handlers:
+            await asyncio.wait(list(self._handlers), timeout=1)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+
+_shared_server = None
+
+
+async def shared_server(config):
+    """
+    Returns the application wide server, starting it on first use.
+    """
+    global _shared_server
+    if _shared_server is None:
+        server = StreamServer.fromConfig(config)
+        await server.start()
+        _shared_server = server
+    return _shared_server
@@ -0,0 +1,337 @@
+"""
+Packet sources and sinks consumed by the decode/plot/save pipeline. Nothing here imports Qt.
+
+Every transport delivers whole payloads to a callback(sender, data), the same signature
+bleak uses for notifications, so the pipeline does not care whether a packet came over
+BLE, a serial port, a UDP socket or a named pipe. Byte stream transports cut the stream
+into payloads with a Framer.
+
+Local transports are opened from URLs:
+
+    udp://127.0.0.1:9000                      listen on a port, reply to the last sender
+    udp://0.0.0.0:9000?remote=10.0.0.5:9001   listen and write to a fixed peer
+    serial:///dev/ttyUSB0?baud=115200&frame=line
+    serial://COM3?baud=921600&frame=12        12 byte fixed size frames
+    pipe:///tmp/btviz.fifo?frame=line&write=/tmp/btviz.cmd
+"""
+import asyncio
+import threading
+from urllib.parse import urlparse, parse_qs
+
+NOTIFY = "notify"
+READ = "read"
+WRITE = "write"
+WRITE_NO_RESPONSE = "write-without-response"
+
+
+class Framer:
+    """
+    Cuts a byte stream into payloads, either at newlines or every N bytes.
+    """
+
+    def __init__(self, frame="line"):
+        """
+        :param frame: "line" for newline terminated payloads, or a payload size in bytes.
+        """
+        self.size = None if frame == "line" else int(frame)
+        self._buf = bytearray()
+
+    def feed(self, data):
+        """
+        Adds received bytes and returns the completed payloads.
+        """
+        self._buf += data
+        if self.size is None:
+            if b"\n" not in data:
+                return []
+            *frames, rest = bytes(self._buf).split(b"\n")
+            self._buf = bytearray(rest)
+            # keep the terminator, string decoders expect it
+            return [frame + b"\n" for frame in frames if frame]
+        count = len(self._buf) // self.size
+        frames = [bytes(self._buf[i * self.size:(i + 1) * self.size]) for i in range(count)]
+        del self._buf[:count * self.size]
+        return frames
+
+
+class Transport:
+    """
+    Base class of packet transports.
+    """
+    #: Operations supported, using the BLE property names.
+    properties = ()
+    #: URL the transport was opened from by open_transport(), None for BLE.
+    url = None
+
+    async def open(self):
+        pass
+
+    async def start(self, callback):
+        """
+        Starts delivering payloads to callback(sender, data).
+        """
+        raise NotImplementedError
+
+    async def stop(self):
+        pass
+
+    async def read(self):
+        raise NotImplementedError(f"{self} does not support reads")
+
+    async def write(self, data, response=True):
+        raise NotImplementedError(f"{self} does not support writes")
+
+    def maxWriteSize(self, response=True):
+        """
+        Returns the largest payload a single write can carry.
+        """
+        return 512
+
+    async def close(self):
+        await self.stop()
+
+
+class BleTransport(Transport):
+    """
+    A characteristic of a connected BleakClient.
+    """
+
+    def __init__(self, client, char):
+        self.client = client
+        self.char = char
+
+    @property
+    def properties(self):
+        return tuple(self.char.properties)
+
+    async def start(self, callback):
+        await self.client.start_notify(self.char, callback)
+
+    async def stop(self):
+        await self.client.stop_notify(self.char)
+
+    async def read(self):
+        return await self.client.read_gatt_char(self.char)
+
+    async def write(self, data, response=True):
+        await self.client.write_gatt_char(self.char, data, response=response)
+
+    def maxWriteSize(self, response=True):
+        if not response:
+            size = getattr(self.char, "max_write_without_response_size", None)
+            if size:
+                return size
+        # 3 bytes of ATT header are taken from the MTU by every write
+        mtu = getattr(self.client, "mtu_size", None) or 23
+        return max(1, mtu - 3)
+
+    async def close(self):
+        # the connection belongs to the ConnectWidget, only notifications are stopped here
+        await self.stop()
+
+    def __str__(self):
+        return str(self.char)
+
+
+class UdpTransport(Transport):
+    """
+    One datagram per payload. Writes go to a fixed remote or to the last sender.
+    """
+    properties = (NOTIFY, WRITE, WRITE_NO_RESPONSE)
+
+    def __init__(self, host, port, remote=None):
+        self.host = host
+        self.port = port
+        self.remote = remote
+        self._transport = None
+        self._callback = None
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        owner = self
+
+        class Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                owner._lastSender = addr
+                if owner._callback is not None:
+                    owner._callback(owner, data)
+
+        self._lastSender = None
+        self._transport, _ = await loop.create_datagram_endpoint(Protocol, local_addr=(self.host, self.port))
+        self.port = self._transport.get_extra_info("sockname")[1]
+
+    async def start(self, callback):
+        self._callback = callback
+
+    async def stop(self):
+        self._callback = None
+
+    async def write(self, data, response=True):
+        target = self.remote or self._lastSender
+        if target is None:
+            raise ConnectionError("No UDP peer to write to yet")
+        self._transport.sendto(bytes(data), target)
+
+    def maxWriteSize(self, response=True):
+        return 1472
+
+    async def close(self):
+        await self.stop()
+        if self._transport is not None:
+            self._transport.close()
+
+    def __str__(self):
+        return f"udp://{self.host}:{self.port}"
+
+
+class _ReaderThreadTransport(Transport):
+    """
+    Shared implementation of byte stream transports read by a background thread.
+    """
+    properties = (NOTIFY, WRITE, WRITE_NO_RESPONSE)
+
+    def __init__(self, frame="line"):
+        self.framer = Framer(frame)
+        self._callback = None
+        self._thread = None
+        self._running = False
+        self._loop = None
+
+    def _readChunk(self):
+        raise NotImplementedError
+
+    def _run(self):
+        while self._running:
+            try:
+                data = self._readChunk()
+            except OSError:
+                break
+            if not data:
+                continue
+            for frame in self.framer.feed(data):
+                callback = self._callback
+                if callback is not None:
+                    self._loop.call_soon_threadsafe(callback, self, frame)
+
+    async def start(self, callback):
+        self._callback = callback
+        if self._thread is None:
+            self._loop = asyncio.get_running_loop()
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=f"btviz-{self}", daemon=True)
+            self._thread.start()
+
+    async def stop(self):
+        self._callback = None
+
+
+class SerialTransport(_ReaderThreadTransport):
+    """
+    A UART, e.g. a development board during bring-up. Requires pyserial.
+    """
+
+    def __init__(self, port, baudrate=115200, frame="line"):
+        super().__init__(frame)
+        self.port = port
+        self.baudrate = baudrate
+        self._serial = None
+
+    async def open(self):
+        try:
+            import serial
+        except ImportError as e:
+            raise ImportError("Serial transports need pyserial: pip install pyserial") from e
+        self._serial = serial.Serial(self.port, self.baudrate, timeout=0.1)
+
+    def _readChunk(self):
+        return self._serial.read(max(1, self._serial.in_waiting))
+
+    async def write(self, data, response=True):
+        await asyncio.get_running_loop().run_in_executor(None, self._serial.write, bytes(data))
+
+    async def close(self):
+        await self.stop()
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(1)
+        if self._serial is not None:
+            self._serial.close()
+
+    def __str__(self):
+        return f"serial://{self.port}"
+
+
+class PipeTransport(_ReaderThreadTransport):
+    """
+    A named pipe (POSIX FIFO or Windows \\\\.\\pipe\\name), with an optional second pipe for writes.
+    """
+
+    def __init__(self, path, frame="line", writePath=None):
+        super().__init__(frame)
+        self.path = path
+        self.writePath = writePath
+        self._fh = None
+        self._wfh = None
+        if writePath is None:
+            self.properties = (NOTIFY,)
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        # opening a FIFO blocks until the other side connects
+        self._fh = await loop.run_in_executor(None, lambda: open(self.path, "rb", buffering=0))
+        if self.writePath:
+            self._wfh = await loop.run_in_executor(None, lambda: open(self.writePath, "wb", buffering=0))
+
+    def _readChunk(self):
+        data = self._fh.read(4096)
+        if data == b"":
+            # writer went away
+            self._running = False
+        return data
+
+    async def write(self, data, response=True):
+        if self._wfh is None:
+            raise NotImplementedError(f"{self} was opened without a write pipe")
+        await asyncio.get_running_loop().run_in_executor(None, self._wfh.write, bytes(data))
+
+    async def close(self):
+        await self.stop()
+        self._running = False
+        for fh in (self._fh, self._wfh):
+            if fh is not None:
+                fh.close()
+
+    def __str__(self):
+        return f"pipe://{self.path}"
+
+
+def _hostPort(text):
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+async def open_transport(url):
+    """
+    Opens a local transport from a URL, see the module docstring for the formats.
+    """
+    parsed = urlparse(url)
+    query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+    frame = query.get("frame", "line")
+    if parsed.scheme == "udp":
+        remote = _hostPort(query["remote"]) if "remote" in query else None
+        transport = UdpTransport(parsed.hostname or "127.0.0.1", parsed.port or 0, remote)
+    elif parsed.scheme == "serial":
+        port = parsed.netloc + parsed.path if parsed.netloc else parsed.path
+        transport = SerialTransport(port, int(query.get("baud", 115200)), frame)
+    elif parsed.scheme == "pipe":
+        path = parsed.netloc + parsed.path if parsed.netloc else parsed.path
+        transport = PipeTransport(path, frame, query.get("write"))
+    else:
+        raise ValueError(f"Unsupported transport URL '{url}', use udp://, serial:// or pipe://")
+    await transport.open()
+    transport.url = url
+    return transport
+
+
+def is_transport_url(text):
+    return text.split("://", 1)[0] in ("udp", "serial", "pipe") and "://" in text
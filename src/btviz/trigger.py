@@ -0,0 +1,198 @@
+"""
+Oscilloscope-style triggered capture on decoded samples. Nothing here imports Qt.
+"""
+import numpy as np
+from .capture import capture_path
+
+LEVEL = "level"
+WINDOW = "window"
+CONDITIONS = (LEVEL, WINDOW)
+
+RISING = "rising"
+FALLING = "falling"
+EITHER = "either"
+EDGES = (RISING, FALLING, EITHER)
+
+SINGLE = "single"
+NORMAL = "normal"
+AUTO = "auto"
+MODES = (SINGLE, NORMAL, AUTO)
+
+
+class Segment:
+    """
+    One captured event.
+
+    :ivar values: Array of shape (pre + post, channels).
+    :ivar triggerIndex: Row of values at which the trigger fired.
+    :ivar sampleNumber: Index of the trigger sample counted from the first sample fed to the Trigger.
+    :ivar forced: True when the segment was forced by auto mode without a trigger.
+    """
+
+    def __init__(self, values, triggerIndex, sampleNumber, forced=False):
+        self.values = values
+        self.triggerIndex = triggerIndex
+        self.sampleNumber = sampleNumber
+        self.forced = forced
+
+
+class Trigger:
+    """
+    Watches one channel for a level or window condition and cuts segments around each event.
+
+    A ring of the last preSamples rows is kept at all times, so every segment contains
+    the samples leading up to the trigger followed by postSamples rows starting at it.
+    Conditions are evaluated on whole batches with NumPy.
+
+    Modes:
+    - single: capture one segment, then disarm until arm() is called.
+    - normal: re-arm after every segment.
+    - auto: like normal, but force a segment when no trigger occurred for autoSamples samples.
+    """
+
+    def __init__(self, channel=0, condition=LEVEL, edge=RISING, level=0.0, low=0.0, high=0.0,
+                 preSamples=100, postSamples=100, mode=NORMAL, autoSamples=1000):
+        """
+        :param channel: Column of the decoded values that is watched.
+        :param condition: "level" crosses a threshold, "window" enters or leaves [low, high].
+        :param edge: "rising" / "falling" / "either". For windows rising means entering and falling leaving.
+        :param level: Threshold of the level condition.
+        :param low: Lower bound of the window condition.
+        :param high: Upper bound of the window condition.
+        :param preSamples: Samples kept before the trigger.
+        :param postSamples: Samples captured from the trigger on.
+        :param mode: "single", "normal" or "auto".
+        :param autoSamples: Samples without trigger after which auto mode forces a segment.
+        """
+        if condition not in CONDITIONS or edge not in EDGES or mode not in MODES:
+            raise ValueError(f"Invalid trigger setting: {condition}, {edge}, {mode}")
+        self.channel = channel
+        self.condition = condition
+        self.edge = edge
+        self.level = level
+        self.low = min(low, high)
+        self.high = max(low, high)
+        self.preSamples = max(0, int(preSamples))
+        self.postSamples = max(1, int(postSamples))
+        self.mode = mode
+        self.autoSamples = max(1, int(autoSamples))
+
+        self.armed = True
+        self.count = 0
+        self.fired = 0
+        self._history = None
+        self._last = None
+        self._sinceArm = 0
+        self._capture = None
+
+    def arm(self):
+        """
+        Re-arms the trigger, e.g. after a single mode capture.
+        """
+        self.armed = True
+        self._sinceArm = 0
+
+    def _state(self, x):
+        if self.condition == LEVEL:
+            return x >= self.level
+        return (x >= self.low) & (x <= self.high)
+
+    def _findTrigger(self, x, start, prev):
+        """
+        Returns the first index >= start where the condition fires, or None.
+        """
+        if start >= len(x):
+            return None
+        state = self._state(x[start:])
+        if prev is None:
+            before = state[:-1]
+            offset = 1
+            state = state[1:]
+        else:
+            before = np.concatenate(([self._state(np.asarray(prev))], state[:-1]))
+            offset = 0
+        if self.edge == RISING:
+            hits = ~before & state
+        elif self.edge == FALLING:
+            hits = before & ~state
+        else:
+            hits = before != state
+        found = np.flatnonzero(hits)
+        return start + offset + int(found[0]) if len(found) else None
+
+    def feed(self, values):
+        """
+        Processes a batch of decoded rows.
+
+        :param values: Array-like of shape (n, channels).
+        :return: List of completed Segments.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values.reshape(len(values), -1)
+        if self._history is None:
+            self._history = np.empty((0, values.shape[1]))
+        segments = []
+        x = values[:, self.channel]
+        n = len(values)
+        i = 0
+        while i < n:
+            if self._capture is not None:
+                rows, filled, triggerIndex, sampleNumber, forced = self._capture
+                take = min(self.postSamples - (filled - triggerIndex), n - i)
+                rows[filled:filled + take] = values[i:i + take]
+                filled += take
+                i += take
+                if filled - triggerIndex >= self.postSamples:
+                    segments.append(Segment(rows, triggerIndex, sampleNumber, forced))
+                    self._capture = None
+                    self.fired += 1
+                    self._sinceArm = 0
+                    if self.mode == SINGLE:
+                        self.armed = False
+                else:
+                    self._capture = (rows, filled, triggerIndex, sampleNumber, forced)
+                continue
+            if not self.armed:
+                break
+
+            prev = x[i - 1] if i > 0 else self._last
+            j = self._findTrigger(x, i, prev)
+            forced = False
+            if self.mode == AUTO and (j is None or j - i + self._sinceArm >= self.autoSamples):
+                k = i + self.autoSamples - self._sinceArm
+                if k < n:
+                    j, forced = max(i, k), True
+            if j is None:
+                self._sinceArm += n - i
+                break
+
+            pre = np.concatenate([self._history, values[:j]])[-self.preSamples:] if self.preSamples else values[:0]
+            rows = np.empty((len(pre) + self.postSamples, values.shape[1]))
+            rows[:len(pre)] = pre
+            self._capture = (rows, len(pre), len(pre), self.count + j, forced)
+            i = j
+
+        if self.preSamples:
+            self._history = np.concatenate([self._history, values])[-self.preSamples:]
+        if n:
+            self._last = x[-1]
+        self.count += n
+        return segments
+
+
+def save_segment(segment, prefix, number):
+    """
+    Writes one triggered segment as a small text capture under results/<date>/.
+
+    :param segment: The Segment to save.
+    :param prefix: File name prefix.
+    :param number: Event number appended to the file name.
+    :return: The path written.
+    """
+    path = capture_path(f"{prefix}_event_{number:05d}.txt")
+    with open(path, "w") as fh:
+        fh.write(f"# trigger sample {segment.sampleNumber}, row {segment.triggerIndex}"
+                 f"{', forced' if segment.forced else ''}\n")
+        for row in segment.values.tolist():
+            fh.write(",".join(str(v) for v in row) + "\n")
+    return path
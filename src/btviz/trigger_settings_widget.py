@@ -0,0 +1,112 @@
+from PyQt5.QtWidgets import QWidget, QPushButton, QLineEdit, QLabel, QFormLayout, QComboBox, QCheckBox, QMessageBox
+from PyQt5.QtCore import pyqtSignal
+from .trigger import CONDITIONS, EDGES, MODES
+
+
+class TriggerSettingsWidget(QWidget):
+    """
+    A widget for configuring triggered capture
+    """
+    gotTriggerSetting = pyqtSignal(object)
+
+    def __init__(self, channels=1):
+        super().__init__()
+        self.channels = channels
+        self.enableCheck = QCheckBox("Triggered capture")
+        self.channelDropdown = QComboBox()
+        self.conditionDropdown = QComboBox()
+        self.edgeDropdown = QComboBox()
+        self.levelText = QLineEdit("0")
+        self.lowText = QLineEdit("0")
+        self.highText = QLineEdit("0")
+        self.preText = QLineEdit("100")
+        self.postText = QLineEdit("400")
+        self.modeDropdown = QComboBox()
+        self.autoText = QLineEdit("2000")
+        self.saveCheck = QCheckBox("Save each event to its own file")
+        self.prefixText = QLineEdit("trigger")
+        self.saveButton = QPushButton("apply and arm")
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Trigger Settings")
+        self.setStyleSheet("background-color: #4B9CD3; color: white;")
+
+        text_style = "background-color: #E7EBEB; color: black; border-radius: 5px; padding: 5px;"
+        label_style = "font-size: 14px; font-weight: bold; color: white;"
+        button_style = """
+        QPushButton {
+            background-color: #4B9CD3;
+            color: white;
+            border: .5px solid white;
+            border-radius: 5px;
+            font-size: 14px;
+            font-weight: bold;
+            padding: 5px;
+        }
+        QPushButton:hover {
+            background-color: #13294B;
+        }
+        """
+
+        for i in range(self.channels):
+            self.channelDropdown.addItem(str(i))
+        self.conditionDropdown.addItems(CONDITIONS)
+        self.edgeDropdown.addItems(EDGES)
+        self.modeDropdown.addItems(MODES)
+        self.modeDropdown.setCurrentText("normal")
+
+        for widget in (self.channelDropdown, self.conditionDropdown, self.edgeDropdown, self.levelText,
+                       self.lowText, self.highText, self.preText, self.postText, self.modeDropdown,
+                       self.autoText, self.prefixText):
+            widget.setStyleSheet(text_style)
+        self.enableCheck.setStyleSheet(label_style)
+        self.saveCheck.setStyleSheet(label_style)
+
+        self.saveButton.setStyleSheet(button_style)
+        self.saveButton.clicked.connect(self.on_save)
+
+        layout = QFormLayout(self)
+        layout.addRow(self.enableCheck)
+        for text, widget in (("Channel", self.channelDropdown),
+                             ("Condition", self.conditionDropdown),
+                             ("Edge (window: rising = enter)", self.edgeDropdown),
+                             ("Level", self.levelText),
+                             ("Window low", self.lowText),
+                             ("Window high", self.highText),
+                             ("Pre-trigger samples", self.preText),
+                             ("Post-trigger samples", self.postText),
+                             ("Mode", self.modeDropdown),
+                             ("Auto timeout (samples)", self.autoText),
+                             ("Event file prefix", self.prefixText)):
+            label = QLabel(text)
+            label.setStyleSheet(label_style)
+            layout.addRow(label, widget)
+        layout.addRow(self.saveCheck)
+        layout.addRow(self.saveButton)
+
+    def on_save(self):
+        if not self.enableCheck.isChecked():
+            self.gotTriggerSetting.emit(None)
+            self.close()
+            return
+        try:
+            settings = {
+                "channel": int(self.channelDropdown.currentText()),
+                "condition": self.conditionDropdown.currentText(),
+                "edge": self.edgeDropdown.currentText(),
+                "level": float(self.levelText.text()),
+                "low": float(self.lowText.text()),
+                "high": float(self.highText.text()),
+                "preSamples": int(self.preText.text()),
+                "postSamples": int(self.postText.text()),
+                "mode": self.modeDropdown.currentText(),
+                "autoSamples": int(self.autoText.text()),
+            }
+        except ValueError:
+            QMessageBox.warning(self, 'Warning', 'Trigger settings must be numbers')
+            return
+        settings["save"] = self.saveCheck.isChecked()
+        settings["prefix"] = self.prefixText.text() or "trigger"
+        self.gotTriggerSetting.emit(settings)
+        self.close()
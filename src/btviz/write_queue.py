@@ -0,0 +1,134 @@
+"""
+Pipelined bulk writes to a transport. Nothing here imports Qt.
+"""
+import asyncio
+import time
+
+
+class WriteStats:
+    """
+    Progress and throughput of one WriteQueue.send() call.
+    """
+
+    def __init__(self, total, chunkSize):
+        self.total = total
+        self.chunkSize = chunkSize
+        self.sent = 0
+        self.chunks = 0
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def elapsed(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    @property
+    def throughput(self):
+        """
+        Achieved throughput in bytes per second.
+        """
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.sent}/{self.total} bytes in {self.chunks} chunks of {self.chunkSize}, "
+                f"{self.elapsed:.2f} s, {self.throughput / 1024:.1f} KiB/s")
+
+
+class WriteQueue:
+    """
+    Splits payloads to the negotiated MTU and writes them to a transport.
+
+    Writes with response are sent one at a time. Writes without response keep up to
+    `window` chunks in flight. Concurrent send() calls are serialized so payloads are
+    never interleaved.
+    """
+
+    def __init__(self, transport, response=True, window=8, chunkSize=None):
+        """
+        Initializes the write queue.
+
+        :param transport: The Transport to write to, e.g. a BleTransport.
+        :param response: Use write-with-response.
+        :param window: Maximum number of write-without-response chunks in flight.
+        :param chunkSize: Override of the chunk size derived from the MTU.
+        """
+        self.transport = transport
+        self.response = response
+        self.window = max(1, window)
+        self._chunkSize = chunkSize
+        self._lock = asyncio.Lock()
+
+    def chunkSize(self):
+        """
+        Returns the largest payload a single write can carry on this connection.
+        """
+        return self._chunkSize or self.transport.maxWriteSize(self.response)
+
+    async def send(self, data, progress=None):
+        """
+        Writes a payload of any length.
+
+        :param data: The bytes to send.
+        :param progress: Optional callable receiving the WriteStats after every chunk.
+        :return: The final WriteStats.
+        """
+        async with self._lock:
+            size = self.chunkSize()
+            stats = WriteStats(len(data), size)
+            chunks = [bytes(data[i:i + size]) for i in range(0, len(data), size)]
+            if self.response:
+                for chunk in chunks:
+                    await self.transport.write(chunk, response=True)
+                    self._advance(stats, len(chunk), progress)
+            else:
+                await self._sendPipelined(chunks, stats, progress)
+            stats.end = time.perf_counter()
+            return stats
+
+    async def _sendPipelined(self, chunks, stats, progress):
+        slots = asyncio.Semaphore(self.window)
+        inFlight = []
+
+        async def write(chunk):
+            try:
+                await self.transport.write(chunk, response=False)
+                self._advance(stats, len(chunk), progress)
+            finally:
+                slots.release()
+
+        try:
+            for chunk in chunks:
+                await slots.acquire()
+                # surface failures as soon as they happen instead of after the whole payload
+                for task in inFlight:
+                    if task.done() and not task.cancelled() and task.exception():
+                        slots.release()
+                        raise task.exception()
+                inFlight = [task for task in inFlight if not task.done()]
+                # tasks are created in order, so chunks are submitted to the stack in order
+                inFlight.append(asyncio.ensure_future(write(chunk)))
+            await asyncio.gather(*inFlight)
+        except BaseException:
+            for task in inFlight:
+                task.cancel()
+            raise
+
+    @staticmethod
+    def _advance(stats, count, progress):
+        stats.sent += count
+        stats.chunks += 1
+        if progress is not None:
+            progress(stats)
+
+    async def sendLines(self, lines, progress=None):
+        """
+        Sends a command script, one write per non-empty line. Lines starting with # are skipped.
+
+        :return: List of WriteStats, one per command.
+        """
+        results = []
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                results.append(await self.send(line.encode("utf-8"), progress))
+        return results
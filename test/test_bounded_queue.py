@@ -0,0 +1,65 @@
+import sys
+import threading
+import time
+from btviz.bounded_queue import BoundedQueue, BLOCK, DROP_OLDEST, DROP_NEWEST, DECIMATE, FAIL
+
+print("Starting test BoundedQueue...")
+
+q = BoundedQueue("oldest", 4, policy=DROP_OLDEST)
+for i in range(10):
+    q.put(i)
+if q.getBatch() != [6, 7, 8, 9] or q.stats()["dropped"] != 6:
+    print("drop-oldest failed")
+    sys.exit(1)
+
+q = BoundedQueue("newest", 4, policy=DROP_NEWEST)
+for i in range(10):
+    q.put(i)
+if q.getBatch() != [0, 1, 2, 3] or q.stats()["dropped"] != 6:
+    print("drop-newest failed")
+    sys.exit(1)
+
+q = BoundedQueue("decimate", 8, policy=DECIMATE)
+for i in range(9):
+    q.put(i)
+if q.getBatch() != [1, 3, 5, 7, 8] or q.stats()["highWater"] != 8:
+    print("decimate failed")
+    sys.exit(1)
+
+# A blocked producer resumes once the consumer drains, nothing is lost
+q = BoundedQueue("block", 2, policy=BLOCK, timeout=5)
+received = []
+def consume():
+    while len(received) < 100:
+        received.extend(q.getBatch())
+t = threading.Thread(target=consume)
+t.start()
+for i in range(100):
+    q.put(i)
+t.join()
+if received != list(range(100)) or q.stats()["dropped"] != 0:
+    print("block failed")
+    sys.exit(1)
+
+# A blocked producer gives up after the timeout and counts the drop
+q = BoundedQueue("timeout", 1, policy=BLOCK, timeout=0.01)
+q.put(0)
+if q.put(1) or q.stats()["dropped"] != 1:
+    print("block timeout failed")
+    sys.exit(1)
+
+# A failing queue refuses without waiting, and sized items are counted by their rows
+q = BoundedQueue("rows", 10, policy=FAIL, sizeOf=len)
+start = time.monotonic()
+if not q.put([0] * 6) or not q.put([0] * 4) or q.put([0]) or time.monotonic() - start > 0.5:
+    print("fail policy failed")
+    sys.exit(1)
+if q.stats()["size"] != 10 or q.stats()["dropped"] != 1 or len(q.getBatch(1)[0]) != 6 or q.stats()["size"] != 4:
+    print("sized items failed")
+    sys.exit(1)
+q = BoundedQueue("large", 10, policy=FAIL, sizeOf=len)
+if not q.put([0] * 50) or q.put([0]):
+    print("An empty queue should take an item larger than the queue")
+    sys.exit(1)
+
+print("All tests passed.")
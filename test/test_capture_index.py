@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import numpy as np
+from btviz.capture import CaptureWriter, CaptureFile, index_capture, load_index, capture_rows
+from btviz.clock_sync import MONOTONIC_EPOCH
+from btviz.decoders import available_decoders
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+folder = tempfile.mkdtemp()
+
+print("Testing text capture index...")
+path = os.path.join(folder, "run.txt")
+writer = CaptureWriter(path, indexEvery=100)
+t0 = 1000.0
+for batch in range(50):
+    lines = [f"{i},{i * 2}" for i in range(batch * 37, (batch + 1) * 37)]
+    writer.writeLines(lines, timestamp=t0 + batch)
+writer.close()
+entries, every = load_index(path)
+if every != 100 or list(entries["sample"]) != list(range(0, 1850, 100)):
+    fail(f"Wrong index entries {entries['sample']}")
+with CaptureFile(path) as capture:
+    if len(capture) != 1850:
+        fail(f"Wrong sample count {len(capture)}")
+    if capture.readSamples(1234, 1240) != [f"{i},{i * 2}" for i in range(1234, 1240)]:
+        fail(f"Wrong samples {capture.readSamples(1234, 1240)}")
+    if capture.readSamples(1840, 2000) != [f"{i},{i * 2}" for i in range(1840, 1850)]:
+        fail("Reading past the end failed")
+    first, lines = capture.readTime(t0 + 10, t0 + 20)
+    # the index knows the time of every 100th sample, the range is accurate to one interval
+    if abs(first - 370) > 100 or abs(first + len(lines) - 740) > 100 or lines[0] != f"{first},{first * 2}":
+        fail(f"Time range read returned samples {first} to {first + len(lines)}")
+
+print("Testing appending to a capture...")
+writer = CaptureWriter(path, indexEvery=100)
+if writer.samples != 1850:
+    fail(f"Appending writer starts at sample {writer.samples}")
+writer.writeLines([f"{i},{i * 2}" for i in range(1850, 1950)], timestamp=t0 + 60)
+writer.close()
+with CaptureFile(path) as capture:
+    if len(capture) != 1950 or capture.readSamples(1895, 1905) != [f"{i},{i * 2}" for i in range(1895, 1905)]:
+        fail("Appended samples not found")
+
+print("Testing binary capture index...")
+path = os.path.join(folder, "run.bin")
+data = np.stack([np.arange(5000.), np.arange(5000.) ** 2], axis=1)
+writer = CaptureWriter(path, indexEvery=256, names=["x", "y"])
+for i, chunk in enumerate(np.array_split(data, 20)):
+    writer.writeValues(chunk, timestamp=t0 + i)
+writer.close()
+with CaptureFile(path) as capture:
+    if capture.names != ["x", "y"] or len(capture) != 5000:
+        fail(f"Wrong binary capture header {capture.names} {len(capture)}")
+    if not np.array_equal(capture.readSamples(4000, 4100), data[4000:4100]):
+        fail("Wrong binary samples")
+    first, rows = capture.readTime(t0 + 5, t0 + 6)
+    if not np.array_equal(rows, data[first:first + len(rows)]):
+        fail("Binary time range read returned wrong rows")
+
+print("Testing index of an older capture...")
+path = os.path.join(folder, "old.txt")
+with open(path, "w") as fh:
+    fh.write("".join(f"{i}\n" for i in range(1000)))
+if index_capture(path, 64) != 1000:
+    fail("Wrong legacy sample count")
+with CaptureFile(path) as capture:
+    if capture.readSamples(500, 503) != ["500", "501", "502"]:
+        fail("Legacy index read failed")
+    try:
+        capture.readTime(0, 1)
+        fail("Legacy captures have no times")
+    except ValueError:
+        pass
+
+print("Testing capture rows of a batch...")
+decoder = available_decoders({"decodeOptions": []})["Comma Delimited String Literal"]
+values = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+text = ["1,2", "3,4", "5,6"]
+times = np.array([0.0, 1.0, 2.0])
+gaps = np.array([2])
+rows = capture_rows(values, text, decoder, True, times, gaps)
+if rows.shape != (4, 3) or not np.isnan(rows[2]).all() or rows[3, 1] != 6.0 or rows[1, 2] != 1.0 + MONOTONIC_EPOCH:
+    fail(f"Unexpected binary rows {rows}")
+lines = capture_rows(values, text, decoder, False, times, gaps)
+if len(lines) != 4 or lines[2].count(",") != 2 or "nan" not in lines[2].lower() or not lines[3].startswith("5,6,"):
+    fail(f"Unexpected text lines {lines}")
+if capture_rows(values, text, decoder, False) != text or capture_rows(None, [], decoder, False) is not None \
+        or capture_rows(np.empty((0, 2)), [], decoder, True) is not None:
+    fail("Batches without times or gaps should be written as they are")
+
+print("All tests passed.")
@@ -0,0 +1,65 @@
+import sys
+import warnings
+import numpy as np
+from btviz.channel_stats import ChannelStats, RunningMoments
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+def reference(values):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {"mean": np.nanmean(values, axis=0), "std": np.nanstd(values, axis=0),
+                "min": np.nanmin(values, axis=0), "max": np.nanmax(values, axis=0),
+                "rms": np.sqrt(np.nanmean(values * values, axis=0))}
+
+
+def check(stats, values, what):
+    for name, expected in reference(values).items():
+        if not np.allclose(stats[name], expected, rtol=1e-9, atol=1e-9, equal_nan=True):
+            fail(f"{what}: {name} is {stats[name]}, expected {expected}")
+    if (stats["count"] != (~np.isnan(values)).sum(axis=0)).any():
+        fail(f"{what}: count is {stats['count']}")
+
+
+rng = np.random.default_rng(7)
+data = rng.normal(1e6, 3.0, (60000, 3))
+data[rng.random(data.shape) < 0.01] = np.nan
+
+print("Testing window and session statistics against NumPy...")
+for length, block in [(1000, 256), (100, 16), (1, 4), (300, 300)]:
+    stats = ChannelStats(3, length, block)
+    position = 0
+    for n in rng.integers(1, 1500, 40).tolist():
+        stats.update(data[position:position + n], now=position / 1000)
+        position += n
+        check(stats.windowStats(), data[max(0, position - length):position], f"window {length}/{block}")
+    check(stats.sessionStats(), data[:position], f"session {length}/{block}")
+
+print("Testing a window length change...")
+stats.setWindow(120)
+check(stats.windowStats(), data[position - 120:position], "shortened window")
+stats.update(data[position:position + 50], now=position / 1000)
+check(stats.windowStats(), data[position - 70:position + 50], "shortened window after an update")
+
+print("Testing sample rates...")
+stats = ChannelStats(1, 1000)
+for i in range(100):
+    stats.update(np.zeros((100, 1)), now=i * 0.5 if i < 50 else 25 + (i - 50) * 0.1)
+if abs(stats.windowStats()["rate"] - 1000) > 1 or not 100 < stats.sessionStats()["rate"] < 1000:
+    fail(f"Expected 1000 samples/s in the window, got {stats.windowStats()['rate']} "
+         f"and {stats.sessionStats()['rate']} for the session")
+
+print("Testing empty statistics...")
+empty = ChannelStats(2, 10)
+if not np.isnan(empty.windowStats()["mean"]).all() or not np.isnan(empty.sessionStats()["std"]).all():
+    fail("Statistics without samples should be NaN")
+moments = RunningMoments(1)
+moments.update(np.full((5, 1), np.nan))
+if moments.summary()["count"][0] != 0 or not np.isnan(moments.summary()["min"][0]):
+    fail("Gap markers should not count as samples")
+
+print("All tests passed.")
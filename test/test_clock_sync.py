@@ -0,0 +1,80 @@
+import sys
+import numpy as np
+from btviz.clock_sync import ClockAligner, MONOTONIC_EPOCH, capture_names, append_host_time, append_host_time_text
+from btviz.decoders import available_decoders
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+def stream(aligner, rng, offset, drift, batches, start=0.0, bits=32, latency=0.002):
+    """Feeds 100 Hz samples in batches of 10 with random delays, returns the largest error of the last half."""
+    errors = []
+    for b in range(batches):
+        device = start + b * 0.1 + np.arange(10) * 0.01
+        host = offset + device * (1 + drift)
+        ticks = np.mod(np.round(device * 1e6), 1 << bits).reshape(-1, 1)
+        delay = latency + rng.exponential(0.005) + (0.25 if rng.random() < 0.03 else 0.0)
+        aligned = aligner.update(ticks, host[-1] + delay)
+        if b >= batches // 2:
+            errors.append(np.abs(aligned - host).max() - latency)
+    return max(errors)
+
+
+rng = np.random.default_rng(3)
+
+print("Testing offset and drift...")
+aligner = ClockAligner(0, scale=1e-6, modulus=1 << 32)
+error = stream(aligner, rng, 500.0, 100e-6, 2000)
+if abs(aligner.driftPpm - 100) > 10:
+    fail(f"Expected about 100 ppm drift, got {aligner.driftPpm}")
+if error > 0.002:
+    fail(f"Aligned times are off by {error * 1000:.2f} ms beyond the latency")
+
+print("Testing timestamp wrap-around...")
+aligner = ClockAligner(0, scale=1e-6, modulus=1 << 24)
+error = stream(aligner, rng, 20.0, -40e-6, 600, start=10.0)
+if error > 0.002 or aligner.resets:
+    fail(f"A wrapping timestamp should stay aligned: {error * 1000:.2f} ms, {aligner.resets} resets")
+
+print("Testing two devices on one time base...")
+# different offsets and drifts in opposite directions, both mapped onto the same host clock
+errors = [stream(ClockAligner(0, scale=1e-6), rng, 100.0, 30e-6, 1000),
+          stream(ClockAligner(0, scale=1e-6), rng, 92.5, -60e-6, 1000, start=7.5)]
+if max(errors) > 0.002:
+    fail(f"Both devices should be within 2 ms of host time, got {errors}")
+
+print("Testing a backlog at startup...")
+aligner = ClockAligner(0)
+for b in range(400):
+    device = b * 0.05
+    # the first 100 batches arrive late and catch up slowly
+    aligner.update(np.array([[device]]), 50.0 + device + 0.001 + max(0.0, 0.5 - b * 0.005))
+if abs(aligner.driftPpm) > 50 or abs(aligner.offset - 50.001) > 0.001:
+    fail(f"A backlog should not bend the fit: {aligner.stats()}")
+
+print("Testing a device restart...")
+aligner = ClockAligner(0)
+aligner.update(np.array([[100.0], [101.0]]), 1000.0)
+aligner.update(np.array([[0.0], [1.0]]), 1001.0)
+if aligner.resets != 1 or abs(aligner.offset - 1000.0) > 1e-9:
+    fail(f"Expected one reset and a new offset, got {aligner.stats()}")
+
+print("Testing capture helpers...")
+config = {"decodeOptions": [{"name": "Stamped", "format": "<Ih", "channels": ["t", "x"], "timestamp": "t",
+                             "timestampScale": 1e-6, "timestampBits": 32}]}
+decoder = available_decoders(config)["Stamped"]
+if capture_names(decoder) != ["t", "x", "host_time"]:
+    fail(f"Unexpected capture names {capture_names(decoder)}")
+aligner = ClockAligner.fromDecoder(decoder, 2, config)
+if aligner is None or aligner.modulus != 1 << 32 or aligner.scale != 1e-6:
+    fail("Expected an aligner from the decoder settings")
+rows = append_host_time(np.ones((2, 2)), np.array([1.0, 2.0]))
+if rows.shape != (2, 3) or rows[1, 2] != 2.0 + MONOTONIC_EPOCH:
+    fail("Expected a Unix time column")
+if not append_host_time_text(["1,2"], np.array([0.0]))[0].startswith("1,2,"):
+    fail("Expected the time appended to the line")
+
+print("All tests passed.")
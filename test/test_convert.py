@@ -0,0 +1,79 @@
+import gzip
+import os
+import sys
+import tempfile
+import numpy as np
+from btviz.capture import CaptureWriter
+from btviz.convert import convert_tree, find_captures
+from btviz.io import open_capture
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+root = tempfile.mkdtemp()
+rng = np.random.default_rng(7)
+expected = {}
+for day in ("2026-01-01", "2026-01-02"):
+    os.makedirs(os.path.join(root, day))
+    for k in range(2):
+        path = os.path.join(root, day, f"imu{k}.txt")
+        values = np.round(rng.normal(size=(3000, 2)), 6)
+        writer = CaptureWriter(path, 1000)
+        for i in range(3):
+            writer.writeLines([",".join(map(str, row)) for row in values[i * 1000:(i + 1) * 1000].tolist()],
+                              1000.0 + i)
+        writer.close()
+        expected[path] = values
+with open(os.path.join(root, "2026-01-02", "notes.txt"), "w") as fh:
+    fh.write("not,a capture\n")
+with open(os.path.join(root, "2026-01-02", "probe_fw-1.4_120000.json"), "w") as fh:
+    fh.write('{"label": "fw-1.4"}\n')
+with open(os.path.join(root, "2026-01-02", "firmware.bin"), "wb") as fh:
+    fh.write(b"\x7fELF" + bytes(64))
+
+print("Testing conversion to binary in worker processes...")
+results = convert_tree([root], "bin", workers=2, indexEvery=1000)
+failed = [r for r in results if r.error]
+if len(results) != 5 or len(failed) != 1 or not failed[0].source.endswith("notes.txt"):
+    fail(f"Expected 4 conversions and 1 failure, got {[(r.source, r.error) for r in results]}")
+if any(".partial" in name for _, _, files in os.walk(root) for name in files):
+    fail("A failed conversion should not leave partial files")
+for path, values in expected.items():
+    with open_capture(path[:-4] + ".bin") as capture:
+        if not np.array_equal(capture.read(), values):
+            fail(f"{path} was not converted exactly")
+        if capture.timeOf(2000) != 1002.0:
+            fail(f"Write times should be kept in the new index, got {capture.timeOf(2000)}")
+
+print("Testing resuming...")
+results = convert_tree([root], "bin", workers=1, pattern="imu*")
+if not all(r.skipped for r in results) or len(results) != 4:
+    fail("Up to date outputs should be skipped")
+os.utime(next(iter(expected)), (2e9, 2e9))
+results = convert_tree([root], "bin", workers=1, pattern="imu*")
+if sum(not r.skipped for r in results) != 1:
+    fail("Only the changed capture should be converted again")
+
+print("Testing CSV and NumPy outputs...")
+out = os.path.join(root, "converted")
+sources = [s for s, _ in find_captures([root], "npz", "imu*")]
+if sum(s.endswith(".bin") for s in sources) != 4:
+    fail("Binary captures should be sources for the other formats")
+if [s for s, _ in find_captures([root], "npz") if not os.path.basename(s).startswith(("imu", "notes"))]:
+    fail("Probe reports and files without the capture magic should not be listed")
+results = convert_tree([root], "npz", outputDir=out, workers=1, pattern="imu*")
+if len(results) != 4 or not all(r.source.endswith(".bin") for r in results):
+    fail("Each capture should be converted once, from its binary copy")
+archive = np.load(os.path.join(out, "2026-01-01", "imu0.npz"))
+if archive.files != ["ch0", "ch1"] or not np.array_equal(archive["ch1"], expected[os.path.join(root, "2026-01-01", "imu0.txt")][:, 1]):
+    fail(f"Unexpected archive {archive.files}")
+convert_tree([os.path.join(root, "2026-01-02", "imu1.bin")], "csv.gz", outputDir=out, workers=1)
+with gzip.open(os.path.join(out, "imu1.csv.gz"), "rt") as fh:
+    lines = fh.read().splitlines()
+if lines[0] != "ch0,ch1" or len(lines) != 3001:
+    fail(f"Expected a header and 3000 rows, got {lines[:2]} and {len(lines)} lines")
+
+print("All tests passed.")
@@ -0,0 +1,46 @@
+import sys
+from btviz.decimation import AdaptiveDecimator
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+def feed(decimator, rate, seconds, start, step=0.01):
+    """Feeds rate samples per second in step second batches, returns the end time."""
+    t = start
+    while t < start + seconds:
+        t += step
+        decimator.update(rate * step, t)
+    return t
+
+
+print("Testing rate tracking...")
+decimator = AdaptiveDecimator(targetRate=250, window=0.5, smoothing=1.0)
+if decimator.ratio != 1 or decimator.rate is not None:
+    fail("A new decimator should not decimate")
+t = feed(decimator, 5000, 2, 0.0)
+if abs(decimator.rate - 5000) > 100 or decimator.ratio != 20:
+    fail(f"Expected ratio 20 at 5000 samples/s, got {decimator.ratio} at {decimator.rate}")
+
+print("Testing adaptation to a rate change...")
+t = feed(decimator, 500, 2, t)
+if decimator.ratio != 2:
+    fail(f"Expected ratio 2 at 500 samples/s, got {decimator.ratio}")
+t = feed(decimator, 100, 2, t)
+if decimator.ratio != 1:
+    fail("Slow streams should not be decimated")
+
+print("Testing hysteresis...")
+decimator = AdaptiveDecimator(targetRate=100, window=0.5, smoothing=1.0, hysteresis=0.25)
+t = feed(decimator, 1000, 2, 0.0)
+ratio = decimator.ratio
+t = feed(decimator, 1150, 2, t)
+if decimator.ratio != ratio:
+    fail(f"A 15 % rate change should keep the ratio, went from {ratio} to {decimator.ratio}")
+t = feed(decimator, 2000, 2, t)
+if decimator.ratio != 20:
+    fail(f"Expected ratio 20 after doubling the rate, got {decimator.ratio}")
+
+print("All tests passed.")
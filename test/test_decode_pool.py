@@ -0,0 +1,44 @@
+import sys
+import struct
+from btviz.decode_pool import DecodePool, pool_options
+from btviz.decoders import StructDecoder, decode
+
+
+def main():
+    print("Starting test decode pool...")
+
+    config = {"decodePool": {"default": {"workers": 3, "batchSize": 100}, "Slow": {"batchSize": 7}}}
+    if pool_options("Slow", config) != (3, 7) or pool_options("Other", config) != (3, 100):
+        print("pool_options failed")
+        sys.exit(1)
+
+    name = "4 Byte Unsigned Int (uint32_t)"
+    payloads = [struct.pack("<I", i) for i in range(1000)] + [b"\x01"]
+    pool = DecodePool(name, workers=2, batchSize=64)
+    try:
+        pool.submit(payloads)
+        if pool.hasCapacity():
+            print("Pool should be saturated after 16 batches")
+            sys.exit(1)
+        batches = pool.collect(wait=True)
+    finally:
+        pool.close()
+
+    if len(batches) != 16 or pool.completed != len(payloads):
+        print(f"Expected 16 batches of {len(payloads)} payloads, got {len(batches)} of {pool.completed}")
+        sys.exit(1)
+    values = [v for batch in batches for v in batch.values[:, 0].tolist()]
+    if values != list(range(1000)) or sum(batch.errors for batch in batches) != 1:
+        print("Batches were not returned in submission order")
+        sys.exit(1)
+    inline = decode(StructDecoder(name, "<I"), payloads)
+    if [t for batch in batches for t in batch.text] != inline.text:
+        print("Pool output differs from inline decoding")
+        sys.exit(1)
+
+    print("All tests passed.")
+
+
+# worker processes are spawned and re-import this module
+if __name__ == "__main__":
+    main()
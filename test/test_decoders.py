@@ -0,0 +1,46 @@
+import sys
+import struct
+import numpy as np
+from btviz.decoders import Decoder, StructDecoder, CommaDelimitedDecoder, StringDecoder, decode, available_decoders
+from btviz.config_loader import load_config
+
+print("Starting test decoders...")
+
+decoders = available_decoders(load_config())
+if list(decoders)[-2:] != ["String Literal", "Comma Delimited String Literal"]:
+    print(f"Unexpected decoder order: {list(decoders)}")
+    sys.exit(1)
+
+batch = decode(StructDecoder("u32", "<I"), [struct.pack("<I", i) for i in range(5)] + [b"\x01"])
+if batch.values[:, 0].tolist() != [0, 1, 2, 3, 4] or batch.errors != 1 or batch.text[2] != "2":
+    print("StructDecoder failed")
+    sys.exit(1)
+
+batch = decode(StructDecoder("imu", "<hhh"), [struct.pack("<hhh", 1, -2, 3)])
+if batch.values.shape != (1, 3) or batch.text != ["1,-2,3"]:
+    print("Multi-field StructDecoder failed")
+    sys.exit(1)
+
+batch = decode(CommaDelimitedDecoder(), [b"1,2,3\n", b"4,5,6\n", b"bad\n"])
+if batch.values.tolist() != [[1, 2, 3], [4, 5, 6]] or batch.errors != 1 or batch.text[0] != "1,2,3":
+    print("CommaDelimitedDecoder failed")
+    sys.exit(1)
+
+batch = decode(StringDecoder(), [b"hello"])
+if batch.values is not None or batch.text != ["hello"]:
+    print("StringDecoder failed")
+    sys.exit(1)
+
+class Doubler(Decoder):
+    name = "Doubler"
+    channels = ["a", "b"]
+    def decode_batch(self, payloads):
+        raw = np.frombuffer(b"".join(payloads), dtype=np.uint8).reshape(-1, 1)
+        return np.hstack([raw, raw * 2])
+
+batch = decode(Doubler(), [b"\x01", b"\x02"])
+if batch.values.tolist() != [[1, 2], [2, 4]] or batch.text != ["1,2", "2,4"]:
+    print("Plugin style decoder failed")
+    sys.exit(1)
+
+print("All tests passed.")
@@ -0,0 +1,49 @@
+import sys
+import numpy as np
+from btviz.history_store import HistoryStore
+
+print("Starting test HistoryStore...")
+store = HistoryStore(2, factor=4, chunk=100)
+data = np.stack([np.arange(10000.), -np.arange(10000.)], axis=1)
+for row in data[:5000]:
+    store.append(row)
+store.extend(data[5000:])
+
+if len(store) != 10000:
+    print(f"Wrong length: {len(store)}")
+    sys.exit(1)
+
+# Every summary level must match a direct reduction of the raw samples
+for level in range(1, store.levels):
+    scale = 4 ** level
+    n = store._counts[level]
+    x, lo, hi, mean = store.query(0, n * scale, n)
+    groups = data[:n * scale].reshape(n, scale, 2)
+    if not (np.allclose(lo, groups.min(axis=1)) and np.allclose(hi, groups.max(axis=1))
+            and np.allclose(mean, groups.mean(axis=1))):
+        print(f"Level {level} summaries do not match raw data")
+        sys.exit(1)
+
+# Zoomed in views return raw samples, zoomed out views stay within the point budget
+x, lo, hi, mean = store.query(1000, 1010, 500)
+if not np.array_equal(mean, data[1000:1010]):
+    print("Raw query returned wrong samples")
+    sys.exit(1)
+x, lo, hi, mean = store.query(0, 10000, 500)
+if len(x) > 500:
+    print(f"Coarse query returned {len(x)} points")
+    sys.exit(1)
+
+store.close()
+
+# Rows of another width are dropped without blocking later flushes
+store = HistoryStore(3, chunk=4)
+store.extend(np.ones((2, 2)))
+store.extend(np.ones((3, 3)))
+store.extend(np.full((4, 3), 2.0))
+store.flush()
+if store._counts[0] != 7:
+    print(f"Expected the 7 rows of 3 channels to be written, got {store._counts[0]}")
+    sys.exit(1)
+store.close()
+print("All tests passed.")
@@ -0,0 +1,101 @@
+import os
+import sys
+import subprocess
+import tempfile
+import numpy as np
+from btviz.capture import CaptureWriter
+from btviz.io import open_capture, BinaryCapture, TextCapture
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+folder = tempfile.mkdtemp()
+rng = np.random.default_rng(1)
+data = np.stack([rng.normal(5, 2, 100003), np.arange(100003.)], axis=1)
+
+binPath = os.path.join(folder, "run.bin")
+writer = CaptureWriter(binPath, indexEvery=1000, names=["noise", "ramp"])
+for i, chunk in enumerate(np.array_split(data, 40)):
+    writer.writeValues(chunk, timestamp=1000.0 + i)
+writer.close()
+txtPath = os.path.join(folder, "run.txt")
+writer = CaptureWriter(txtPath, indexEvery=1000)
+for chunk in np.array_split(data, 40):
+    writer.writeLines([",".join(repr(v) for v in row) for row in chunk.tolist()])
+writer.close()
+
+print("Testing memory-mapped binary captures...")
+capture = open_capture(binPath)
+if not isinstance(capture, BinaryCapture) or capture.names != ["noise", "ramp"] or len(capture) != len(data):
+    fail("Wrong binary capture")
+if not isinstance(capture.values, np.memmap) or capture.values.flags.writeable:
+    fail("Binary values should be a read-only memory map")
+if not np.array_equal(capture.channel("ramp")[500:510], data[500:510, 1]):
+    fail("Wrong channel view")
+
+print("Testing chunked text captures...")
+text = open_capture(txtPath)
+if not isinstance(text, TextCapture) or text.channels != 2 or len(text) != len(data):
+    fail("Wrong text capture")
+if not np.array_equal(text.read(99990, 100010), data[99990:]):
+    fail("Wrong text range")
+
+print("Testing summary statistics...")
+for c in (capture, text):
+    stats = c.stats(chunkSize=7777)
+    if stats["count"] != len(data) or not np.allclose(stats["mean"], data.mean(axis=0)) \
+            or not np.allclose(stats["std"], data.std(axis=0)) or not np.array_equal(stats["max"], data.max(axis=0)):
+        fail(f"Wrong statistics for {c.path}: {stats}")
+
+print("Testing resampling...")
+mean = capture.resample(1000)
+factor = -(-len(data) // 1000)
+if len(mean) != -(-len(data) // factor) or len(mean) > 1000 or not np.allclose(mean[3], data[3 * factor:4 * factor].mean(axis=0)):
+    fail("Wrong mean resample")
+lo, hi = text.resample(factor=64, method="minmax")
+if len(lo) != -(-len(data) // 64) or not np.array_equal(hi[-1], data[len(data) // 64 * 64:].max(axis=0)):
+    fail("Wrong min/max resample")
+if not np.array_equal(capture.resample(factor=10, method="first"), data[::10]):
+    fail("Wrong decimation")
+
+print("Testing time ranges...")
+first, rows = capture.readTime(1010.0, 1012.0)
+if not np.array_equal(rows, data[first:first + len(rows)]) or not len(rows):
+    fail("Wrong time range")
+capture.close()
+text.close()
+
+print("Testing gap markers...")
+marked = np.insert(data[:1000], [100, 500, 500], np.nan, axis=0)
+for path in (os.path.join(folder, "gaps.bin"), os.path.join(folder, "gaps.txt")):
+    writer = CaptureWriter(path)
+    if path.endswith(".bin"):
+        writer.writeValues(marked)
+    else:
+        writer.writeLines([",".join(repr(v) for v in row) for row in marked.tolist()])
+    writer.close()
+    with open_capture(path) as c:
+        stats = c.stats(chunkSize=300)
+        if stats["count"] != 1000 or stats["gaps"] != 3 or len(c) != 1003 \
+                or not np.allclose(stats["mean"], data[:1000].mean(axis=0)) \
+                or not np.allclose(stats["std"], data[:1000].std(axis=0)) \
+                or not np.array_equal(stats["min"], data[:1000].min(axis=0)):
+            fail(f"Gap markers should be skipped by the statistics of {path}: {stats}")
+        mean = c.resample(factor=50)
+        lo, hi = c.resample(factor=50, method="minmax")
+        if np.isnan(mean).any() or np.isnan(lo).any() or np.isnan(hi).any() \
+                or not np.allclose(mean[2], np.nanmean(marked[100:150], axis=0)):
+            fail(f"Gap markers should be skipped by resampling {path}")
+        if not np.isnan(c.resample(factor=1)[100]).all():
+            fail("A group of gap markers only should stay NaN")
+
+print("Checking that btviz.io does not import Qt...")
+out = subprocess.run([sys.executable, "-c", "import sys, btviz.io; print('PyQt5' in sys.modules)"],
+                     capture_output=True, text=True)
+if out.stdout.strip() != "False":
+    fail(f"btviz.io imported Qt: {out.stdout} {out.stderr}")
+
+print("All tests passed.")
@@ -0,0 +1,26 @@
+import sys
+import subprocess
+
+print("Checking that the scan window does not import heavy modules...")
+code = (
+    "import sys\n"
+    "import btviz.__main__\n"
+    "import btviz.scan_widget\n"
+    "loaded = {m.split('.')[0] for m in sys.modules}\n"
+    "print(','.join(sorted(loaded & {'matplotlib', 'bleak'})))\n"
+)
+out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+if out.returncode != 0:
+    print(out.stderr)
+    sys.exit(1)
+if out.stdout.strip():
+    print(f"Heavy modules imported at startup: {out.stdout.strip()}")
+    sys.exit(1)
+
+print("Checking that load_config is cached...")
+from btviz.config_loader import load_config
+if load_config() is not load_config():
+    print("load_config re-read the config")
+    sys.exit(1)
+
+print("All tests passed.")
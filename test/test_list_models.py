@@ -0,0 +1,49 @@
+import sys
+from PyQt5.QtWidgets import QApplication
+from btviz.list_models import EntryListModel, EntryFilterModel, ObjectRole
+
+app = QApplication(sys.argv)
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+model = EntryListModel()
+proxy = EntryFilterModel(model)
+changes = []
+model.dataChanged.connect(lambda a, b: changes.append(a.row()))
+
+model.upsertMany([("aa", "dev-a", "Alpha", -70), ("bb", "dev-b", "beta", -40), ("cc", "dev-c", "Gamma", -90)])
+if model.rowCount() != 3:
+    fail(f"Expected 3 rows, got {model.rowCount()}")
+
+# repeated advertisements update rows in place
+model.upsert("bb", "dev-b", "beta", -40)
+if changes:
+    fail("Unchanged entry emitted dataChanged")
+model.upsert("aa", "dev-a", "Alpha", -30)
+if model.rowCount() != 3 or changes != [0]:
+    fail(f"Update should change row 0 only, got {model.rowCount()} rows, changes {changes}")
+
+proxy.sortByRssi()
+order = [proxy.data(proxy.index(i, 0), ObjectRole) for i in range(proxy.rowCount())]
+if order != ["dev-a", "dev-b", "dev-c"]:
+    fail(f"Wrong RSSI order {order}")
+
+proxy.sortByName()
+order = [proxy.data(proxy.index(i, 0), ObjectRole) for i in range(proxy.rowCount())]
+if order != ["dev-a", "dev-b", "dev-c"]:
+    fail(f"Wrong name order {order}")
+
+proxy.setFilterFixedString("GAM")
+if proxy.rowCount() != 1 or proxy.objectAt(proxy.index(0, 0)) != "dev-c":
+    fail("Filter should keep only Gamma")
+proxy.setFilterFixedString("")
+
+model.clear()
+if model.rowCount() != 0 or model.get("aa") is not None:
+    fail("clear() left entries behind")
+
+print("All tests passed.")
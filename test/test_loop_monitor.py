@@ -0,0 +1,50 @@
+import sys
+import time
+import asyncio
+from btviz.loop_monitor import LoopMonitor, timed
+import btviz.loop_monitor as loop_monitor
+
+print("Starting test loop monitor...")
+
+monitor = LoopMonitor(interval=0.01, slowThreshold=0.02, stallThreshold=0.05)
+loop_monitor._monitor = monitor
+
+
+@timed
+def slow_slot():
+    time.sleep(0.03)
+
+
+def blocking_callback():
+    time.sleep(0.08)
+
+
+async def main():
+    monitor.start()
+    await asyncio.sleep(0.05)
+    asyncio.get_running_loop().call_soon(blocking_callback)
+    asyncio.get_running_loop().call_soon(slow_slot)
+    await asyncio.sleep(0.1)
+    slow_slot()
+    monitor.stop()
+
+
+asyncio.run(main())
+
+stats = monitor.stats()
+if stats["max"] < 0.08 or stats["stalls"] < 1:
+    print(f"Lag was not measured: {stats}")
+    sys.exit(1)
+if monitor.byName.get("blocking_callback", (0,))[0] != 1:
+    print(f"Slow asyncio callback not recorded: {monitor.byName}")
+    sys.exit(1)
+# once through the asyncio handle and once called directly, never counted twice
+if monitor.byName.get("slow_slot", (0,))[0] != 2:
+    print(f"@timed calls not recorded exactly once each: {monitor.byName}")
+    sys.exit(1)
+report = monitor.report()
+if "blocking_callback" not in report or "stalls" not in report:
+    print("Report is incomplete")
+    sys.exit(1)
+
+print("All tests passed.")
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+import tempfile
+from btviz.probe import Probe, histogram, arrival_bursts, compare_probes, format_probe, save_probe, load_probe
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+class EchoTransport:
+    """
+    Echoes tagged writes after a delay and notifies three packets every 10 ms after b"GO".
+    """
+    properties = ("notify", "write", "write-without-response")
+
+    def __init__(self, delay=0.002, lose=()):
+        self.delay = delay
+        self.lose = lose
+        self.callback = None
+        self.writes = 0
+        self.streaming = None
+
+    async def start(self, callback):
+        self.callback = callback
+
+    async def stop(self):
+        self.callback = None
+        if self.streaming is not None:
+            self.streaming.cancel()
+
+    async def _stream(self):
+        while True:
+            await asyncio.sleep(0.01)
+            for _ in range(3):
+                self.callback(self, b"x" * 20)
+
+    async def write(self, data, response=True):
+        self.writes += 1
+        if data == b"GO":
+            self.streaming = asyncio.ensure_future(self._stream())
+        elif data == b"STOP":
+            self.streaming.cancel()
+        elif data.startswith(b"#") and self.writes - 1 not in self.lose:
+            asyncio.get_running_loop().call_later(self.delay, self.callback, self, bytes(data))
+
+    def maxWriteSize(self, response=True):
+        return 244
+
+    def __str__(self):
+        return "echo"
+
+
+print("Testing the echo round trip...")
+transport = EchoTransport(lose=(3,))
+result = asyncio.run(Probe(transport, connectionInterval=10).run(
+    [{"test": "echo", "count": 20, "size": 16, "timeout": 0.1}], "build-1"))
+echo = result["steps"][0]["result"]
+if echo["received"] != 19 or echo["lost"] != 1 or echo["size"] != 16:
+    fail(f"Expected 19 of 20 echoes of 16 bytes, got {echo}")
+if not 2 <= echo["rtt"]["p50"] < 20 or sum(count for _, count in echo["histogram"]) != 19:
+    fail(f"Unexpected round trip times {echo['rtt']}")
+
+print("Testing notify and write goodput...")
+steps = [{"test": "notify", "duration": 0.3, "start": {"text": "GO"}, "stop": {"text": "STOP"}},
+         {"test": "write", "duration": 0.1, "window": 4},
+         {"test": "bogus"}]
+result = asyncio.run(Probe(EchoTransport(), connectionInterval=10).run(steps, "build-1"))
+notify, write, bogus = result["steps"]
+r = notify["result"]
+if not 40 <= r["packets"] <= 90 or r["bytes"] != 20 * r["packets"] or abs(r["perBurst"] - 3) > 0.2:
+    fail(f"Expected bursts of 3 packets every 10 ms, got {r}")
+if not 2.0 <= r["perInterval"] <= 3.5 or not 8 <= r["burstSpacing"] <= 15:
+    fail(f"Expected about 3 packets per 10 ms interval, got {r}")
+if write["result"]["size"] != 244 or write["result"]["bytes"] != 244 * write["result"]["packets"]:
+    fail(f"Writes should use the largest write size, got {write['result']}")
+if "error" not in bogus:
+    fail("An unknown test should be reported as an error")
+
+print("Testing the helpers...")
+if histogram([1.0, 2.5, 3.0, 2000.0])[:2] != [(2.5, 2), (5, 1)] or histogram([2000.0])[-1] != (None, 1):
+    fail(f"Unexpected histogram {histogram([1.0, 2.5, 3.0, 2000.0])}")
+bursts, spacing = arrival_bursts([0.0, 0.0001, 0.0002, 0.0075, 0.0076, 0.015])
+if bursts != 3 or abs(spacing - 0.0073) > 1e-4:
+    fail(f"Expected 3 bursts, got {bursts} with spacing {spacing}")
+
+print("Testing saved results...")
+with tempfile.TemporaryDirectory() as directory:
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        path = save_probe(result)
+        loaded = load_probe(path)
+    finally:
+        os.chdir(cwd)
+if "build-1" not in os.path.basename(path) or loaded["steps"][0]["result"]["packets"] != r["packets"]:
+    fail(f"Expected the saved result back from {path}")
+lines = compare_probes([loaded, dict(loaded, label="build-2")])
+if "build-1" not in lines[0] or "build-2" not in lines[0] or not any(l.startswith("notify KiB/s") for l in lines):
+    fail(f"Unexpected comparison {lines}")
+if "failed" not in format_probe(loaded)[-1]:
+    fail("The failed step should be reported")
+
+print("All tests passed.")
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+from btviz.profiles import Profile, load_profiles, save_profile, delete_profile, get_profile
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+path = os.path.join(tempfile.mkdtemp(), "profiles.json")
+
+print("Testing profile round trip...")
+if load_profiles(path) != {}:
+    fail("A missing profiles file should give no profiles")
+imu = Profile("imu", address="C0:FF:EE:00:00:01", characteristics=["6e400003-b5a3", "6e400004-b5a3"],
+              decoder="Comma Delimited", window=500, resample="5:1", save="imu.txt")
+udp = Profile("bench", url="udp://127.0.0.1:9000", decoder="String", interval=200)
+save_profile(imu, path)
+save_profile(udp, path)
+loaded = load_profiles(path)
+if sorted(loaded) != ["bench", "imu"] or loaded["imu"].toDict() != imu.toDict():
+    fail(f"Round trip failed: {loaded}")
+if get_profile("bench", path).interval != 200:
+    fail("Timed read interval was not kept")
+
+print("Testing capture names...")
+if imu.captureName("6e400003-b5a3") != "imu_6e400003-b5a3.txt" or udp.captureName("x") is not None:
+    fail("Wrong capture names")
+nus = Profile("nus", address="a", characteristics=["6e400002-b5a3-f393-e0a9-e50e24dcca9e",
+                                                   "6e400003-b5a3-f393-e0a9-e50e24dcca9e"], save="nus.txt")
+if len({nus.captureName(uuid) for uuid in nus.characteristics}) != 2:
+    fail("Characteristics of one vendor base should get their own capture files")
+if Profile("one", address="a", characteristics=["c"], save="one.txt").captureName("c") != "one.txt":
+    fail("Single stream profiles should use the file name as is")
+
+print("Testing invalid profiles...")
+for data in ({"decoder": "String"}, {"url": "udp://127.0.0.1:1", "colour": "red"}):
+    try:
+        Profile.fromDict("bad", data)
+    except ValueError:
+        continue
+    fail(f"Accepted invalid profile {data}")
+try:
+    get_profile("missing", path)
+    fail("Unknown profile did not raise")
+except KeyError:
+    pass
+
+delete_profile("imu", path)
+if list(load_profiles(path)) != ["bench"]:
+    fail("Delete failed")
+
+print("All tests passed.")
@@ -0,0 +1,34 @@
+import sys
+from PyQt5.QtWidgets import QApplication
+from btviz.render_clock import RenderClock
+
+app = QApplication(sys.argv)
+
+print("Starting test RenderClock...")
+clock = RenderClock(interval=10)
+calls = {"a": 0, "b": 0}
+clock.register("a", lambda: calls.__setitem__("a", calls["a"] + 1))
+clock.register("b", lambda: calls.__setitem__("b", calls["b"] + 1))
+
+# Freshly registered views are drawn once
+clock.tick()
+if calls != {"a": 1, "b": 1}:
+    print(f"Initial tick failed: {calls}")
+    sys.exit(1)
+
+# Only dirty views are redrawn, and only once per tick
+clock.markDirty("a")
+clock.markDirty("a")
+clock.tick()
+clock.tick()
+if calls != {"a": 2, "b": 1}:
+    print(f"Dirty tick failed: {calls}")
+    sys.exit(1)
+
+clock.unregister("a")
+clock.unregister("b")
+if clock._timer.isActive():
+    print("Timer still running without views")
+    sys.exit(1)
+
+print("All tests passed.")
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+from btviz.rules import Rule, RuleEngine, WriteAction, LatencyStats, load_rules
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+def column(*values):
+    return np.array(values, dtype=np.float64)[:, None]
+
+
+print("Testing a value rule with hysteresis...")
+engine = RuleEngine([Rule("hot", above=10.0, hysteresis=2.0)], 1)
+alerts = engine.evaluate(column(5, 11, 9, 12, 7, 11), now=0.0)
+if [(a.sample, a.active) for a in alerts] != [(1, True), (4, False), (5, True)]:
+    fail(f"Unexpected alerts {[str(a) for a in alerts]}")
+alerts = engine.evaluate(column(9, 8.5), now=100.0)
+if alerts:
+    fail("Values inside the hysteresis band should not clear the alert")
+alerts = engine.evaluate(column(7.9), now=101.0)
+if len(alerts) != 1 or alerts[0].active or alerts[0].sample != 8:
+    fail(f"Expected the alert to clear at sample 8, got {[str(a) for a in alerts]}")
+
+print("Testing holdoff...")
+engine = RuleEngine([Rule("low", below=0.0, holdoff=1.0)], 1)
+first = engine.evaluate(column(-1, 1), now=0.0)
+second = engine.evaluate(column(-1, 1), now=0.5)
+third = engine.evaluate(column(-1), now=2.0)
+if sum(a.active for a in first) != 1 or any(a.active for a in second) or not third[0].active:
+    fail("A rule should not alert again within its holdoff")
+
+# a re-trigger within the holdoff must not leave the rule stuck active
+engine = RuleEngine([Rule("high", above=1.0, holdoff=1.0)], 1)
+alerts = engine.evaluate(column(2), now=0.0) + engine.evaluate(column(0), now=0.1)
+for k in range(2, 101):
+    alerts += engine.evaluate(column(2), now=k / 10)
+if [(a.active, a.decided) for a in alerts] != [(True, 0.0), (False, 0.1), (True, 1.0)]:
+    fail(f"A rule held above its threshold should alert after the holdoff, got {[str(a) for a in alerts]}")
+
+print("Testing mean and rate across batches...")
+engine = RuleEngine([Rule("mean", channel="y", measure="mean", window=4, above=2.5),
+                     Rule("rate", channel=1, measure="rate", window=2, above=5.0)], 2, ["x", "y"])
+values = np.column_stack([np.zeros(6), [0, 1, 2, 3, 4, 20]])
+alerts = engine.evaluate(values[:3], now=0.0) + engine.evaluate(values[3:], now=1.0)
+found = {(a.rule.name, a.sample) for a in alerts}
+# means of 4: 1.5 at sample 3, 2.5 at 4, 7.25 at 5; change over 2 samples: 17 at 5
+if found != {("mean", 5), ("rate", 5)}:
+    fail(f"Unexpected alerts {found}")
+
+print("Testing rule selection...")
+engine = RuleEngine([Rule("a", channel="missing", above=0), Rule("b", channel=3, above=0),
+                     Rule("c", above=0, decoder="Other")], 2, ["x", "y"], "Mine")
+if engine.states or len(engine.skipped) != 2:
+    fail("Unknown channels should be skipped and other decoders ignored")
+
+print("Testing the rules file...")
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "rules.json")
+    with open(path, "w") as fh:
+        json.dump([{"name": "fan", "channel": "t", "above": 80, "write": {"text": "ON\n", "response": False},
+                    "clearWrite": {"hex": "de ad"}}], fh)
+    rule, = load_rules(path)
+    if rule.write.data != b"ON\n" or rule.write.response or rule.clearWrite.data != b"\xde\xad":
+        fail("Writes should be read from text and hex")
+    if load_rules(os.path.join(directory, "none.json")) != []:
+        fail("A missing rules file should give no rules")
+try:
+    Rule.fromDict({"name": "bad", "above": 1, "below": 2})
+    fail("A rule with both above and below should be rejected")
+except ValueError:
+    pass
+
+print("Testing write-back...")
+
+
+class FakeTransport:
+    def __init__(self):
+        self.written = []
+
+    async def write(self, data, response=True):
+        self.written.append((data, response))
+
+
+transport = FakeTransport()
+asyncio.run(WriteAction(b"\x01", response=False).send(transport))
+if transport.written != [(b"\x01", False)]:
+    fail(f"Expected one write without response, got {transport.written}")
+
+print("Testing latency stats...")
+stats = LatencyStats(keep=10)
+for ms in range(1, 21):
+    stats.add(ms / 1000)
+summary = stats.summary()
+if summary["count"] != 20 or summary["max"] != 20.0 or not 15 <= summary["p50"] <= 16:
+    fail(f"Unexpected summary {summary}")
+
+print("All tests passed.")
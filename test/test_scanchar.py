@@ -32,11 +32,9 @@ def sim():
     cw.m_client = type("MockClient", (), {"services": [MockService(1), MockService(2)]})()
     
     # Manually populate
-    for s in cw.m_client.services:
-        cw.servicesList.addItem(str(s))
-        cw.servicesDict[str(s)] = s
+    cw.servicesModel.upsertMany((str(s), s, str(s), None) for s in cw.m_client.services)
     
-    cw.servicesList.setCurrentRow(0)
+    cw.servicesList.setCurrentIndex(cw.servicesProxy.index(0, 0))
     
     print("Clicking read service button!")
     cw.serviceButton.setEnabled(True)
@@ -0,0 +1,78 @@
+import sys
+import numpy as np
+from btviz.decoders import available_decoders
+from btviz.sequence import SequenceTracker, insert_gap_markers, insert_gap_lines
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+def batch(*counters):
+    return np.column_stack([counters, np.arange(len(counters))]).astype(np.float64)
+
+
+print("Testing a contiguous stream...")
+tracker = SequenceTracker(0, modulus=256)
+gaps = tracker.check(batch(*range(250, 256), *range(0, 10)), now=0.0)
+if len(gaps) or tracker.lost or tracker.received != 16:
+    fail(f"A wrapping counter should not count as loss: {tracker.stats()}")
+
+print("Testing gaps...")
+gaps = tracker.check(batch(10, 11, 15, 16, 20), now=1.0)
+if gaps.tolist() != [2, 4] or tracker.lost != 6:
+    fail(f"Expected gaps at rows 2 and 4 with 6 lost, got {gaps.tolist()} and {tracker.lost}")
+gaps = tracker.check(batch(23), now=2.0)
+if gaps.tolist() != [0] or tracker.lost != 8:
+    fail("A gap between two batches should be found at row 0")
+if abs(tracker.lossRate - 8 / (22 + 8)) > 1e-9:
+    fail(f"Unexpected loss rate {tracker.lossRate}")
+
+print("Testing duplicates and reordering...")
+tracker = SequenceTracker(0, modulus=65536)
+tracker.check(batch(0, 1, 2, 4, 3, 5, 5, 6), now=0.0)
+stats = tracker.stats()
+if (stats["lost"], stats["duplicates"], stats["reordered"]) != (0, 1, 1):
+    fail(f"A late packet should cancel its loss: {stats}")
+tracker.check(batch(1000, 1001), now=1.0)
+if tracker.lost != 993:
+    fail(f"Expected 993 lost after a jump, got {tracker.lost}")
+tracker.check(batch(7, 8), now=2.0)
+if tracker.restarts != 1 or tracker.last != 8:
+    fail("A large backward step should resync the counter")
+
+print("Testing the recent loss window...")
+tracker = SequenceTracker(0, window=5.0)
+tracker.check(batch(0, 5), now=0.0)
+tracker.check(batch(6, 7, 8, 9), now=10.0)
+if tracker.recentLossRate != 0.0 or tracker.lossRate == 0.0:
+    fail("Old losses should leave the recent window")
+
+print("Testing batches without the counter column...")
+tracker = SequenceTracker(1)
+tracker.check(np.array([[0.0, 1], [0.0, 2]]), now=0.0)
+if len(tracker.check(np.array([[0.0]]), now=0.1)) or tracker.received != 2:
+    fail("A batch narrower than the counter column should be skipped")
+if len(tracker.check(np.array([[0.0, 3]]), now=0.2)) or tracker.lost:
+    fail("Counting should continue after a narrow batch")
+
+print("Testing gap markers...")
+values = batch(1, 2, 5, 6)
+marked = insert_gap_markers(values, np.array([2]))
+if marked.shape != (5, 2) or not np.isnan(marked[2]).all() or marked[3, 0] != 5:
+    fail(f"Expected a NaN row before row 2, got {marked}")
+if insert_gap_lines(["1", "2", "5"], np.array([2]), "nan") != ["1", "2", "nan", "5"]:
+    fail("Expected a marker line before line 2")
+
+print("Testing decoders from config...")
+config = {"decodeOptions": [{"name": "Counted", "format": "<Bh", "channels": ["seq", "x"],
+                             "sequence": "seq", "sequenceBits": 8}]}
+decoder = available_decoders(config)["Counted"]
+tracker = SequenceTracker.fromDecoder(decoder, 2, config)
+if tracker is None or tracker.column != 0 or tracker.modulus != 256:
+    fail("Expected a tracker on column 0 wrapping at 256")
+if SequenceTracker.fromDecoder(available_decoders(config)["Comma Delimited String Literal"], 2) is not None:
+    fail("Decoders without a sequence channel should not be tracked")
+
+print("All tests passed.")
@@ -0,0 +1,87 @@
+import subprocess
+import sys
+import time
+import numpy as np
+from btviz.shm_ring import SampleRing
+from btviz.remote_render import RemoteRenderer
+
+READER = """
+from btviz.shm_ring import TapReader
+tap = TapReader("btviz_test_tap", fromStart=True)
+print(",".join(tap.names), tap.channels, tap.ring.capacity, tap.ring.count, tap.ring.sequence)
+rows, missed = tap.read()
+print(f"{rows[0, 0]:.0f}:{rows[-1, 0]:.0f}", missed)
+tap.cursor = 0
+rows, missed = tap.read()
+print(f"{rows[0, 0]:.0f}:{rows[-1, 0]:.0f}", missed)
+rows, missed = tap.read()
+print(len(rows), missed)
+del rows
+tap.close()
+"""
+
+
+def main():
+    print("Starting test shm ring...")
+
+    ring = SampleRing(channels=2, capacity=8)
+    reader = SampleRing.attach(ring.name)
+    try:
+        ring.extend([[0, 0], [1, -1], [2, -2]])
+        if reader.channels != 2 or reader.capacity != 8 or reader.latest(10).tolist() != [[0, 0], [1, -1], [2, -2]]:
+            print("Attached reader does not see the written rows")
+            sys.exit(1)
+
+        ring.extend([[i, -i] for i in range(3, 20)])
+        if reader.count != 20 or reader.latest(8)[:, 0].tolist() != list(range(12, 20)):
+            print(f"Wrap around failed: {reader.latest(8)[:, 0].tolist()}")
+            sys.exit(1)
+        if reader.latest(3)[:, 1].tolist() != [-17, -18, -19]:
+            print("latest() returned the wrong rows")
+            sys.exit(1)
+    finally:
+        reader.close()
+        ring.close()
+
+    ring = SampleRing(channels=2, capacity=8, name="btviz_test_tap", names=["x", "y"])
+    try:
+        ring.extend([[i, -i] for i in range(20)])
+        # readers are separate programs, they must not take ownership of the block
+        reader = subprocess.run([sys.executable, "-c", READER], capture_output=True, text=True, timeout=30)
+        result = reader.stdout.strip().splitlines()
+        expected = ["x,y 2 8 20 1", "12:19 0", "12:19 12", "0 0"]
+        if result != expected:
+            print(f"TapReader failed: {result} {reader.stderr}")
+            sys.exit(1)
+    finally:
+        ring.close()
+
+    renderer = RemoteRenderer(channels=1, capacity=1000)
+    try:
+        renderer.ring.extend(np.sin(np.arange(500) / 20.0))
+        renderer.request(320, 240, points=200, title="ADC")
+        frame = None
+        deadline = time.monotonic() + 30
+        while frame is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+            frame = renderer.poll()
+        if frame is None:
+            print("Render process returned no frame")
+            sys.exit(1)
+        data, width, height = frame
+        if (width, height) != (320, 240) or len(data) != 320 * 240 * 4:
+            print(f"Unexpected frame size {width}x{height}")
+            sys.exit(1)
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)
+        if not (pixels[:, :, 0] > 200).any() or not (pixels[:, :, 1] < 50).any():
+            print("Frame does not contain the red trace")
+            sys.exit(1)
+    finally:
+        renderer.close()
+
+    print("All tests passed.")
+
+
+# the render process is spawned and re-imports this module
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import sys
+from collections import deque
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from btviz.stacked_traces import StackedTraces, LANE_FILL, parse_scales
+
+
+def fail(message):
+    print(message)
+    sys.exit(1)
+
+
+channels = 32
+fig, ax = plt.subplots()
+traces = StackedTraces(ax, channels, [f"adc{i}" for i in range(channels)])
+
+print("Testing a single artist for all channels...")
+if len(ax.collections) != 1 or ax.lines:
+    fail(f"Expected one collection and no lines, got {len(ax.collections)} and {len(ax.lines)}")
+if [t.get_text() for t in ax.get_yticklabels()][0] != "adc0":
+    fail("Lanes should be labelled with the channel names")
+
+print("Testing lane scaling...")
+rng = np.random.default_rng(1)
+dataframe = [deque(rng.normal(i * 1000, i + 1, 200), maxlen=200) for i in range(channels)]
+traces.update(dataframe)
+segments = traces.collection.get_segments()
+if len(segments) != channels or len(segments[0]) != 200:
+    fail(f"Expected {channels} segments of 200 points, got {len(segments)}")
+for i, segment in enumerate(segments):
+    lane = channels - 1 - i
+    y = segment[:, 1]
+    if y.min() < lane - LANE_FILL / 2 - 1e-9 or y.max() > lane + LANE_FILL / 2 + 1e-9:
+        fail(f"Channel {i} leaves its lane: {y.min()}..{y.max()}")
+if ax.get_xlim() != (0, 199):
+    fail(f"Unexpected x limits {ax.get_xlim()}")
+
+print("Testing fixed gain and offset...")
+traces.setGain(0, 0.001)
+traces.setOffset(0, 0.0)
+dataframe[0] = deque([1000.0] * 200, maxlen=200)
+traces.update(dataframe)
+if not np.allclose(traces.collection.get_segments()[0][:, 1], channels - 1 + 1.0):
+    fail("A fixed gain and offset should map 1000 to one lane above the centre")
+traces.setGain(0, None)
+traces.setOffset(0, None)
+traces.update(dataframe)
+if not np.allclose(traces.collection.get_segments()[0][:, 1], channels - 1):
+    fail("A constant channel should sit on its lane centre")
+
+print("Testing channels of different lengths...")
+dataframe[3].extend([1.0] * 10)
+short = [deque(list(d)[:50]) for d in dataframe]
+short[5] = deque(range(80))
+traces.update(short)
+if len(traces.collection.get_segments()[5]) != 50:
+    fail("Traces should be cut to the shortest channel")
+
+plt.close(fig)
+print("Testing scales from the plot settings...")
+names = ["x", "y", "z"]
+if parse_scales("x:0.5:0; 2:auto:10, y", names) != {0: (0.5, 0.0), 2: (None, 10.0), 1: (None, None)}:
+    fail("Unexpected scales")
+for bad in ("w:1", "x:1:2:3", "x:big", "7:1"):
+    try:
+        parse_scales(bad, names)
+        fail(f"'{bad}' should be rejected")
+    except ValueError:
+        pass
+traces.setScales({0: (0.001, 0.0)})
+traces.update(dataframe)
+if not np.allclose(traces.collection.get_segments()[0][:, 1], channels):
+    fail("setScales should fix the gain and offset of listed channels")
+traces.setScales({})
+if not np.isnan(traces.gains).all() or not np.isnan(traces.offsets).all():
+    fail("setScales should reset unlisted channels to automatic")
+
+print("All tests passed.")
@@ -0,0 +1,89 @@
+import sys
+import os
+import json
+import base64
+import asyncio
+import numpy as np
+from btviz.stream_server import StreamServer
+
+print("Starting test stream server...")
+
+
+async def websocket_client(port, path="/"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16))
+    writer.write(b"GET " + path.encode() + b" HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+                 b"Connection: Upgrade\r\nSec-WebSocket-Key: " + key + b"\r\nSec-WebSocket-Version: 13\r\n\r\n")
+    response = await reader.readuntil(b"\r\n\r\n")
+    if not response.startswith(b"HTTP/1.1 101"):
+        print(f"WebSocket upgrade failed: {response}")
+        sys.exit(1)
+    return reader, writer
+
+
+async def read_ws_message(reader):
+    head = await reader.readexactly(2)
+    n = head[1] & 0x7F
+    if n == 126:
+        n = int.from_bytes(await reader.readexactly(2), "big")
+    elif n == 127:
+        n = int.from_bytes(await reader.readexactly(8), "big")
+    return json.loads(await reader.readexactly(n))
+
+
+async def main():
+    server = StreamServer(port=0, maxBufferBytes=64 * 1024)
+    await server.start()
+    try:
+        raw_reader, raw_writer = await asyncio.open_connection("127.0.0.1", server.port)
+        ws_reader, ws_writer = await websocket_client(server.port, "/imu")
+        other_reader, other_writer = await websocket_client(server.port, "/other")
+        # wait until the raw client is past the protocol sniffing
+        while len(server.subscribers) < 3:
+            await asyncio.sleep(0.05)
+
+        server.publish("imu", np.array([[1.0, 2.0], [3.0, 4.0]]), channels=["x", "y"], timestamp=5.0)
+        server.publish("imu", np.array([[5.0, 6.0]]))
+        server.publish("log", text=["hello"])
+
+        first = json.loads(await raw_reader.readline())
+        if first != {"stream": "imu", "seq": 0, "time": 5.0, "index": 0, "channels": ["x", "y"],
+                     "values": [[1.0, 2.0], [3.0, 4.0]]}:
+            print(f"Unexpected TCP frame {first}")
+            sys.exit(1)
+        second = json.loads(await raw_reader.readline())
+        third = json.loads(await raw_reader.readline())
+        if second["index"] != 2 or second["seq"] != 1 or third["text"] != ["hello"]:
+            print(f"Unexpected TCP frames {second} {third}")
+            sys.exit(1)
+
+        message = await read_ws_message(ws_reader)
+        message2 = await read_ws_message(ws_reader)
+        if message["values"] != [[1.0, 2.0], [3.0, 4.0]] or message2["values"] != [[5.0, 6.0]]:
+            print(f"Unexpected WebSocket frames {message} {message2}")
+            sys.exit(1)
+        try:
+            await asyncio.wait_for(read_ws_message(other_reader), 0.2)
+            print("Subscriber of another stream received data")
+            sys.exit(1)
+        except asyncio.TimeoutError:
+            pass
+
+        # both imu clients stop reading, they must be evicted instead of slowing down publish()
+        block = np.random.rand(500, 4)
+        for _ in range(2000):
+            server.publish("imu", block)
+            await asyncio.sleep(0)
+            if server.evicted == 2:
+                break
+        if server.evicted != 2 or len(server.subscribers) != 1:
+            print(f"Slow subscriber was not evicted: {server.stats()}")
+            sys.exit(1)
+        for writer in (raw_writer, ws_writer, other_writer):
+            writer.close()
+    finally:
+        await server.close()
+
+
+asyncio.run(main())
+print("All tests passed.")
@@ -0,0 +1,45 @@
+import sys
+import asyncio
+import socket
+from btviz.transports import Framer, open_transport
+
+print("Testing Framer...")
+framer = Framer("line")
+frames = framer.feed(b"1,2\n3,") + framer.feed(b"4\n\n5")
+if frames != [b"1,2\n", b"3,4\n"]:
+    print(f"Line framing failed: {frames}")
+    sys.exit(1)
+framer = Framer(4)
+frames = framer.feed(b"\x01\x00\x00\x00\x02\x00") + framer.feed(b"\x00\x00")
+if frames != [b"\x01\x00\x00\x00", b"\x02\x00\x00\x00"]:
+    print(f"Fixed size framing failed: {frames}")
+    sys.exit(1)
+
+async def run():
+    print("Testing UDP loopback transport...")
+    transport = await open_transport("udp://127.0.0.1:0")
+    received = []
+    await transport.start(lambda sender, data: received.append(data))
+    peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    peer.bind(("127.0.0.1", 0))
+    peer.setblocking(False)
+    for i in range(10):
+        peer.sendto(f"{i}\n".encode(), ("127.0.0.1", transport.port))
+    for _ in range(100):
+        if len(received) == 10:
+            break
+        await asyncio.sleep(0.01)
+    if received != [f"{i}\n".encode() for i in range(10)]:
+        print(f"UDP receive failed: {received}")
+        sys.exit(1)
+    # writes go back to the last sender
+    await transport.write(b"ping")
+    await asyncio.sleep(0.05)
+    if peer.recv(16) != b"ping":
+        print("UDP write failed")
+        sys.exit(1)
+    peer.close()
+    await transport.close()
+
+asyncio.run(run())
+print("All tests passed.")
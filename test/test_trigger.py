@@ -0,0 +1,42 @@
+import sys
+import numpy as np
+from btviz.trigger import Trigger
+
+print("Starting test Trigger...")
+# sine with a period of 100 samples crosses 0.5 upwards at samples 9, 109, 209, ...
+x = np.sin(np.arange(1000) * 2 * np.pi / 100)
+
+trigger = Trigger(level=0.5, preSamples=10, postSamples=20)
+segments = []
+for chunk in np.array_split(x, 37):
+    segments += trigger.feed(chunk)
+if [s.sampleNumber for s in segments] != list(range(9, 1000, 100)):
+    print(f"Level trigger failed: {[s.sampleNumber for s in segments]}")
+    sys.exit(1)
+second = segments[1]
+if second.values.shape != (30, 1) or second.triggerIndex != 10:
+    print("Segment has wrong shape")
+    sys.exit(1)
+if not np.allclose(second.values[:, 0], x[99:129]):
+    print("Segment does not hold the pre and post trigger samples")
+    sys.exit(1)
+
+trigger = Trigger(level=0.5, edge="falling", preSamples=10, postSamples=20, mode="single")
+segments = trigger.feed(x)
+if len(segments) != 1 or trigger.armed:
+    print("Single mode failed")
+    sys.exit(1)
+trigger.arm()
+if len(trigger.feed(x)) != 1:
+    print("Re-arm failed")
+    sys.exit(1)
+
+trigger = Trigger(level=5, mode="auto", autoSamples=300, preSamples=10, postSamples=50)
+segments = []
+for chunk in np.array_split(x, 10):
+    segments += trigger.feed(chunk)
+if [(s.sampleNumber, s.forced) for s in segments] != [(300, True), (650, True)]:
+    print("Auto mode failed")
+    sys.exit(1)
+
+print("All tests passed.")
@@ -0,0 +1,51 @@
+import sys
+import asyncio
+from btviz.write_queue import WriteQueue
+from btviz.transports import BleTransport
+
+class MockClient:
+    mtu_size = 247
+    def __init__(self):
+        self.writes = []
+        self.inFlight = 0
+        self.peak = 0
+    async def write_gatt_char(self, char, data, response=True):
+        self.inFlight += 1
+        self.peak = max(self.peak, self.inFlight)
+        await asyncio.sleep(0.001)
+        self.writes.append((data, response))
+        self.inFlight -= 1
+
+class MockChar:
+    max_write_without_response_size = 100
+
+async def run():
+    data = bytes(range(256)) * 40
+
+    print("Testing write with response...")
+    client = MockClient()
+    stats = await WriteQueue(BleTransport(client, MockChar())).send(data)
+    if b"".join(d for d, _ in client.writes) != data or client.peak != 1 or stats.chunkSize != 244:
+        print("Write with response failed")
+        sys.exit(1)
+
+    print("Testing pipelined write without response...")
+    client = MockClient()
+    progress = []
+    stats = await WriteQueue(BleTransport(client, MockChar()), response=False, window=4).send(data, progress.append)
+    if sorted(len(d) for d, _ in client.writes)[-1] != 100 or client.peak != 4:
+        print(f"Pipelining failed, peak {client.peak}")
+        sys.exit(1)
+    if stats.sent != len(data) or stats.chunks != 103 or stats.throughput <= 0 or not progress:
+        print(f"Stats failed: {stats}")
+        sys.exit(1)
+
+    print("Testing command script...")
+    client = MockClient()
+    results = await WriteQueue(BleTransport(client, MockChar())).sendLines(["# comment\n", "START\n", "\n", "STOP\n"])
+    if [d for d, _ in client.writes] != [b"START", b"STOP"] or len(results) != 2:
+        print("Command script failed")
+        sys.exit(1)
+
+asyncio.run(run())
+print("All tests passed.")